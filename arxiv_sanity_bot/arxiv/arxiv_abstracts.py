@@ -24,9 +24,12 @@ from arxiv_sanity_bot.config import (
     ARXIV_PAGE_SIZE,
     ARXIV_ZERO_RESULTS_MAX_RETRIES,
     ARXIV_ZERO_RESULTS_MAX_WAIT_TIME,
+    ARXIV_API_URL,
 )
+from arxiv_sanity_bot.http_session import get_session
 from arxiv_sanity_bot.logger import get_logger, FatalError
 from arxiv_sanity_bot.schemas import ArxivPaper
+from arxiv_sanity_bot.telemetry.metrics import PAPERS_FETCHED, count_retries, timer
 
 
 logger = get_logger(__name__)
@@ -63,6 +66,7 @@ def get_all_abstracts(
     rows = _fetch_from_arxiv(after, before, chunk_size * max_pages)
 
     logger.info(f"Fetched {len(rows)} abstracts from Arxiv")
+    PAPERS_FETCHED.inc(len(rows), source="arxiv")
 
     if len(rows) == 0:
         return pd.DataFrame(), 0
@@ -105,7 +109,7 @@ def get_url(arxiv_id: str) -> str:
     wait=wait_exponential(
         multiplier=1, min=1, max=min(64, ARXIV_ZERO_RESULTS_MAX_WAIT_TIME)
     ),
-    before_sleep=_log_retry_attempt,
+    before_sleep=count_retries("arxiv_query", _log_retry_attempt),
     reraise=True,
 )
 def _fetch_from_arxiv(
@@ -138,10 +142,9 @@ def _fetch_from_arxiv(
         logger.debug("Fetching from Arxiv API", extra={"params": params})
 
         try:
-            response = requests.get(
-                "http://export.arxiv.org/api/query", params=params, timeout=30
-            )
-            response.raise_for_status()
+            with timer("arxiv_query", ARXIV_API_URL):
+                response = get_session().get(ARXIV_API_URL, params=params, timeout=30)
+                response.raise_for_status()
 
             root = ET.fromstring(response.content)
             entries = root.findall("{http://www.w3.org/2005/Atom}entry")
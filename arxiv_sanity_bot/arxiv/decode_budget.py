@@ -0,0 +1,101 @@
+import contextlib
+from typing import Iterator
+
+import pypdf  # type: ignore
+import pypdf.filters  # type: ignore
+
+from arxiv_sanity_bot.config import (
+    EXTRACTION_MAX_DECODED_MB,
+    EXTRACTION_MAX_PAGES,
+    EXTRACTION_MAX_PIXELS,
+)
+
+
+class BudgetExceeded(Exception):
+    """The extraction of a paper needs more than its DecodeBudget."""
+
+
+class DecodeBudget:
+    """
+    Limits on what the extraction of the image of one paper can decode:
+    bytes decompressed (bitmaps, rendered graphs), pixels decoded or rendered,
+    and pages scanned. Each charge is made before the work it pays for, so a
+    paper over budget is abandoned before the allocation, not after.
+    """
+
+    def __init__(self, max_bytes: int, max_pixels: int, max_pages: int):
+        self._max_bytes = max_bytes
+        self._max_pixels = max_pixels
+        self._max_pages = max_pages
+        self._bytes = 0
+        self._pixels = 0
+        self._pages: set[int] = set()
+
+    @property
+    def remaining_bytes(self) -> int:
+        return self._max_bytes - self._bytes
+
+    def scan_page(self, number: int) -> None:
+        """
+        Charge the scan of a page (once per page, even if it is scanned for
+        bitmaps and then for graphs).
+
+        :raise BudgetExceeded: if too many pages were scanned
+        """
+        self._pages.add(number)
+        if len(self._pages) > self._max_pages:
+            raise BudgetExceeded(f"more than {self._max_pages} pages scanned")
+
+    def decode(self, width: int, height: int, bytes_per_pixel: float) -> None:
+        """
+        Charge the decoding (or rendering) of a width x height image.
+
+        :raise BudgetExceeded: if it would exceed the bytes or the pixels
+        """
+        pixels = width * height
+        size = int(pixels * bytes_per_pixel)
+        if self._bytes + size > self._max_bytes:
+            raise BudgetExceeded(
+                f"{self._bytes + size} bytes decoded > {self._max_bytes}"
+            )
+        if self._pixels + pixels > self._max_pixels:
+            raise BudgetExceeded(
+                f"{self._pixels + pixels} pixels decoded > {self._max_pixels}"
+            )
+
+        self._bytes += size
+        self._pixels += pixels
+
+
+def paper_budget() -> DecodeBudget:
+    """The budget of the extraction of one paper, from the configuration."""
+    return DecodeBudget(
+        EXTRACTION_MAX_DECODED_MB * 1024 * 1024,
+        EXTRACTION_MAX_PIXELS,
+        EXTRACTION_MAX_PAGES,
+    )
+
+
+@contextlib.contextmanager
+def pypdf_output_limit(max_bytes: int) -> Iterator[None]:
+    """
+    Limit the bytes pypdf can decompress from one stream (it raises
+    LimitReachedError above), in this thread for pypdf versions with a
+    Configuration, in this process otherwise.
+    """
+    if hasattr(pypdf, "apply_configuration"):
+        with pypdf.apply_configuration(
+            zlib_maximum_output_length=max_bytes,
+            lzw_maximum_output_length=max_bytes,
+            run_length_maximum_output_length=max_bytes,
+            image_maximum_buffer_size=max_bytes,
+        ):
+            yield
+        return
+
+    previous = pypdf.filters.ZLIB_MAX_OUTPUT_LENGTH
+    pypdf.filters.ZLIB_MAX_OUTPUT_LENGTH = max_bytes
+    try:
+        yield
+    finally:
+        pypdf.filters.ZLIB_MAX_OUTPUT_LENGTH = previous
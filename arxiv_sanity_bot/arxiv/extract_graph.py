@@ -1,8 +1,20 @@
+import bisect
 import fitz  # type: ignore
-import os
-from typing import Any
-
+import heapq
+import math
+from collections import defaultdict
+from typing import Any, Iterable
+
+import numpy as np
+from PIL import Image
+
+from arxiv_sanity_bot.arxiv.decode_budget import (
+    BudgetExceeded,
+    DecodeBudget,
+    paper_budget,
+)
 from arxiv_sanity_bot.arxiv.image_validation import has_image_content
+from arxiv_sanity_bot.config import GRAPH_OVERSAMPLING, IMAGE_MAX_SIZE
 from arxiv_sanity_bot.logger import get_logger
 
 
@@ -11,57 +23,63 @@ logger = get_logger(__name__)
 
 PADDING = 7
 
+# The page is divided in GRID_SIZE x GRID_SIZE cells to find the rectangles
+# that a drawing may intersect (see _RectIndex)
+GRID_SIZE = 64
+
+# Graphs are never rendered above this zoom (3 x 72 dpi)
+MAX_ZOOM = 3
 
-def _enlarge_rect(p: dict[str, Any]) -> tuple[Any, Any]:
-    # import pdb;pdb.set_trace()
-    # print(p)
 
-    color = None
-    if p["color"]:
-        color = p["color"]
-    elif p["fill"]:
-        color = p["fill"]
+def _drawing_arrays(drawings: list[dict[str, Any]]) -> tuple[Any, Any]:
+    """
+    :param drawings: the output of page.get_cdrawings()
+    :return: the rectangles of the drawings enlarged by PADDING, as an (n, 4)
+    array of x0, y0, x1, y1, and an (n,) boolean array telling which of them
+    are not noise
+    """
+    n = len(drawings)
 
-    return p["rect"] + (-PADDING, -PADDING, PADDING, PADDING), color  # + (-w, -w, w, w)
+    rects = np.array([p["rect"] for p in drawings], dtype=float).reshape(n, 4)
+    rects += (-PADDING, -PADDING, PADDING, PADDING)
 
+    # The stroke color, or the fill color for filled shapes (NaN if none)
+    no_color = (np.nan, np.nan, np.nan)
+    colors = np.array(
+        [p.get("color") or p.get("fill") or no_color for p in drawings], dtype=float
+    ).reshape(n, 3)
 
-def is_grayish_or_blackish(
-    rgb: tuple[float, float, float], threshold: int = 20
-) -> bool:
-    r, g, b = rgb
-    if (max(r, g, b) - min(r, g, b)) <= (threshold / 255):
-        # If all values are equal, the color is a shade of gray
-        return True
-    elif r < 10 / 255 and g < 10 / 255 and b < 10 / 255:
-        # If all values are very low (close to 0), the color is black
-        return True
-    else:
-        # Otherwise, the color is not grayish or blackish
-        return False
+    return rects, _is_not_noise(rects, colors)
 
 
-def _good_aspect_ratio_gray(ratio: float) -> bool:
-    return 1 < ratio < 10
+def is_grayish_or_blackish(rgb: Any, threshold: int = 20) -> Any:
+    """
+    :param rgb: a color, or an (n, 3) array of colors
+    :return: whether the color (each color) is a shade of gray or close to
+    black
+    """
+    rgb = np.asarray(rgb, dtype=float)
 
+    # If all values are equal, the color is a shade of gray
+    gray = (rgb.max(axis=-1) - rgb.min(axis=-1)) <= (threshold / 255)
+    # If all values are very low (close to 0), the color is black
+    black = (rgb < 10 / 255).all(axis=-1)
 
-def _good_width_and_height(r: Any) -> bool:
-    return r.width > 50 and r.height > 50
+    return gray | black
 
 
-def _is_not_noise(r: Any, color: tuple[float, float, float] | None) -> bool:
-    ratio = r.width / (r.height + 1e-3)
-    area = r.width * r.height
+def _is_not_noise(rects: Any, colors: Any) -> Any:
+    width = np.maximum(rects[:, 2] - rects[:, 0], 0)
+    height = np.maximum(rects[:, 3] - rects[:, 1], 0)
+    ratio = width / (height + 1e-3)
+    area = width * height
 
-    # Black lines
-    if color is not None and is_grayish_or_blackish(color):
-        good_or_bad = (
-            _good_aspect_ratio_gray(ratio) and _good_width_and_height(r) and area > 1000
-        )
+    # Black lines must be large, with a good aspect ratio
+    gray = (1 < ratio) & (ratio < 10) & (width > 50) & (height > 50) & (area > 1000)
+    other = (ratio > 1) & (width > 1) & (height > 1) & (area > 0)
 
-        # print(f"{ratio} {area} {r.width} {r.height} -> {good_or_bad}")
-        return good_or_bad
-    else:
-        return (ratio > 1) and (r.width > 1) and (r.height > 1) and (area > 0)
+    # Colors that are NaN (no color) are not gray
+    return np.where(is_grayish_or_blackish(colors), gray, other)
 
 
 def _union_all_rectangles(new_rects: list[Any]) -> Any:
@@ -101,9 +119,17 @@ def _regularize_box(
     return x0, x1, y0, y1
 
 
-def extract_graph(pdf_path: str, arxiv_id: str) -> tuple[str | None, int | None]:
+def extract_graph(
+    pdf_path: str, arxiv_id: str, budget: DecodeBudget | None = None
+) -> tuple[Image.Image | None, int | None]:
+    """
+    :param budget: what the extraction can decode (default: paper_budget())
+    :raise BudgetExceeded: if the paper needs more
+    """
     try:
-        return _extract_graph(pdf_path, arxiv_id)
+        return _extract_graph(pdf_path, arxiv_id, budget or paper_budget())
+    except BudgetExceeded:
+        raise
     except Exception as e:
         logger.info(
             "Extraction of graph failed with an exception", extra={"exception": str(e)}
@@ -111,55 +137,176 @@ def extract_graph(pdf_path: str, arxiv_id: str) -> tuple[str | None, int | None]
         return None, None
 
 
-def _extract_graph(pdf_path: str, arxiv_id: str) -> tuple[str | None, int | None]:
-    doc = fitz.open(pdf_path)
+def _extract_graph(
+    pdf_path: str, arxiv_id: str, budget: DecodeBudget
+) -> tuple[Image.Image | None, int | None]:
+    with fitz.open(pdf_path) as doc:
+        for page in doc:
+            budget.scan_page(page.number)
+            image = extract_graph_from_page(page, arxiv_id, budget)
 
-    for page in doc:
+            if image is not None:
+                return image, page.number
 
-        new_rects = _get_bounding_boxes(page)
+    logger.info(f"No graph found for {arxiv_id}")
+    return None, None
 
-        if len(new_rects) == 0:
-            continue
 
-        image_path = _save_cutout(arxiv_id, new_rects, page)
+def extract_graph_from_page(
+    page: Any, arxiv_id: str, budget: DecodeBudget | None = None
+) -> Image.Image | None:
+    """
+    :param page: a PyMuPDF page
+    :param budget: charged with the rendering of the cutout
+    :return: the cutout of the graph on the page, or None if the page has no
+    graph
+    """
+    new_rects = _get_bounding_boxes(page)
 
-        if not has_image_content(image_path):
-            os.remove(image_path)
-            continue
+    if len(new_rects) == 0:
+        return None
 
-        logger.info(f"Found first graph for {arxiv_id}")
-        return image_path, page.number
+    image = _render_cutout(new_rects, page, budget)
 
-    logger.info(f"No graph found for {arxiv_id}")
-    return None, None
+    if not has_image_content(image):
+        return None
+
+    logger.info(f"Found first graph for {arxiv_id} on page {page.number}")
+    return image
 
 
-def _save_cutout(arxiv_id: str, new_rects: list[Any], page: Any) -> str:
+def _render_cutout(
+    new_rects: list[Any], page: Any, budget: DecodeBudget | None = None
+) -> Image.Image:
     all_r = _union_all_rectangles(new_rects)
-    mat = fitz.Matrix(3, 3)
+    clip = all_r & page.rect
+    zoom = _render_zoom(clip)
+    if budget is not None:
+        budget.decode(math.ceil(clip.width * zoom), math.ceil(clip.height * zoom), 3)
+    mat = fitz.Matrix(zoom, zoom)
     pix = page.get_pixmap(matrix=mat, clip=all_r)
-    image_path = f"graph-{arxiv_id}-page{page.number}.png"
-    pix.save(image_path)
-    return image_path
+    return Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
+
+
+def _render_zoom(clip: Any) -> float:
+    """
+    Zoom at which the longest side of the clip is GRAPH_OVERSAMPLING times
+    the size of the final image (it is downsampled later, see
+    _convert_to_jpeg), so that we do not rasterize pixels that are thrown
+    away. Small graphs are rendered at MAX_ZOOM.
+    """
+    longest_side = max(clip.width, clip.height)
+    if longest_side <= 0:
+        return MAX_ZOOM
+
+    return min(MAX_ZOOM, GRAPH_OVERSAMPLING * IMAGE_MAX_SIZE / longest_side)
 
 
 def _get_bounding_boxes(page: Any) -> list[Any]:
-    new_rects: list[Any] = []
+    """
+    Cluster the drawings of the page: each drawing is merged into the first
+    rectangle (in order of creation) it overlaps, or starts a new rectangle
+    if it is not noise.
+    """
+    rects, not_noise = _drawing_arrays(page.get_cdrawings())
+    index = _RectIndex(page.rect)
+
+    for r, keep in zip(rects.tolist(), not_noise.tolist()):
+        if r[0] >= r[2] or r[1] >= r[3]:
+            # Empty, so it overlaps nothing (not even itself)
+            if keep:
+                index.append(r)
+            continue
 
-    for p in page.get_drawings():
-        r, remainder, color = _process_drawing(new_rects, p)
+        i = index.first_overlapping(r)
+        if i is not None:
+            index.merge(i, r)
+        elif keep:
+            index.append(r)
 
-        if remainder == [] and _is_not_noise(r, color):
-            new_rects.append(r)
+    return [fitz.Rect(r) for r in index.rects]
 
-    return new_rects
 
+class _RectIndex:
+    """
+    Rectangles (as x0, y0, x1, y1 lists) in order of creation, with a grid
+    over the page listing the rectangles that touch each cell (sorted). A
+    rectangle can only overlap the rectangles listed in the cells it touches,
+    so clustering takes about linear time instead of quadratic.
+
+    Coordinates outside of the page fall in the cells on its border.
+    """
+
+    def __init__(self, page_rect: Any, grid_size: int = GRID_SIZE):
+        self.rects: list[list[float]] = []
+        self._x0, self._y0 = page_rect.x0, page_rect.y0
+        self._n = grid_size
+        self._cell_w = max(page_rect.width, 1) / grid_size
+        self._cell_h = max(page_rect.height, 1) / grid_size
+        self._cells: dict[tuple[int, int], list[int]] = defaultdict(list)
+        # Cells touched by each rectangle, as (i0, j0, i1, j1)
+        self._spans: list[tuple[int, int, int, int]] = []
+
+    def _span(self, r: Any) -> tuple[int, int, int, int]:
+        n = self._n - 1
+        return (
+            min(max(int((r[0] - self._x0) // self._cell_w), 0), n),
+            min(max(int((r[1] - self._y0) // self._cell_h), 0), n),
+            min(max(int((r[2] - self._x0) // self._cell_w), 0), n),
+            min(max(int((r[3] - self._y0) // self._cell_h), 0), n),
+        )
 
-def _process_drawing(new_rects: list[Any], p: Any) -> tuple[Any, list[Any], Any]:
-    r, color = _enlarge_rect(p)
-    for i in range(len(new_rects)):
-        if abs(r & new_rects[i]) > 0:
-            new_rects[i] |= r
-            break
-    remainder = [s for s in new_rects if r in s]
-    return r, remainder, color
+    def first_overlapping(self, r: Any) -> int | None:
+        """The first rectangle whose intersection with r has a positive area"""
+        i0, j0, i1, j1 = self._span(r)
+
+        candidates: Iterable[int]
+        if len(self.rects) <= (i1 - i0 + 1) * (j1 - j0 + 1):
+            # Large r and few rectangles: checking them all is cheaper
+            candidates = range(len(self.rects))
+        else:
+            cells = [
+                self._cells[(i, j)]
+                for i in range(i0, i1 + 1)
+                for j in range(j0, j1 + 1)
+                if (i, j) in self._cells
+            ]
+            # In order of creation, so we can stop at the first hit
+            candidates = cells[0] if len(cells) == 1 else heapq.merge(*cells)
+
+        x0, y0, x1, y1 = r
+        for k in candidates:
+            s = self.rects[k]
+            if max(s[0], x0) < min(s[2], x1) and max(s[1], y0) < min(s[3], y1):
+                return k
+
+        return None
+
+    def append(self, r: Any) -> None:
+        self.rects.append(list(r))
+        self._spans.append((0, 0, -1, -1))
+        self._index(len(self.rects) - 1)
+
+    def merge(self, k: int, r: Any) -> None:
+        s = self.rects[k]
+        s[0], s[1] = min(s[0], r[0]), min(s[1], r[1])
+        s[2], s[3] = max(s[2], r[2]), max(s[3], r[3])
+        self._index(k)
+
+    def _index(self, k: int) -> None:
+        # Rectangles only grow: add k to the cells it did not touch before
+        old_i0, old_j0, old_i1, old_j1 = old = self._spans[k]
+        i0, j0, i1, j1 = new = self._span(self.rects[k])
+
+        if new == old:
+            return
+
+        for i in range(i0, i1 + 1):
+            if old_i0 <= i <= old_i1:
+                columns = [*range(j0, old_j0), *range(old_j1 + 1, j1 + 1)]
+            else:
+                columns = list(range(j0, j1 + 1))
+            for j in columns:
+                bisect.insort(self._cells[(i, j)], k)
+
+        self._spans[k] = new
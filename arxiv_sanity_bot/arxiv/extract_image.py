@@ -1,87 +1,474 @@
+import io
 import os
-from typing import Any
+import shutil
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Iterable
 
 import arxiv  # type: ignore
+import fitz  # type: ignore
 import pypdf  # type: ignore
 import pypdf.errors  # type: ignore
-import pypdf.filters  # type: ignore
+import requests
 from PIL import Image
 import tenacity
 
-from arxiv_sanity_bot.arxiv.extract_graph import extract_graph
+from arxiv_sanity_bot.arxiv.extract_graph import extract_graph, extract_graph_from_page
+from arxiv_sanity_bot.arxiv.decode_budget import (
+    BudgetExceeded,
+    DecodeBudget,
+    paper_budget,
+    pypdf_output_limit,
+)
+from arxiv_sanity_bot.arxiv.extraction_pool import ExtractionPool
+from arxiv_sanity_bot.arxiv.image_candidates import (
+    ImageCandidate,
+    pymupdf_candidates,
+    pypdf_candidates,
+    rank_candidates,
+)
+from arxiv_sanity_bot.arxiv.paper_cache import PaperCache
+from arxiv_sanity_bot.arxiv.pdf_download import download_pdf
 from arxiv_sanity_bot.arxiv.image_validation import has_image_content, is_uploadable
-from arxiv_sanity_bot.config import ARXIV_NUM_RETRIES
+from arxiv_sanity_bot.config import (
+    ARXIV_API_URL,
+    ARXIV_NUM_RETRIES,
+    ARXIV_PDF_URL,
+    EXTRACTION_MEMORY_MB,
+    EXTRACTION_TIMEOUT,
+    EXTRACTION_WORKERS,
+    GRAPH_OVERSAMPLING,
+    IMAGE_CACHE_SIZE,
+    IMAGE_EXTRACTION_ENGINE,
+    IMAGE_MAX_SIZE,
+    IMAGE_WORKSPACE_DIR,
+    PAPER_CACHE_DIR,
+    PAPER_CACHE_MAX_AGE,
+    PAPER_CACHE_MAX_MB,
+    PDF_CACHE_SIZE,
+)
 from arxiv_sanity_bot.logger import get_logger
+from arxiv_sanity_bot.lru import LRUCache
+from arxiv_sanity_bot.telemetry.memory import track_memory
+from arxiv_sanity_bot.telemetry.metrics import count_retries, timed, timer
+from arxiv_sanity_bot.telemetry.tracing import propagate, span
 
 
 logger = get_logger(__name__)
 
-# Increase pypdf decompression limit to handle highly compressed images
-# Default is 75 MB, we increase to 100 MB to handle edge cases
-pypdf.filters.ZLIB_MAX_OUTPUT_LENGTH = 100_000_000  # 100 MB
+# PDFs downloaded by this process, keyed by arxiv ID. Long-running processes
+# (the daemon) reuse them instead of downloading the same paper every cycle
+# (see _evict_pdf)
+_PDF_CACHE: LRUCache[str, str] = LRUCache(
+    PDF_CACHE_SIZE, on_evict=lambda arxiv_id, path: _evict_pdf(path)
+)
+
+# Outcome of extract_first_image for downloaded papers (None means "no
+# image"), so that several profiles posting the same paper extract it once
+_IMAGE_CACHE: LRUCache[str, str | None] = LRUCache(IMAGE_CACHE_SIZE)
+
+# Temporary directories with the final JPEGs (see image_workspace) and the
+# PDFs downloaded
+_WORKSPACE: tempfile.TemporaryDirectory | None = None
+_DOWNLOADS: tempfile.TemporaryDirectory | None = None
+
+# On-disk cache of the PDFs and of the extracted images, see _paper_cache
+_PAPER_CACHE: PaperCache | None = None
+
+# Returned by the extraction pool when an extraction fails (as opposed to
+# finding no image), so that the failure is not cached
+_FAILED = object()
+
+# Worker processes for the extraction, see _extraction_pool
+_POOL: ExtractionPool | None = None
+_POOL_LOCK = threading.Lock()
+
+# PyMuPDF is not thread-safe: extractions in this process run one at a time
+_IN_PROCESS_LOCK = threading.Lock()
 
+# Extractions started by prefetch_first_images, by arxiv ID
+_PREFETCHED: dict[str, Future] = {}
+_PREFETCH_POOL: ThreadPoolExecutor | None = None
 
-def extract_first_image(arxiv_id: str, pdf_path: str | None = None) -> str | None:
+
+def image_workspace() -> str:
+    """
+    The directory where the images attached to the tweets are written. It is
+    created on first use and removed when the process exits.
+
+    Worker processes should be given the workspace of their parent (see
+    extract_first_image), so that their images outlive them.
+    """
+    global _WORKSPACE
+
+    if _WORKSPACE is None:
+        _WORKSPACE = tempfile.TemporaryDirectory(
+            prefix="arxiv-sanity-bot-images-", dir=IMAGE_WORKSPACE_DIR
+        )
+
+    return _WORKSPACE.name
+
+
+def extract_first_image(
+    arxiv_id: str, pdf_path: str | None = None, workspace: str | None = None
+) -> str | None:
     """
     Extract the first image from the PDF.
 
     If the PDF contains both an image and a graph, the first that is encountered is returned. If both the image and
     the graph are on the same page, the image is returned.
 
+    Candidates are decoded, validated and converted in memory: only the final
+    JPEG is written to disk.
+
+    The PDF is parsed in a worker process (see _extraction_pool): if that
+    fails, hangs or runs out of memory, the paper has no image.
+
     :param arxiv_id: the arxiv ID
+    :param workspace: where to write the image (default: image_workspace())
     :return: the path to the first image as a local file, or None if none was found
     """
 
     if pdf_path is None:
-        pdf_path = download_paper(arxiv_id)
+        prefetched = _PREFETCHED.pop(arxiv_id, None)
+        if prefetched is not None:
+            return prefetched.result()
+
+        return _download_and_extract(arxiv_id, workspace)
+
+    image = _extract_first_image(arxiv_id, pdf_path, workspace)
+    return None if image is _FAILED else image
+
+
+def prefetch_first_images(arxiv_ids: Iterable[str]) -> None:
+    """
+    Start downloading and extracting the first image of the papers in the
+    background, so that the extractions run in parallel in the worker
+    processes and extract_first_image(arxiv_id) finds them done.
+
+    Nothing is prefetched when the extraction runs in this process (see
+    EXTRACTION_WORKERS).
+    """
+    global _PREFETCH_POOL
+
+    if _extraction_pool() is None:
+        return
+
+    with _POOL_LOCK:
+        if _PREFETCH_POOL is None:
+            _PREFETCH_POOL = ThreadPoolExecutor(
+                max_workers=EXTRACTION_WORKERS, thread_name_prefix="prefetch"
+            )
+
+    for arxiv_id in arxiv_ids:
+        if arxiv_id not in _PREFETCHED and arxiv_id not in _IMAGE_CACHE:
+            _PREFETCHED[arxiv_id] = _PREFETCH_POOL.submit(
+                propagate(_download_and_extract), arxiv_id, None
+            )
+
+
+def _download_and_extract(arxiv_id: str, workspace: str | None) -> str | None:
+    if arxiv_id in _IMAGE_CACHE:
+        cached = _IMAGE_CACHE[arxiv_id]
+        if cached is None or os.path.exists(cached):
+            logger.debug(f"Using cached image for {arxiv_id}")
+            return cached
+
+    image = _extract_first_image(arxiv_id, _get_pdf(arxiv_id), workspace)
+    if image is _FAILED:
+        # Not cached: the next cycle tries again
+        return None
+
+    _IMAGE_CACHE[arxiv_id] = image
+    return image
+
 
+def _extract_first_image(
+    arxiv_id: str, pdf_path: str | None, workspace: str | None
+) -> Any:
+    """
+    :return: the path to the image, None if the paper has none, or _FAILED
+        if the extraction failed
+    """
     if pdf_path is None:
         return None
 
+    workspace = workspace or image_workspace()
+
+    cache = _paper_cache()
+    if cache is not None:
+        cached, image = cache.get_image(pdf_path, IMAGE_EXTRACTION_ENGINE)
+        if cached:
+            logger.debug(f"Using cached extraction for {arxiv_id}")
+            return _copy_to_workspace(arxiv_id, image, workspace)
+
+    with span("extract_image", arxiv_id=arxiv_id):
+        pool = _extraction_pool()
+        if pool is not None:
+            image = pool.run(
+                _extract_first_image_from_pdf,
+                arxiv_id,
+                pdf_path,
+                workspace,
+                default=_FAILED,
+            )
+            if image is _FAILED:
+                return _FAILED
+        else:
+            with _IN_PROCESS_LOCK:
+                image = _extract_first_image_from_pdf(arxiv_id, pdf_path, workspace)
+
+    if cache is not None:
+        cache.put_image(pdf_path, IMAGE_EXTRACTION_ENGINE, image)
+
+    return image
+
+
+def _copy_to_workspace(arxiv_id: str, image: str | None, workspace: str) -> str | None:
+    if image is None:
+        return None
+
+    filename = os.path.join(workspace, f"{arxiv_id}_image1.jpg")
+    shutil.copyfile(image, filename)
+    return filename
+
+
+def _paper_cache() -> PaperCache | None:
+    """
+    The on-disk cache of the PDFs and of the extracted images, in
+    PAPER_CACHE_DIR, or None if it is not set.
+    """
+    global _PAPER_CACHE
+
+    with _POOL_LOCK:
+        if _PAPER_CACHE is None and PAPER_CACHE_DIR is not None:
+            _PAPER_CACHE = PaperCache(
+                PAPER_CACHE_DIR,
+                PAPER_CACHE_MAX_MB * 1024 * 1024,
+                PAPER_CACHE_MAX_AGE,
+            )
+
+    return _PAPER_CACHE
+
+
+def _extraction_pool() -> ExtractionPool | None:
+    """
+    The worker processes running _extract_first_image_from_pdf, with a
+    timeout (EXTRACTION_TIMEOUT) and a memory limit (EXTRACTION_MEMORY_MB),
+    or None if EXTRACTION_WORKERS is 0.
+    """
+    global _POOL
+
+    with _POOL_LOCK:
+        if _POOL is None and EXTRACTION_WORKERS > 0:
+            _POOL = ExtractionPool(
+                EXTRACTION_WORKERS,
+                EXTRACTION_TIMEOUT,
+                EXTRACTION_MEMORY_MB,
+            )
+
+    return _POOL
+
+
+def _extract_first_image_from_pdf(
+    arxiv_id: str, pdf_path: str, workspace: str
+) -> str | None:
+    # Measured where the PDF is decoded: in the worker process, when there
+    # is an extraction pool (see ExtractionPool)
+    with track_memory("extract_image", arxiv_id=arxiv_id):
+        return _save_first_image(arxiv_id, pdf_path, workspace)
+
+
+def _save_first_image(arxiv_id: str, pdf_path: str, workspace: str) -> str | None:
+    budget = paper_budget()
+    try:
+        if IMAGE_EXTRACTION_ENGINE == "pypdf":
+            image = _find_first_image_or_graph_pypdf(arxiv_id, pdf_path, budget)
+        else:
+            image = _find_first_image_or_graph(arxiv_id, pdf_path, budget)
+    except BudgetExceeded as e:
+        logger.info(f"Skipping the image of {arxiv_id}: {e}")
+        return None
+    finally:
+        # MuPDF keeps decoded images in a store shared by all documents (up
+        # to 256 MB): empty it between papers
+        fitz.TOOLS.store_shrink(100)
+
+    if image is None:
+        return None
+
+    try:
+        jpeg = _convert_to_jpeg(image)
+    except Exception as e:
+        logger.info(f"Failed to convert image for {arxiv_id}: {type(e).__name__}: {e}")
+        return None
+
+    if not is_uploadable(jpeg):
+        logger.info(f"Image for {arxiv_id} rejected by upload validator")
+        return None
+
+    filename = os.path.join(workspace, f"{arxiv_id}_image1.jpg")
+    with open(filename, "wb") as f:
+        f.write(jpeg)
+    logger.info(f"Image for {arxiv_id} saved in {filename}")
+
+    return filename
+
+
+def _find_first_image_or_graph(
+    arxiv_id: str, pdf_path: str, budget: DecodeBudget
+) -> Image.Image | None:
+    """
+    Open the PDF once with PyMuPDF and look at each page for a bitmap, then
+    for a graph, stopping at the first page that has either (so an image
+    wins over a graph on the same page, like in _select_image_or_graph).
+
+    :raise BudgetExceeded: if the paper needs more than budget
+    """
+    try:
+        doc = fitz.open(pdf_path)
+    except Exception as e:
+        logger.info(
+            f"Could not open the PDF of {arxiv_id}: {type(e).__name__}",
+            extra={"exception": str(e)},
+        )
+        return None
+
+    with doc:
+        for page in doc:
+            budget.scan_page(page.number)
+            image = _decode_first_bitmap(arxiv_id, doc, page, budget)
+            if image is not None:
+                return image
+
+            try:
+                image = extract_graph_from_page(page, arxiv_id, budget)
+            except BudgetExceeded:
+                raise
+            except Exception as e:
+                logger.info(
+                    "Extraction of graph failed with an exception",
+                    extra={"exception": str(e), "page": page.number},
+                )
+                continue
+
+            if image is not None:
+                return image
+
+    return no_image_or_graph(None, None, None, None)
+
+
+def _decode_first_bitmap(
+    arxiv_id: str, doc: Any, page: Any, budget: DecodeBudget
+) -> Image.Image | None:
+    # Same rules as _decode_first_image, on the images referenced by the page
+    for candidate in rank_candidates(pymupdf_candidates(doc, page), IMAGE_MAX_SIZE):
+        _charge(budget, candidate)
+        try:
+            image = doc.extract_image(candidate.key)
+        except Exception as e:
+            logger.error(
+                f"Failed to extract bitmap image for {arxiv_id}: {type(e).__name__}",
+                exc_info=True,
+                extra={"arxiv_id": arxiv_id, "error_type": type(e).__name__},
+            )
+            continue
+
+        if not image:
+            continue
+
+        logger.info(f"Found first bitmap image for {arxiv_id}")
+        bitmap = _decode(arxiv_id, image["image"])
+
+        if bitmap is None or not has_image_content(bitmap):
+            continue
+
+        return bitmap
+
+    return None
+
+
+def _decode(arxiv_id: str, data: bytes) -> Image.Image | None:
+    """
+    JPEGs are decoded at a reduced scale (1/2, 1/4 or 1/8), down to
+    GRAPH_OVERSAMPLING times the final size, as Image.thumbnail would do
+    when converting them (see _convert_to_jpeg).
+    """
+    size = GRAPH_OVERSAMPLING * IMAGE_MAX_SIZE
+    try:
+        image = Image.open(io.BytesIO(data))
+        image.draft(None, (size, size))
+        image.load()
+    except Exception as e:
+        logger.info(
+            f"Could not decode bitmap image for {arxiv_id}: {type(e).__name__}",
+            extra={"exception": str(e)},
+        )
+        return None
+
+    return image
+
+
+def _find_first_image_or_graph_pypdf(
+    arxiv_id: str, pdf_path: str, budget: DecodeBudget
+) -> Image.Image | None:
     # Find first bitmap (if any)
-    image_file, image_page_number = extract_image(pdf_path, arxiv_id)
+    image_file, image_page_number = extract_image(pdf_path, arxiv_id, budget)
 
     # Find first graph (if any)
-    graph_file, graph_page_number = extract_graph(pdf_path, arxiv_id)
+    graph_file, graph_page_number = extract_graph(pdf_path, arxiv_id, budget)
 
     # We select whichever comes first.
-    filename = _select_image_or_graph(
+    return _select_image_or_graph(
         graph_file, graph_page_number, image_file, image_page_number
     )
 
-    if filename is not None:
-        new_filename = f"{arxiv_id}_image1.jpg"
-        try:
-            _convert_to_jpeg(filename, new_filename)
-        except Exception as e:
-            logger.info(
-                f"Failed to convert image for {arxiv_id}: {type(e).__name__}: {e}"
-            )
-            return None
-        if not is_uploadable(new_filename):
-            logger.info(f"Image for {arxiv_id} rejected by upload validator")
-            os.remove(new_filename)
-            return None
-        return new_filename
-
-    else:
-        return None
+
+def _get_pdf(arxiv_id: str) -> str | None:
+    cached = _PDF_CACHE.get(arxiv_id)
+    if cached is not None and os.path.exists(cached):
+        logger.debug(f"Using cached PDF for {arxiv_id}", extra={"pdf_path": cached})
+        return cached
+
+    pdf_path = download_paper(arxiv_id)
+    if pdf_path is not None:
+        _PDF_CACHE[arxiv_id] = pdf_path
+
+    return pdf_path
 
 
-def _convert_to_jpeg(input_path: str, output_path: str):
-    with Image.open(input_path) as img:
-        max_size = 500
-        if max(img.size) > max_size:
-            img.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
-        img.convert("RGB").save(output_path, "JPEG", quality=85)
+def _evict_pdf(pdf_path: str) -> None:
+    # Downloads are removed with the cache entry, but not the PDFs of the
+    # paper cache, which has its own eviction
+    if _DOWNLOADS is None or os.path.dirname(pdf_path) != _DOWNLOADS.name:
+        return
+
+    try:
+        os.remove(pdf_path)
+    except OSError:
+        pass
+
+
+def _convert_to_jpeg(img: Image.Image) -> bytes:
+    """
+    :param img: the image, downsized in place to IMAGE_MAX_SIZE
+    :return: the image encoded as JPEG
+    """
+    if max(img.size) > IMAGE_MAX_SIZE:
+        img.thumbnail((IMAGE_MAX_SIZE, IMAGE_MAX_SIZE), Image.Resampling.LANCZOS)
+
+    buffer = io.BytesIO()
+    img.convert("RGB").save(buffer, "JPEG", quality=85)
+    return buffer.getvalue()
 
 
 def select_first_image(
-    graph_file: str | None,
+    graph_file: Image.Image | None,
     graph_page_number: int | None,
-    image_file: str | None,
+    image_file: Image.Image | None,
     image_page_number: int | None,
-) -> str | None:
+) -> Image.Image | None:
     logger.info(
         "Found both bitmap and graph images. Selecting the one that comes first"
     )
@@ -91,41 +478,41 @@ def select_first_image(
 
 
 def select_graph(
-    graph_file: str | None,
+    graph_file: Image.Image | None,
     graph_page_number: int | None,
-    image_file: str | None,
+    image_file: Image.Image | None,
     image_page_number: int | None,
-) -> str | None:
+) -> Image.Image | None:
     logger.info("Only graph found. Selecting that")
     return graph_file
 
 
 def select_image(
-    graph_file: str | None,
+    graph_file: Image.Image | None,
     graph_page_number: int | None,
-    image_file: str | None,
+    image_file: Image.Image | None,
     image_page_number: int | None,
-) -> str | None:
+) -> Image.Image | None:
     logger.info("Only bitmap image found. Selecting that")
     return image_file
 
 
 def no_image_or_graph(
-    graph_file: str | None,
+    graph_file: Image.Image | None,
     graph_page_number: int | None,
-    image_file: str | None,
+    image_file: Image.Image | None,
     image_page_number: int | None,
-) -> str | None:
+) -> Image.Image | None:
     logger.info("NO IMAGE NOR GRAPH FOUND")
     return None
 
 
 def _select_image_or_graph(
-    graph_file: str | None,
+    graph_file: Image.Image | None,
     graph_page_number: int | None,
-    image_file: str | None,
+    image_file: Image.Image | None,
     image_page_number: int | None,
-) -> str | None:
+) -> Image.Image | None:
     # My logic
     if image_file is not None and graph_file is not None:
         return select_first_image(
@@ -145,57 +532,76 @@ def _select_image_or_graph(
     )
 
 
-def extract_image(pdf_path: str, arxiv_id: str) -> tuple[str | None, int]:
+def extract_image(
+    pdf_path: str, arxiv_id: str, budget: DecodeBudget | None = None
+) -> tuple[Image.Image | None, int]:
+    """
+    :param budget: what the extraction can decode (default: paper_budget())
+    :raise BudgetExceeded: if the paper needs more
+    """
     # Open the PDF file in binary mode
     with open(pdf_path, "rb") as pdf_file:
         # Create a PDF reader object
         pdf_reader = pypdf.PdfReader(pdf_file)
 
         # Find first  image
-        filename, page_number = _search_first_image_in_pages(arxiv_id, pdf_reader)
+        image, page_number = _search_first_image_in_pages(
+            arxiv_id, pdf_reader, budget or paper_budget()
+        )
 
-    return filename, page_number
+    return image, page_number
 
 
 def _search_first_image_in_pages(
-    arxiv_id: str, pdf_reader: Any
-) -> tuple[str | None, int]:
-    filename: str | None = None
+    arxiv_id: str, pdf_reader: Any, budget: DecodeBudget
+) -> tuple[Image.Image | None, int]:
+    image: Image.Image | None = None
     page_number: int = -1
 
     for page_number, page in enumerate(pdf_reader.pages):
-        # pypdf does not support non-rectangular images
-        # if one is found, we skip that page
+        budget.scan_page(page_number)
+        # Broken resources: we skip that page
         try:
-            images = page.images
-
-        except (pypdf.errors.PyPdfError, OSError):
+            candidates = rank_candidates(pypdf_candidates(page), IMAGE_MAX_SIZE)
+        except (pypdf.errors.PyPdfError, OSError, ValueError, TypeError):
             continue
 
-        if len(images) > 0:
-            filename = _save_first_image(arxiv_id, page)
-            if filename is not None:
+        if len(candidates) > 0:
+            image = _decode_first_image(arxiv_id, page, candidates, budget)
+            if image is not None:
                 break
 
-    return filename, page_number
+    return image, page_number
 
 
-def _save_first_image(arxiv_id: str, page: Any) -> str | None:
+def _decode_first_image(
+    arxiv_id: str, page: Any, candidates: list[ImageCandidate], budget: DecodeBudget
+) -> Image.Image | None:
+    """
+    Decode the candidates (see image_candidates.py) in turn, until one has
+    content. Only the images decoded are decompressed, each at most up to
+    what is left of the budget.
+    """
     try:
-        for image in page.images:
-            if len(image.data) < 1024:
-                continue
+        for candidate in candidates:
+            limit = budget.remaining_bytes
+            _charge(budget, candidate)
+            try:
+                with pypdf_output_limit(limit):
+                    image = page.images[candidate.key]
+            except pypdf.errors.LimitReachedError as e:
+                raise BudgetExceeded(f"{candidate.key} decompresses to more") from e
             logger.info(f"Found first bitmap image for {arxiv_id}")
-            extension = os.path.splitext(image.name)[-1]
-            filename = f"{arxiv_id}_first_image{extension}"
-            with open(filename, "wb") as image_file:
-                image_file.write(image.data)
-            logger.info(f"Bitmap image saved in {filename}")
-            if not has_image_content(filename):
-                os.remove(filename)
+            bitmap = _decode(arxiv_id, image.data)
+            if bitmap is None or not has_image_content(bitmap):
                 continue
-            return filename
-    except (pypdf.errors.PyPdfError, pypdf.errors.LimitReachedError, OSError) as e:
+            return bitmap
+    except (
+        pypdf.errors.PyPdfError,
+        pypdf.errors.LimitReachedError,
+        OSError,
+        KeyError,
+    ) as e:
         logger.error(
             f"Failed to extract bitmap image for {arxiv_id}: {type(e).__name__}",
             exc_info=True,
@@ -204,6 +610,15 @@ def _save_first_image(arxiv_id: str, page: Any) -> str | None:
     return None
 
 
+def _charge(budget: DecodeBudget, candidate: ImageCandidate) -> None:
+    # Decoded to at least one byte per component
+    budget.decode(
+        candidate.width,
+        candidate.height,
+        candidate.components * max(candidate.bits, 8) / 8,
+    )
+
+
 def _log_arxiv_retry(retry_state: tenacity.RetryCallState) -> None:
     exc = retry_state.outcome.exception() if retry_state.outcome else None
     sleep_for = getattr(retry_state.next_action, "sleep", None)
@@ -223,12 +638,65 @@ def _log_arxiv_retry(retry_state: tenacity.RetryCallState) -> None:
 @tenacity.retry(
     wait=tenacity.wait_exponential(multiplier=1, min=2, max=120),
     stop=tenacity.stop_after_attempt(ARXIV_NUM_RETRIES),
-    before_sleep=_log_arxiv_retry,
+    before_sleep=count_retries("arxiv_download", _log_arxiv_retry),
     reraise=True,
 )
+@timed("arxiv_download", ARXIV_PDF_URL)
 def download_paper(arxiv_id: str) -> str:
-    search = arxiv.Search(id_list=[arxiv_id])
-    paper = next(search.results())
+    """
+    Download the PDF of the paper (the latest version, unless arxiv_id has
+    one) straight from ARXIV_PDF_URL, streaming it to a temporary directory.
+    A retry resumes the transfer where the previous attempt stopped.
+
+    The arXiv API is only queried if the PDF cannot be found under arxiv_id,
+    to resolve its version.
+
+    PDFs are kept in the paper cache (see _paper_cache), if enabled, and
+    only downloaded if they are not there.
+
+    :return: the path to the PDF
+    """
+    cache = _paper_cache()
+    if cache is not None:
+        cached = cache.get_pdf(arxiv_id)
+        if cached is not None:
+            return cached
+
+    path = os.path.join(_download_dir(), f"{arxiv_id.replace('/', '_')}.pdf")
     logger.info(f"Downloading paper {arxiv_id}")
 
-    return paper.download_pdf()
+    try:
+        download_pdf(f"{ARXIV_PDF_URL}/{arxiv_id}", path)
+    except requests.HTTPError as e:
+        if e.response is None or e.response.status_code != 404:
+            raise
+
+        versioned_id = _resolve_version(arxiv_id)
+        logger.info(f"PDF of {arxiv_id} not found, downloading {versioned_id}")
+        download_pdf(f"{ARXIV_PDF_URL}/{versioned_id}", path)
+
+    if cache is not None:
+        return cache.put_pdf(arxiv_id, path)
+
+    return path
+
+
+def _resolve_version(arxiv_id: str) -> str:
+    with timer("arxiv_query", ARXIV_API_URL):
+        client = arxiv.Client()
+        client.query_url_format = f"{ARXIV_API_URL}?{{}}"
+        paper = next(client.results(arxiv.Search(id_list=[arxiv_id])))
+
+    return paper.get_short_id()
+
+
+def _download_dir() -> str:
+    # Like image_workspace, for the PDFs
+    global _DOWNLOADS
+
+    if _DOWNLOADS is None:
+        _DOWNLOADS = tempfile.TemporaryDirectory(
+            prefix="arxiv-sanity-bot-pdfs-", dir=IMAGE_WORKSPACE_DIR
+        )
+
+    return _DOWNLOADS.name
@@ -0,0 +1,192 @@
+import multiprocessing
+import queue
+from multiprocessing.connection import Connection
+from typing import Any, Callable
+
+from arxiv_sanity_bot.logger import get_logger
+from arxiv_sanity_bot.telemetry import memory
+from arxiv_sanity_bot.telemetry.metrics import EXTRACTION_FAILURES
+from arxiv_sanity_bot.telemetry.tracing import propagate_to_process
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None  # type: ignore[assignment]
+
+
+logger = get_logger(__name__)
+
+
+class ExtractionPool:
+    """
+    Worker processes running an extraction (e.g. of the first image of a
+    PDF), each call with a wall-clock timeout and each worker with a memory
+    limit. A worker that times out or dies (out of memory, or a crash in
+    PyMuPDF) is killed and replaced, and the call returns None, so that a
+    pathological PDF costs one paper its image instead of the whole run.
+
+    Calls can be made from several threads: up to ``workers`` of them run
+    in parallel. Workers are started on first use, from a fork server so that
+    they do not inherit the memory and the threads of this process. They
+    track their memory (see telemetry/memory.py) if this process does when
+    they start.
+    """
+
+    def __init__(self, workers: int, timeout: float, memory_mb: float | None = None):
+        """
+        :param timeout: seconds before a call is abandoned and its worker
+        killed
+        :param memory_mb: how much address space each worker can allocate
+        (above what it uses after importing the modules of its first
+        function), or None for no limit
+        """
+        self._timeout = timeout
+        self._memory_mb = memory_mb
+        self._context = multiprocessing.get_context(
+            "forkserver"
+            if "forkserver" in multiprocessing.get_all_start_methods()
+            else "spawn"
+        )
+
+        # Workers waiting for a call (None for a worker not started yet)
+        self._idle: queue.Queue[_Worker | None] = queue.Queue()
+        for _ in range(workers):
+            self._idle.put(None)
+        self._workers = workers
+
+    def run(self, func: Callable[..., Any], *args: Any, default: Any = None) -> Any:
+        """
+        :param func: the extraction, a module-level function (it is pickled
+        by reference). Its result must be picklable
+        :param default: returned if the call fails
+        :return: the result of func(*args), or default if it failed, timed
+        out or its worker died
+        """
+        worker = self._idle.get()
+        try:
+            if worker is None:
+                worker = _Worker(self._context, self._memory_mb)
+            return worker.call(propagate_to_process(func), args, self._timeout, default)
+        except _WorkerLost as e:
+            EXTRACTION_FAILURES.inc(reason=e.reason)
+            logger.warning(
+                f"Extraction worker {e.reason}, replacing it",
+                extra={"call_args": repr(args), "timeout": self._timeout},
+            )
+            if worker is not None:
+                worker.kill()
+            worker = None
+            return default
+        finally:
+            self._idle.put(worker)
+
+    def close(self) -> None:
+        """Stop the workers (waiting for the calls in progress)."""
+        for _ in range(self._workers):
+            worker = self._idle.get()
+            if worker is not None:
+                worker.kill()
+
+        for _ in range(self._workers):
+            self._idle.put(None)
+
+    def __enter__(self) -> "ExtractionPool":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+class _WorkerLost(Exception):
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class _Worker:
+    def __init__(self, context: Any, memory_mb: float | None):
+        # Module state, which the fork server does not pass on
+        memory_budget_mb = memory.budget_mb() if memory.is_enabled() else None
+
+        self._conn, child_conn = context.Pipe()
+        self._process = context.Process(
+            target=_serve,
+            args=(child_conn, memory_mb, memory_budget_mb),
+            name="extraction-worker",
+            daemon=True,
+        )
+        self._process.start()
+        child_conn.close()
+
+    def call(
+        self,
+        func: Callable[..., Any],
+        args: tuple[Any, ...],
+        timeout: float,
+        default: Any,
+    ) -> Any:
+        try:
+            self._conn.send((func, args))
+            # True as well when the worker died (recv then raises EOFError)
+            if not self._conn.poll(timeout):
+                raise _WorkerLost("timed out")
+            ok, result = self._conn.recv()
+        except (EOFError, OSError):
+            raise _WorkerLost("died")
+
+        if not ok:
+            EXTRACTION_FAILURES.inc(reason="error")
+            logger.info(f"Extraction failed in worker: {result}")
+            return default
+
+        return result
+
+    def kill(self) -> None:
+        self._process.kill()
+        self._process.join()
+        self._conn.close()
+
+
+def _serve(
+    conn: Connection, memory_mb: float | None, memory_budget_mb: float | None
+) -> None:
+    limited = False
+
+    while True:
+        try:
+            func, args = conn.recv()
+        except EOFError:
+            # The pool is gone
+            return
+
+        # Once the modules of func are imported (when it was unpickled), so
+        # that the limit is what the extraction itself can allocate
+        if not limited and memory_mb is not None and resource is not None:
+            _limit_memory(memory_mb)
+            limited = True
+        # Likewise: tracemalloc would slow the imports down a lot
+        if memory_budget_mb is not None and not memory.is_enabled():
+            memory.enable(budget_mb=memory_budget_mb)
+
+        try:
+            result = (True, func(*args))
+        except MemoryError:
+            # Memory may be too fragmented to go on: let the pool replace us
+            return
+        except Exception as e:
+            result = (False, f"{type(e).__name__}: {e}")
+
+        conn.send(result)
+
+
+def _limit_memory(memory_mb: float) -> None:
+    # On top of the address space in use, which depends on what the fork
+    # server imported (e.g. the main module)
+    try:
+        with open("/proc/self/statm") as f:
+            used = int(f.read().split()[0]) * resource.getpagesize()
+    except OSError:
+        used = 0
+
+    limit = used + int(memory_mb * 1024 * 1024)
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
@@ -0,0 +1,197 @@
+import dataclasses
+import re
+from typing import Any
+
+import pypdf.generic  # type: ignore
+from PIL import Image
+
+from arxiv_sanity_bot.arxiv.image_validation import fits_upload_envelope
+from arxiv_sanity_bot.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+
+# Smaller streams are icons, rules or logos, not figures
+MIN_IMAGE_BYTES = 1024
+
+# Bilevel images: scanned text, stencils. They can be figures, but rarely
+_BILEVEL_FILTERS = {"/JBIG2Decode", "/CCITTFaxDecode"}
+
+
+@dataclasses.dataclass
+class ImageCandidate:
+    """
+    An image of a page, as described by its stream dictionary (nothing is
+    decompressed to build it).
+    """
+
+    # What the library decodes it from: the xref with PyMuPDF, the name in
+    # page.images with pypdf
+    key: Any
+    width: int
+    height: int
+    # Of the stream, compressed
+    length: int
+    filters: tuple[str, ...]
+    bits: int
+    stencil: bool
+    # Of the decoded pixels (an estimate, for DecodeBudget)
+    components: int = 3
+
+    @property
+    def bilevel(self) -> bool:
+        return (
+            self.stencil or self.bits == 1 or bool(_BILEVEL_FILTERS & set(self.filters))
+        )
+
+
+def rank_candidates(
+    candidates: list[ImageCandidate], max_size: int
+) -> list[ImageCandidate]:
+    """
+    The images worth decoding, in the order to try them: those of the page
+    that can make an image to post (not tiny, not too large to decode, with
+    dimensions that can be uploaded once downsized to max_size), in the
+    order of the page, bilevel images last.
+    """
+    ranked = [
+        c
+        for c in candidates
+        if c.length >= MIN_IMAGE_BYTES
+        # Pillow has no limit if MAX_IMAGE_PIXELS is None
+        and (
+            Image.MAX_IMAGE_PIXELS is None
+            or c.width * c.height <= Image.MAX_IMAGE_PIXELS
+        )
+        and fits_upload_envelope(c.width, c.height, max_size)
+    ]
+
+    if len(ranked) < len(candidates):
+        logger.debug(
+            f"Skipped {len(candidates) - len(ranked)} of {len(candidates)} images "
+            "without decoding them"
+        )
+
+    return sorted(ranked, key=lambda c: c.bilevel)
+
+
+def pymupdf_candidates(doc: Any, page: Any) -> list[ImageCandidate]:
+    """The images of a PyMuPDF page, without their soft masks."""
+    images = page.get_images(full=True)
+    masks = {smask for _, smask, *_ in images if smask}
+
+    candidates: list[ImageCandidate] = []
+    seen = set()
+    for xref, _, width, height, bits, colorspace, *_ in images:
+        if xref in masks or xref in seen:
+            continue
+        seen.add(xref)
+
+        kind, length = doc.xref_get_key(xref, "Length")
+        if kind != "int":
+            # An indirect length: the raw stream is read, not decompressed
+            length = len(doc.xref_stream_raw(xref) or b"")
+        _, filters = doc.xref_get_key(xref, "Filter")
+        _, stencil = doc.xref_get_key(xref, "ImageMask")
+        candidates.append(
+            ImageCandidate(
+                key=xref,
+                width=width,
+                height=height,
+                length=int(length),
+                filters=tuple(re.findall(r"/\w+", filters)),
+                bits=bits,
+                stencil=stencil == "true",
+                components=_components(colorspace),
+            )
+        )
+
+    return candidates
+
+
+def pypdf_candidates(page: Any) -> list[ImageCandidate]:
+    """
+    The images of a pypdf page (including those of its forms), without their
+    masks and without inline images (at most a few KB, per the PDF spec).
+    """
+    images: list[tuple[Any, Any]] = []
+    _collect_pypdf_images(page, [], images, set())
+
+    masks = set()
+    for _, image in images:
+        for mask in ("/SMask", "/Mask"):
+            # Resolved by get (a /Mask can also be an array of colors)
+            ref = getattr(image.get(mask), "indirect_reference", None)
+            if ref is not None:
+                masks.add(ref.idnum)
+
+    candidates = []
+    seen = set()
+    for key, image in images:
+        # The same image can have several names
+        ref = image.indirect_reference
+        if ref is not None and (ref.idnum in masks or ref.idnum in seen):
+            continue
+        if ref is not None:
+            seen.add(ref.idnum)
+
+        filters = _value(image, "/Filter", [])
+        if not isinstance(filters, pypdf.generic.ArrayObject | list):
+            filters = [filters]
+        candidates.append(
+            ImageCandidate(
+                key=key,
+                width=int(_value(image, "/Width", 0)),
+                height=int(_value(image, "/Height", 0)),
+                # pypdf drops /Length once it has read the raw stream
+                length=len(getattr(image, "_data", b"")),
+                filters=tuple(str(f) for f in filters),
+                bits=int(_value(image, "/BitsPerComponent", 0)),
+                stencil=bool(_value(image, "/ImageMask", False)),
+                components=_components(str(_value(image, "/ColorSpace", ""))),
+            )
+        )
+
+    return candidates
+
+
+def _components(colorspace: str) -> int:
+    # Indexed, ICC-based and other color spaces are decoded to RGB
+    if "Gray" in colorspace:
+        return 1
+    if "CMYK" in colorspace:
+        return 4
+    return 3
+
+
+def _value(obj: Any, key: str, default: Any) -> Any:
+    value = obj.get(key)
+    return default if value is None else value.get_object()
+
+
+def _collect_pypdf_images(
+    obj: Any, ancestors: list[str], images: list[tuple[Any, Any]], seen: set[Any]
+) -> None:
+    # Like page.images, which decodes each image when iterated
+    resources = obj.get("/Resources")
+    if resources is None:
+        return
+    xobjects = resources.get_object().get("/XObject")
+    if xobjects is None:
+        return
+
+    for name, ref in xobjects.get_object().items():
+        xobject = ref.get_object()
+        if not isinstance(xobject, pypdf.generic.StreamObject):
+            continue
+
+        key = name if not ancestors else [*ancestors, name]
+        if xobject.get("/Subtype") == "/Image":
+            images.append((key, xobject))
+        elif xobject.get("/Subtype") == "/Form":
+            # Forms can be shared by pages, or contain themselves
+            if xobject.indirect_reference in seen:
+                continue
+            seen.add(xobject.indirect_reference)
+            _collect_pypdf_images(xobject, [*ancestors, name], images, seen)
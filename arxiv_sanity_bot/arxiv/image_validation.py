@@ -1,7 +1,8 @@
+import io
+import math
 import os
 
-import numpy as np
-from PIL import Image
+from PIL import Image, ImageStat
 
 from arxiv_sanity_bot.logger import get_logger
 
@@ -16,43 +17,83 @@ MIN_SHORT_SIDE = 120
 MAX_ASPECT_RATIO = 3.0
 MAX_FILE_BYTES = 4 * 1024 * 1024
 
+# Larger images are checked for content on a regular grid of about this many
+# of their pixels (the standard deviation of the sample estimates that of
+# the whole image)
+VALIDATION_MAX_PIXELS = 1_000_000
 
-def has_image_content(image_path: str, min_std: float = 10.0) -> bool:
+
+def has_image_content(image: Image.Image | str, min_std: float = 10.0) -> bool:
+    """
+    :param image: a decoded image, or the path to one
+    :return: whether the image is not (almost) uniform, e.g. a blank page
+    """
     try:
-        with Image.open(image_path) as img:
-            img_array = np.array(img.convert("L"))
-            std_dev = np.std(img_array)
-            if std_dev < min_std:
-                logger.info(
-                    f"Image {image_path} has low variance (std={std_dev:.2f}), likely empty"
-                )
-                return False
-            return True
+        if isinstance(image, str):
+            with Image.open(image) as img:
+                return _has_variance(img, min_std)
+        return _has_variance(image, min_std)
     except Exception as e:
         logger.info(f"Failed to validate image content: {str(e)}")
         return False
 
 
-def is_uploadable(image_path: str) -> bool:
-    """Reject images Twitter is likely to refuse: too thin, too elongated, too big."""
+def _has_variance(img: Image.Image, min_std: float) -> bool:
+    # From the histogram, without a float copy of the pixels
+    std_dev = ImageStat.Stat(_sample(img).convert("L")).stddev[0]
+    if std_dev < min_std:
+        logger.info(f"Image has low variance (std={std_dev:.2f}), likely empty")
+        return False
+    return True
+
+
+def _sample(img: Image.Image) -> Image.Image:
+    w, h = img.size
+    step = math.ceil(math.sqrt(w * h / VALIDATION_MAX_PIXELS))
+    if step <= 1:
+        return img
+
+    # Nearest neighbor picks one pixel per step x step block, it does not
+    # average them (that would lower the deviation)
+    return img.resize((max(w // step, 1), max(h // step, 1)), Image.Resampling.NEAREST)
+
+
+def fits_upload_envelope(width: int, height: int, max_size: int) -> bool:
+    """
+    Whether an image of this size, once downsized to at most max_size pixels
+    on its longest side, has dimensions is_uploadable accepts (to skip an
+    image before decoding it).
+    """
+    long, short = max(width, height), min(width, height)
+    if short <= 0:
+        return False
+    scale = min(1.0, max_size / long)
+    return short * scale >= MIN_SHORT_SIDE and long / short <= MAX_ASPECT_RATIO
+
+
+def is_uploadable(image: bytes | str) -> bool:
+    """
+    Reject images Twitter is likely to refuse: too thin, too elongated, too big.
+
+    :param image: the encoded image, or the path to it
+    """
     try:
-        size_bytes = os.path.getsize(image_path)
+        if isinstance(image, str):
+            size_bytes = os.path.getsize(image)
+        else:
+            size_bytes = len(image)
         if size_bytes > MAX_FILE_BYTES:
-            logger.info(
-                f"Image {image_path} too large ({size_bytes} bytes > {MAX_FILE_BYTES})"
-            )
+            logger.info(f"Image too large ({size_bytes} bytes > {MAX_FILE_BYTES})")
             return False
-        with Image.open(image_path) as img:
+        with Image.open(image if isinstance(image, str) else io.BytesIO(image)) as img:
             w, h = img.size
         short = min(w, h)
         if short < MIN_SHORT_SIDE:
-            logger.info(f"Image {image_path} short side {short}px < {MIN_SHORT_SIDE}px")
+            logger.info(f"Image short side {short}px < {MIN_SHORT_SIDE}px")
             return False
         ratio = max(w, h) / max(short, 1)
         if ratio > MAX_ASPECT_RATIO:
-            logger.info(
-                f"Image {image_path} aspect ratio {ratio:.2f} > {MAX_ASPECT_RATIO}"
-            )
+            logger.info(f"Image aspect ratio {ratio:.2f} > {MAX_ASPECT_RATIO}")
             return False
         return True
     except Exception as e:
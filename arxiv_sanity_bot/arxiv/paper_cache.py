@@ -0,0 +1,259 @@
+import hashlib
+import os
+import re
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+
+from arxiv_sanity_bot.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    sha256 TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS pdfs (
+    arxiv_id TEXT NOT NULL,
+    version TEXT NOT NULL,
+    sha256 TEXT NOT NULL REFERENCES blobs(sha256),
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (arxiv_id, version)
+);
+CREATE TABLE IF NOT EXISTS extractions (
+    pdf_sha256 TEXT NOT NULL REFERENCES blobs(sha256),
+    engine TEXT NOT NULL,
+    image_sha256 TEXT REFERENCES blobs(sha256),
+    PRIMARY KEY (pdf_sha256, engine)
+);
+CREATE INDEX IF NOT EXISTS blobs_lru ON blobs (last_used);
+"""
+
+
+class PaperCache:
+    """
+    On-disk cache of the PDFs of the papers and of the images extracted from
+    them, shared by the runs (and the processes) using the same directory.
+
+    Files are stored once, named by the SHA-256 of their content, and indexed
+    in a SQLite file:
+
+    - PDFs by arxiv ID and version. The version is "" for a PDF downloaded
+      without one (the latest version at that time), which is trusted for
+      ``max_age`` seconds, so that a new version is eventually fetched
+    - extractions by the hash of the PDF and the extraction engine, including
+      "no image" outcomes, so that a new version is extracted again
+
+    When the files take more than ``max_bytes``, the least recently used are
+    removed, along with the entries referring to them.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, max_age: float):
+        self._directory = directory
+        self._blobs = os.path.join(directory, "blobs")
+        self._max_bytes = max_bytes
+        self._max_age = max_age
+        os.makedirs(self._blobs, exist_ok=True)
+
+        # Shared by the threads of this process (e.g. the prefetches)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            os.path.join(directory, "index.sqlite"),
+            timeout=30,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def get_pdf(self, arxiv_id: str) -> str | None:
+        """
+        :param arxiv_id: the arxiv ID, with or without a version
+        :return: the path to the cached PDF, or None
+        """
+        arxiv_id, version = _split_version(arxiv_id)
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT sha256, fetched_at FROM pdfs WHERE arxiv_id = ? AND version = ?",
+                (arxiv_id, version),
+            ).fetchone()
+            if row is None:
+                return None
+
+            sha256, fetched_at = row
+            if not version and time.time() - fetched_at > self._max_age:
+                return None
+
+            path = self._touch(sha256)
+
+        if path is not None:
+            logger.debug(f"Using cached PDF for {arxiv_id}", extra={"pdf_path": path})
+        return path
+
+    def put_pdf(self, arxiv_id: str, pdf_path: str) -> str:
+        """
+        Move the PDF into the cache.
+
+        :param arxiv_id: the arxiv ID the PDF was downloaded for, with or
+        without a version
+        :return: the path to the cached PDF
+        """
+        arxiv_id, version = _split_version(arxiv_id)
+
+        with self._lock:
+            sha256, path = self._store(pdf_path, move=True)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pdfs VALUES (?, ?, ?, ?)",
+                (arxiv_id, version, sha256, time.time()),
+            )
+            self._evict(keep=sha256)
+
+        return path
+
+    def get_image(self, pdf_path: str, engine: str) -> tuple[bool, str | None]:
+        """
+        :return: whether the extraction of the PDF with engine is cached,
+        and the path to the cached JPEG (None if no image was found)
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT image_sha256 FROM extractions "
+                "WHERE pdf_sha256 = ? AND engine = ?",
+                (self._digest(pdf_path), engine),
+            ).fetchone()
+            if row is None:
+                return False, None
+
+            (image_sha256,) = row
+            if image_sha256 is None:
+                return True, None
+
+            path = self._touch(image_sha256)
+            return path is not None, path
+
+    def put_image(self, pdf_path: str, engine: str, image_path: str | None) -> None:
+        """
+        Record the outcome of the extraction of the PDF with engine, copying
+        the JPEG into the cache.
+
+        :param image_path: the JPEG extracted, or None if no image was found
+        """
+        with self._lock:
+            pdf_sha256 = self._digest(pdf_path)
+            image_sha256 = None
+            if image_path is not None:
+                image_sha256, _ = self._store(image_path, move=False)
+
+            self._conn.execute(
+                "INSERT OR REPLACE INTO extractions VALUES (?, ?, ?)",
+                (pdf_sha256, engine, image_sha256),
+            )
+            self._evict(keep=image_sha256 or pdf_sha256)
+
+    def _blob_path(self, sha256: str) -> str:
+        return os.path.join(self._blobs, sha256)
+
+    def _digest(self, path: str) -> str:
+        # Files of the cache are named by their hash
+        if os.path.dirname(os.path.abspath(path)) == os.path.abspath(self._blobs):
+            return os.path.basename(path)
+        return _sha256(path)
+
+    def _store(self, path: str, move: bool) -> tuple[str, str]:
+        sha256 = _sha256(path)
+        blob = self._blob_path(sha256)
+
+        if not os.path.exists(blob):
+            # Through a temporary file, so that other processes never see a
+            # partial blob
+            fd, tmp = tempfile.mkstemp(dir=self._blobs, suffix=".tmp")
+            os.close(fd)
+            if move:
+                shutil.move(path, tmp)
+            else:
+                shutil.copyfile(path, tmp)
+            os.replace(tmp, blob)
+        elif move:
+            os.remove(path)
+
+        self._conn.execute(
+            "INSERT OR REPLACE INTO blobs VALUES (?, ?, ?)",
+            (sha256, os.path.getsize(blob), time.time()),
+        )
+        return sha256, blob
+
+    def _touch(self, sha256: str) -> str | None:
+        path = self._blob_path(sha256)
+        if not os.path.exists(path):
+            # Removed by another process
+            self._forget([sha256])
+            return None
+
+        self._conn.execute(
+            "UPDATE blobs SET last_used = ? WHERE sha256 = ?", (time.time(), sha256)
+        )
+        return path
+
+    def _evict(self, keep: str) -> None:
+        # keep: the file just stored, even if it is larger than the cache
+        (total,) = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM blobs"
+        ).fetchone()
+        if total <= self._max_bytes:
+            return
+
+        evicted = []
+        for sha256, size in self._conn.execute(
+            "SELECT sha256, size FROM blobs ORDER BY last_used"
+        ).fetchall():
+            if total <= self._max_bytes:
+                break
+            if sha256 == keep:
+                continue
+            evicted.append(sha256)
+            total -= size
+
+        for sha256 in evicted:
+            try:
+                os.remove(self._blob_path(sha256))
+            except FileNotFoundError:
+                pass
+        self._forget(evicted)
+
+        logger.info(
+            f"Evicted {len(evicted)} files from the paper cache",
+            extra={"cache_bytes": total},
+        )
+
+    def _forget(self, sha256s: list[str]) -> None:
+        for sha256 in sha256s:
+            self._conn.execute("DELETE FROM blobs WHERE sha256 = ?", (sha256,))
+            self._conn.execute("DELETE FROM pdfs WHERE sha256 = ?", (sha256,))
+            self._conn.execute(
+                "DELETE FROM extractions WHERE pdf_sha256 = ? OR image_sha256 = ?",
+                (sha256, sha256),
+            )
+
+
+def _split_version(arxiv_id: str) -> tuple[str, str]:
+    match = re.fullmatch(r"(.+?)(v[0-9]+)?", arxiv_id)
+    assert match is not None
+    return match.group(1), match.group(2) or ""
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
@@ -0,0 +1,110 @@
+import os
+import re
+
+import requests
+
+from arxiv_sanity_bot.config import ARXIV_DOWNLOAD_TIMEOUT
+from arxiv_sanity_bot.http_session import get_session
+from arxiv_sanity_bot.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+
+CHUNK_SIZE = 64 * 1024
+
+# Where the end of file marker of a PDF can be (only whitespace or a few
+# bytes of garbage follow it in practice)
+EOF_MARKER_WINDOW = 1024
+
+
+class DownloadError(Exception):
+    """The transfer was cut short or the file is not a whole PDF."""
+
+
+def download_pdf(url: str, path: str) -> str:
+    """
+    Stream the PDF at url to path.
+
+    Bytes go to path + ".part" as they arrive. If a previous call left a part
+    file (e.g. the connection dropped), it is resumed with a Range request,
+    or restarted if the server does not honor it. The file is moved to path
+    only once it is complete: its size is what the server announced, and it
+    has the header and the end of file marker of a PDF.
+
+    :raise requests.HTTPError: if the server replies with an error
+    :raise DownloadError: if the file is incomplete (the part file is kept,
+    to resume) or not a PDF (the part file is removed)
+    """
+    part = path + ".part"
+    offset = os.path.getsize(part) if os.path.exists(part) else 0
+
+    # Identity encoding, so that sizes and ranges count bytes of the file
+    headers = {"Accept-Encoding": "identity"}
+    if offset:
+        headers["Range"] = f"bytes={offset}-"
+
+    with get_session().get(
+        url, headers=headers, stream=True, timeout=ARXIV_DOWNLOAD_TIMEOUT
+    ) as response:
+        if response.status_code == 416:
+            # The part file is not a prefix of the file (it changed?)
+            os.remove(part)
+            raise DownloadError(f"Could not resume {url}, restarting")
+
+        response.raise_for_status()
+
+        total = _total_size(response)
+        if response.status_code != 206:
+            # The whole file (the server ignored the range, if any)
+            mode = "wb"
+        elif offset and _range_start(response) == offset:
+            logger.info(f"Resuming download of {url} at byte {offset}")
+            mode = "ab"
+        else:
+            if offset:
+                os.remove(part)
+            raise DownloadError(f"Unexpected range from {url}, restarting")
+
+        with open(part, mode) as f:
+            for chunk in response.iter_content(CHUNK_SIZE):
+                f.write(chunk)
+
+    size = os.path.getsize(part)
+    if total is not None and size < total:
+        raise DownloadError(f"Downloaded {size} of {total} bytes of {url}")
+
+    if (total is not None and size > total) or not _looks_like_pdf(part):
+        os.remove(part)
+        raise DownloadError(f"{url} is not a whole PDF ({size} bytes)")
+
+    os.replace(part, path)
+    return path
+
+
+def _total_size(response: requests.Response) -> int | None:
+    # Size of the whole file, from "Content-Range: bytes 100-199/200" for a
+    # partial response
+    content_range = response.headers.get("Content-Range")
+    if response.status_code == 206 and content_range:
+        total = content_range.rsplit("/", 1)[-1]
+        return int(total) if total.isdigit() else None
+
+    length = response.headers.get("Content-Length")
+    return int(length) if length is not None and length.isdigit() else None
+
+
+def _range_start(response: requests.Response) -> int | None:
+    if response.status_code != 206:
+        return None
+
+    match = re.match(r"bytes (\d+)-", response.headers.get("Content-Range", ""))
+    return int(match.group(1)) if match else None
+
+
+def _looks_like_pdf(path: str) -> bool:
+    with open(path, "rb") as f:
+        if f.read(5) != b"%PDF-":
+            return False
+        f.seek(max(os.path.getsize(path) - EOF_MARKER_WINDOW, 0))
+        return b"%%EOF" in f.read()
@@ -0,0 +1,269 @@
+import dataclasses
+import json
+import os
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from typing import Any, Callable
+
+import pandas as pd
+
+from arxiv_sanity_bot.arxiv.extract_image import download_paper, extract_first_image
+from arxiv_sanity_bot.config import SCORE_THRESHOLD
+from arxiv_sanity_bot.logger import get_logger
+from arxiv_sanity_bot.models.openai import OpenAI
+from arxiv_sanity_bot.store.store import DocumentStore
+from arxiv_sanity_bot.telemetry.tracing import propagate, span
+
+
+logger = get_logger(__name__)
+
+
+Window = tuple[datetime, datetime]
+
+
+def split_windows(start: datetime, end: datetime, window_hours: int) -> list[Window]:
+    """
+    Split [start, end) into consecutive windows of ``window_hours`` hours.
+    The last window is truncated at ``end``.
+    """
+    if start >= end:
+        return []
+
+    windows: list[Window] = []
+    step = timedelta(hours=window_hours)
+
+    while start < end:
+        stop = min(start + step, end)
+        windows.append((start, stop))
+        start = stop
+
+    return windows
+
+
+class BackfillState:
+    """
+    Windows already backfilled, persisted as JSON so an interrupted backfill
+    can be resumed by re-running the same command.
+    """
+
+    def __init__(self, path: str):
+        self._path = path
+        self._completed: set[str] = set()
+
+        if os.path.exists(path):
+            with open(path) as f:
+                self._completed = set(json.load(f)["completed"])
+
+    @staticmethod
+    def _key(window: Window) -> str:
+        return f"{window[0].isoformat()}/{window[1].isoformat()}"
+
+    def is_done(self, window: Window) -> bool:
+        return self._key(window) in self._completed
+
+    def mark_done(self, window: Window) -> None:
+        self._completed.add(self._key(window))
+
+        # Write-then-rename so a crash never leaves a truncated state file
+        tmp_path = f"{self._path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"completed": sorted(self._completed)}, f, indent=2)
+        os.replace(tmp_path, self._path)
+
+
+@dataclasses.dataclass
+class BackfillReport:
+    n_windows: int = 0
+    n_skipped_windows: int = 0
+    n_papers: int = 0
+    n_failed: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def papers_per_minute(self) -> float:
+        return 60 * self.n_papers / self.elapsed if self.elapsed > 0 else 0.0
+
+
+def run_backfill(
+    windows: list[Window],
+    get_all_abstracts: Callable[..., tuple[pd.DataFrame, int]],
+    get_url: Callable[[str], str],
+    doc_store: DocumentStore,
+    llm: OpenAI,
+    state: BackfillState,
+    workers: int,
+    score_threshold: int = SCORE_THRESHOLD,
+    max_papers_per_window: int | None = None,
+    dry: bool = False,
+) -> BackfillReport:
+    """
+    Summarize and extract the first image of every paper in the given windows,
+    and store the results without tweeting.
+
+    Windows are fetched in parallel, in a thread pool of their own, and each
+    window is processed as soon as it is fetched (while the next ones are
+    being fetched). Summaries, PDF downloads and image extractions run in
+    another thread pool, the extractions themselves (CPU-bound, and PyMuPDF
+    is not thread-safe) in the worker processes of extract_first_image.
+    The store records whether each paper has an image, not the image.
+    """
+    report = BackfillReport()
+    start_time = time.perf_counter()
+
+    pending = [w for w in windows if not state.is_done(w)]
+    report.n_skipped_windows = len(windows) - len(pending)
+    if report.n_skipped_windows:
+        logger.info(f"Skipping {report.n_skipped_windows} windows already backfilled")
+
+    seen: set[str] = set()
+
+    with (
+        ThreadPoolExecutor(max_workers=workers) as fetch_pool,
+        ThreadPoolExecutor(max_workers=workers) as io_pool,
+    ):
+        # Fetches (slow and paced for the ranked source) must not hold up
+        # the processing of the windows already fetched
+        fetches = {
+            fetch_pool.submit(propagate(get_all_abstracts), after=w[0], before=w[1]): w
+            for w in pending
+        }
+
+        for fetch in as_completed(fetches):
+            window = fetches[fetch]
+            window_start = time.perf_counter()
+
+            abstracts, _ = fetch.result()
+            abstracts = _select(
+                abstracts, doc_store, seen, score_threshold, max_papers_per_window
+            )
+
+            logger.info(
+                f"Backfilling {abstracts.shape[0]} papers for window "
+                f"{window[0]} - {window[1]}"
+            )
+
+            with span("window", window=f"{window[0]} - {window[1]}"):
+                results = _process_window(abstracts, llm, io_pool)
+
+            for row, result in results:
+                if result is None:
+                    report.n_failed += 1
+                    continue
+
+                summary, img_path = result
+                report.n_papers += 1
+
+                if not dry:
+                    doc_store[row["arxiv"]] = {
+                        "title": row["title"],
+                        "published_on": row["published_on"],
+                        "summary": summary,
+                        "url": get_url(row["arxiv"]),
+                        # The image itself is in a temporary workspace:
+                        # backfilled papers are never posted
+                        "has_image": img_path is not None,
+                        "backfilled": True,
+                    }
+
+            if not dry:
+                state.mark_done(window)
+
+            report.n_windows += 1
+            report.elapsed = time.perf_counter() - start_time
+            logger.info(
+                f"Window {window[0]} - {window[1]} done in "
+                f"{time.perf_counter() - window_start:.1f} s "
+                f"({report.papers_per_minute:.1f} papers/minute so far)",
+                extra=dataclasses.asdict(report),
+            )
+
+    report.elapsed = time.perf_counter() - start_time
+
+    return report
+
+
+def _select(
+    abstracts: pd.DataFrame,
+    doc_store: DocumentStore,
+    seen: set[str],
+    score_threshold: int,
+    max_papers: int | None,
+) -> pd.DataFrame:
+    if abstracts.shape[0] == 0:
+        return abstracts
+
+    abstracts = abstracts[abstracts["score"] >= score_threshold]
+
+    # Skip papers already in the store (posted, or backfilled by a previous
+    # attempt) and papers that fall into more than one window
+    keep = [
+        arxiv_id not in seen and arxiv_id not in doc_store
+        for arxiv_id in abstracts["arxiv"]
+    ]
+    abstracts = abstracts[keep].reset_index(drop=True)
+
+    if max_papers is not None:
+        abstracts = abstracts.iloc[:max_papers]
+
+    seen.update(abstracts["arxiv"])
+
+    return abstracts
+
+
+def _process_window(
+    abstracts: pd.DataFrame,
+    llm: OpenAI,
+    io_pool: Executor,
+) -> list[tuple[pd.Series, tuple[str, str | None] | None]]:
+    rows = [row for _, row in abstracts.iterrows()]
+
+    summaries = [
+        io_pool.submit(propagate(llm.summarize_abstract), r["abstract"]) for r in rows
+    ]
+    downloads = [io_pool.submit(propagate(download_paper), r["arxiv"]) for r in rows]
+
+    # Start each extraction as soon as its PDF is available
+    extractions: dict[int, Any] = {}
+    for i, download in enumerate(downloads):
+        try:
+            pdf_path = download.result()
+        except Exception as e:
+            logger.error(
+                f"Could not download {rows[i]['arxiv']}",
+                exc_info=True,
+                extra={"exception": str(e)},
+            )
+            continue
+        extractions[i] = io_pool.submit(
+            propagate(extract_first_image), rows[i]["arxiv"], pdf_path
+        )
+
+    results: list[tuple[pd.Series, tuple[str, str | None] | None]] = []
+    for i, row in enumerate(rows):
+        try:
+            summary = summaries[i].result()
+        except Exception as e:
+            logger.error(
+                f"Could not backfill {row['arxiv']}",
+                exc_info=True,
+                extra={"exception": str(e)},
+            )
+            results.append((row, None))
+            continue
+
+        # Like a failed download: the paper is stored without an image
+        img_path = None
+        if i in extractions:
+            try:
+                img_path = extractions[i].result()
+            except Exception as e:
+                logger.error(
+                    f"Could not extract the image of {row['arxiv']}",
+                    exc_info=True,
+                    extra={"exception": str(e)},
+                )
+
+        results.append((row, (summary, img_path)))
+
+    return results
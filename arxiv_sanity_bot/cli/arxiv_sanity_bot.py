@@ -1,7 +1,12 @@
+import contextlib
+import dataclasses
 from datetime import datetime, timedelta
+import json
 import time
+import uuid
 import random
-from typing import Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterator
 
 import click
 import numpy as np
@@ -30,17 +35,81 @@ if os.environ.get("ARXIV_SANITY_BOT_INSECURE_SSL") == "1":
 
 from arxiv_sanity_bot.arxiv import arxiv_abstracts  # noqa: E402
 from arxiv_sanity_bot.ranking import ranked_papers  # noqa: E402
-from arxiv_sanity_bot.arxiv.extract_image import extract_first_image  # noqa: E402
+from arxiv_sanity_bot.arxiv.extract_image import (  # noqa: E402
+    extract_first_image,
+    prefetch_first_images,
+)
 from arxiv_sanity_bot.config import (  # noqa: E402
     WINDOW_START,
     WINDOW_STOP,
     TIMEZONE,
     SOURCE,
     SCORE_THRESHOLD,
-    MAX_NUM_PAPERS,
+    DAEMON_INTERVAL,
+    DAEMON_HOST,
+    DAEMON_PORT,
+    BACKFILL_WINDOW,
+    BACKFILL_WORKERS,
+    BACKFILL_STATE_FILE,
+    JOB_QUEUE_PATH,
+    JOB_LEASE,
+    JOB_MAX_ATTEMPTS,
+    JOB_POLL_INTERVAL,
+    PRECOMPUTE_DIR,
+    PRECOMPUTE_POOL_SIZE,
+    PACING_SCALE,
+    MEMORY_PROFILING,
+    MEMORY_BUDGET_MB,
+    METRICS_FILE,
+    TRACE_FILE,
+    CANDIDATE_ARCHIVE_DIR,
+    STREAMING_PUBLISH,
+    FIREBASE_COLLECTION,
+    FIRESTORE_FAKE_URL,
+)
+from arxiv_sanity_bot.fakes.corpus import SyntheticCorpus  # noqa: E402
+from arxiv_sanity_bot.fakes.firestore import FakeFirestoreClient  # noqa: E402
+from arxiv_sanity_bot.fakes.loadgen import run_load  # noqa: E402
+from arxiv_sanity_bot.fakes.server import (  # noqa: E402
+    FakeServices,
+    ServiceBehavior,
+    SERVICES,
+)
+from arxiv_sanity_bot.telemetry import memory  # noqa: E402
+from arxiv_sanity_bot.telemetry import tracing  # noqa: E402
+from arxiv_sanity_bot.telemetry.context import current_ids  # noqa: E402
+from arxiv_sanity_bot.telemetry.log_analysis import analyze, format_report  # noqa: E402
+from arxiv_sanity_bot.telemetry.memory import track_memory  # noqa: E402
+from arxiv_sanity_bot.telemetry.tracing import span  # noqa: E402
+from arxiv_sanity_bot.telemetry.metrics import (  # noqa: E402
+    CANDIDATES,
+    DEDUP_HITS,
+    REGISTRY,
+    SUMMARIES,
+)
+from arxiv_sanity_bot.jobs.queue import JobQueue, STAGES, SUMMARIZE  # noqa: E402
+from arxiv_sanity_bot.jobs.workers import (  # noqa: E402
+    extract_handler,
+    publish_ready_batches,
+    run_worker,
+    summarize_handler,
 )
+from arxiv_sanity_bot.backfill import (  # noqa: E402
+    BackfillState,
+    run_backfill,
+    split_windows,
+)
+from arxiv_sanity_bot.daemon.server import Daemon  # noqa: E402
 from arxiv_sanity_bot.logger import get_logger, FatalError  # noqa: E402
 from arxiv_sanity_bot.models.openai import OpenAI  # noqa: E402
+from arxiv_sanity_bot.profiles import (  # noqa: E402
+    DEFAULT_PROFILE,
+    Profile,
+    load_profiles,
+)
+from arxiv_sanity_bot.replay.cassette import Cassette  # noqa: E402
+from arxiv_sanity_bot.store.archive import CandidateArchive  # noqa: E402
+from arxiv_sanity_bot.store.artifacts import ArtifactStore  # noqa: E402
 from arxiv_sanity_bot.store.store import DocumentStore  # noqa: E402
 from arxiv_sanity_bot.twitter.auth import TwitterOAuth1  # noqa: E402
 from arxiv_sanity_bot.twitter.send_tweet import send_tweet  # noqa: E402
@@ -55,58 +124,779 @@ _SOURCES = {
 }
 
 
-@click.command()
+@click.group(invoke_without_command=True)
 @click.option("--window_start", default=WINDOW_START, help="Window start", type=int)
 @click.option("--window_stop", default=WINDOW_STOP, help="Window stop", type=int)
 @click.option("--dry", is_flag=True)
-def bot(window_start, window_stop, dry):
-    logger.info("Bot starting")
+@click.option(
+    "--profiles",
+    "profiles_path",
+    default=None,
+    help="JSON file with the profiles to run (default: a single default profile)",
+    type=click.Path(exists=True, dir_okay=False),
+)
+@click.option(
+    "--record",
+    default=None,
+    help="Record every external interaction into this cassette directory",
+    type=click.Path(file_okay=False),
+)
+@click.option(
+    "--replay",
+    default=None,
+    help="Serve external interactions from this cassette instead of the network",
+    type=click.Path(exists=True, file_okay=False),
+)
+@click.option(
+    "--latency_scale",
+    default=1.0,
+    help="Multiplier of the recorded latencies when replaying",
+    type=float,
+)
+@click.option(
+    "--loose_replay",
+    is_flag=True,
+    default=False,
+    help="When replaying, answer calls missing from the cassette with another "
+    "recorded interaction of the same kind instead of failing",
+)
+@click.option(
+    "--memory_profile",
+    is_flag=True,
+    default=MEMORY_PROFILING,
+    help="Log peak memory and top allocations of each stage and paper",
+)
+@click.option(
+    "--memory_budget",
+    default=MEMORY_BUDGET_MB,
+    help="Peak RSS (MB) above which a stage or paper is flagged",
+    type=float,
+)
+@click.option(
+    "--trace",
+    "trace_file",
+    default=TRACE_FILE,
+    help="Write the spans of this invocation to this Chrome trace-event file",
+    type=click.Path(dir_okay=False),
+)
+@click.option(
+    "--streaming",
+    is_flag=True,
+    default=STREAMING_PUBLISH,
+    help="Post each paper as soon as it is summarized",
+)
+@click.pass_context
+def bot(
+    ctx,
+    window_start,
+    window_stop,
+    dry,
+    profiles_path,
+    record,
+    replay,
+    latency_scale,
+    loose_replay,
+    memory_profile,
+    memory_budget,
+    trace_file,
+    streaming,
+):
+    if record and replay:
+        raise click.UsageError("--record and --replay are mutually exclusive")
+
+    if memory_profile:
+        memory.enable(memory_budget)
+
+    # Whatever the command, leave the counters and latencies of this
+    # invocation behind for the textfile collector
+    if METRICS_FILE:
+        ctx.call_on_close(lambda: REGISTRY.write(METRICS_FILE))
+
+    if trace_file:
+        tracing.start_recording()
+        ctx.call_on_close(lambda: tracing.export_chrome_trace(trace_file))
+
+    # One trace per invocation (the daemon starts one per cycle instead).
+    # Registered last so that the span is closed before the exports
+    if ctx.invoked_subcommand != "serve":
+        ctx.with_resource(span("run", command=ctx.invoked_subcommand or "bot"))
+
+    # Applies to the subcommand as well, until the end of the invocation
+    if record:
+        ctx.with_resource(Cassette(record).record())
+    elif replay:
+        ctx.with_resource(
+            Cassette(replay).replay(latency_scale, strict=not loose_replay)
+        )
 
-    # This returns all abstracts above the threshold
+    # Without a subcommand we do a single run (this is what the cron job does)
+    if ctx.invoked_subcommand is None:
+        run_bot(
+            window_start,
+            window_stop,
+            dry,
+            profiles=_profiles(profiles_path),
+            artifacts=_artifacts(),
+            archive=_archive(),
+            streaming=streaming,
+        )
+
+
+@bot.command()
+@click.option("--window_start", default=WINDOW_START, help="Window start", type=int)
+@click.option("--window_stop", default=WINDOW_STOP, help="Window stop", type=int)
+@click.option("--dry", is_flag=True)
+@click.option(
+    "--profiles",
+    "profiles_path",
+    default=None,
+    help="JSON file with the profiles to run (default: a single default profile)",
+    type=click.Path(exists=True, dir_okay=False),
+)
+@click.option(
+    "--interval", default=DAEMON_INTERVAL, help="Hours between cycles", type=float
+)
+@click.option("--host", default=DAEMON_HOST, help="Health endpoint host")
+@click.option("--port", default=DAEMON_PORT, help="Health endpoint port", type=int)
+@click.option(
+    "--streaming",
+    is_flag=True,
+    default=STREAMING_PUBLISH,
+    help="Post each paper as soon as it is summarized",
+)
+def serve(
+    window_start, window_stop, dry, profiles_path, interval, host, port, streaming
+):
+    """Stay resident and run the bot every --interval hours."""
+    profiles = _profiles(profiles_path)
+
+    # Created once and reused by every cycle, so that Firebase is initialized
+    # only once and the dedup index and the summary cache stay warm
+    doc_stores: dict[str, DocumentStore] = {}
+    llm = OpenAI()
+
+    daemon = Daemon(
+        lambda: run_bot(
+            window_start,
+            window_stop,
+            dry,
+            profiles=profiles,
+            doc_stores=doc_stores,
+            llm=llm,
+            artifacts=_artifacts(),
+            archive=_archive(),
+            streaming=streaming,
+        ),
+        interval=interval * 3600,
+        host=host,
+        port=port,
+    )
+    daemon.install_signal_handlers()
+    daemon.run_forever()
+
+
+@bot.command()
+@click.option(
+    "--from",
+    "start",
+    required=True,
+    help="Start date (UTC)",
+    type=click.DateTime(["%Y-%m-%d", "%Y-%m-%dT%H:%M"]),
+)
+@click.option(
+    "--to",
+    "end",
+    required=True,
+    help="End date (UTC, excluded)",
+    type=click.DateTime(["%Y-%m-%d", "%Y-%m-%dT%H:%M"]),
+)
+@click.option(
+    "--window_hours", default=BACKFILL_WINDOW, help="Hours per window", type=int
+)
+@click.option("--workers", default=BACKFILL_WORKERS, help="Parallel workers", type=int)
+@click.option(
+    "--max_papers_per_window",
+    default=None,
+    help="Process at most this many papers per window (default: all)",
+    type=int,
+)
+@click.option(
+    "--state_file",
+    default=BACKFILL_STATE_FILE,
+    help="File tracking completed windows, used to resume",
+)
+@click.option("--dry", is_flag=True, help="Do not write to the store")
+def backfill(start, end, window_hours, workers, max_papers_per_window, state_file, dry):
+    """Summarize and store (without tweeting) all papers in a date range."""
+    windows = split_windows(
+        start.replace(tzinfo=TIMEZONE), end.replace(tzinfo=TIMEZONE), window_hours
+    )
+    logger.info(f"Backfilling {len(windows)} windows from {start} to {end}")
+
+    report = run_backfill(
+        windows,
+        get_all_abstracts=_backfill_abstracts(),
+        get_url=_SOURCES[SOURCE].get_url,
+        doc_store=_document_store(),
+        llm=OpenAI(),
+        state=BackfillState(state_file),
+        workers=workers,
+        max_papers_per_window=max_papers_per_window,
+        dry=dry,
+    )
+
+    logger.info(
+        f"Backfilled {report.n_papers} papers in {report.elapsed / 60:.1f} minutes "
+        f"({report.papers_per_minute:.1f} papers/minute)",
+        extra={
+            "n_windows": report.n_windows,
+            "n_skipped_windows": report.n_skipped_windows,
+            "n_failed": report.n_failed,
+        },
+    )
+
+
+@bot.group()
+@click.option("--queue", "queue_path", default=JOB_QUEUE_PATH, help="Queue file")
+@click.pass_context
+def jobs(ctx, queue_path):
+    """Run the pipeline as separate stages connected by a job queue."""
+    ctx.obj = JobQueue(queue_path, lease=JOB_LEASE, max_attempts=JOB_MAX_ATTEMPTS)
+
+
+@jobs.command()
+@click.option("--window_start", default=WINDOW_START, help="Window start", type=int)
+@click.option("--window_stop", default=WINDOW_STOP, help="Window stop", type=int)
+@click.pass_obj
+def enqueue(queue, window_start, window_stop):
+    """Fetch and rank the papers, and enqueue the top new ones."""
     abstracts, n_retrieved = _gather_abstracts(window_start, window_stop)
 
     if abstracts.shape[0] == 0:
         return
 
-    # Summarize the papers above the threshold that have not been summarized
-    # before
-    doc_store = DocumentStore.from_env_variable()
-
+    doc_store = _document_store()
     filtered_abstracts = _keep_only_new_abstracts(abstracts, doc_store)
+    top_papers = filtered_abstracts.iloc[: DEFAULT_PROFILE.max_num_papers]
+
+    queue.enqueue_batch(n_retrieved, top_papers.to_dict("records"))
+
+
+@jobs.command()
+@click.argument("stage", type=click.Choice(STAGES))
+@click.option("--exit_when_idle", is_flag=True, help="Stop when the queue is empty")
+@click.pass_obj
+def work(queue, stage, exit_when_idle):
+    """Process jobs of one stage. Run as many of these as needed."""
+    if stage == SUMMARIZE:
+        handler = summarize_handler(OpenAI(), _SOURCES[SOURCE].get_url)
+    else:
+        handler = extract_handler()
+
+    run_worker(
+        queue,
+        stage,
+        handler,
+        poll_interval=JOB_POLL_INTERVAL,
+        exit_when_idle=exit_when_idle,
+    )
+
+
+@jobs.command()
+@click.option("--dry", is_flag=True)
+@click.pass_obj
+def publish(queue, dry):
+    """Tweet every batch that is ready. Run only one publisher at a time."""
+    doc_store = _document_store()
+    llm = OpenAI()
+
+    publish_ready_batches(
+        queue,
+        lambda n_retrieved, summaries: send_tweets(
+            n_retrieved, summaries, doc_store, dry, llm
+        ),
+    )
+
+
+@bot.command()
+@click.option("--window_start", default=WINDOW_START, help="Window start", type=int)
+@click.option("--window_stop", default=WINDOW_STOP, help="Window stop", type=int)
+@click.option(
+    "--profiles",
+    "profiles_path",
+    default=None,
+    help="JSON file with the profiles to run (default: a single default profile)",
+    type=click.Path(exists=True, dir_okay=False),
+)
+@click.option(
+    "--pool_size",
+    default=PRECOMPUTE_POOL_SIZE,
+    help="Candidates to precompute per profile",
+    type=int,
+)
+def precompute(window_start, window_stop, profiles_path, pool_size):
+    """
+    Summarize and extract images for the likely candidates ahead of the
+    posting run, which then only ranks, dedups and publishes. Both need
+    ARXIV_SANITY_BOT_PRECOMPUTE_DIR to point to the same directory.
+    """
+    if not PRECOMPUTE_DIR:
+        raise click.UsageError(
+            "Set ARXIV_SANITY_BOT_PRECOMPUTE_DIR to the directory of the artifacts"
+        )
+
+    profiles = _profiles(profiles_path)
+    artifacts = ArtifactStore(PRECOMPUTE_DIR)
+    artifacts.prune()
+    llm = OpenAI()
+
+    abstracts, _ = _gather_abstracts(
+        window_start,
+        window_stop,
+        score_threshold=min(p.score_threshold for p in profiles),
+    )
+
+    if abstracts.shape[0] == 0:
+        return
+
+    for profile in profiles:
+        doc_store = _document_store(collection=profile.firebase_collection)
+        candidates = _keep_only_new_abstracts(profile.select(abstracts), doc_store)
+
+        for _, row in candidates.iloc[:pool_size].iterrows():
+            if artifacts.get(row["arxiv"], profile.summary_instructions) is not None:
+                continue
+
+            summary, _, img_path = _summarize(row, llm, profile.summary_instructions)
+            artifacts.put(row["arxiv"], summary, img_path, profile.summary_instructions)
+
+
+@bot.command(name="fake-services")
+@click.option(
+    "--papers", default=10_000, help="Papers in the synthetic corpus", type=int
+)
+@click.option("--port", default=0, help="Port (default: a free one)", type=int)
+@click.option(
+    "--latency", default=0.0, help="Seconds added to each response", type=float
+)
+@click.option("--error_rate", default=0.0, help="Fraction of 500s", type=float)
+@click.option("--rate_limit", default=None, help="Requests/s before 429s", type=float)
+def fake_services(papers, port, latency, error_rate, rate_limit):
+    """Serve local fakes of every external service until interrupted."""
+    behavior = ServiceBehavior(latency, error_rate, rate_limit)
+    services = FakeServices(
+        SyntheticCorpus(papers),
+        behaviors={s: behavior for s in SERVICES if s != "firestore"},
+        port=port,
+    )
+    services.start()
+
+    for name, value in services.environment().items():
+        click.echo(f"export {name}={value}")
+
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        services.stop()
+
+
+@bot.command(context_settings={"ignore_unknown_options": True})
+@click.option(
+    "--papers", default=10_000, help="Papers in the synthetic corpus", type=int
+)
+@click.option(
+    "--latency", default=0.0, help="Seconds added to each response", type=float
+)
+@click.option("--error_rate", default=0.0, help="Fraction of 500s", type=float)
+@click.option("--rate_limit", default=None, help="Requests/s before 429s", type=float)
+@click.option(
+    "--pacing_scale", default=0.0, help="Multiplier of the polite pauses", type=float
+)
+@click.argument("bot_args", nargs=-1, type=click.UNPROCESSED)
+def loadgen(papers, latency, error_rate, rate_limit, pacing_scale, bot_args):
+    """
+    Run the bot (with BOT_ARGS, e.g. "-- --dry" or "-- backfill ...") against
+    the fake services and report timings and service statistics.
+    """
+    report = run_load(
+        list(bot_args),
+        n_papers=papers,
+        behavior=ServiceBehavior(latency, error_rate, rate_limit),
+        pacing_scale=pacing_scale,
+    )
+    click.echo(json.dumps(dataclasses.asdict(report), indent=2))
+
+
+@bot.command(name="analyze-logs")
+@click.argument(
+    "log_files", nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False)
+)
+@click.option("--slowest", default=10, help="Slowest papers to list", type=int)
+@click.option("--json", "as_json", is_flag=True, help="Print the report as JSON")
+def analyze_logs(log_files, slowest, as_json):
+    """
+    Report stage durations, retries, per-host latencies and per-paper
+    processing times from the logs of past runs (plain or gzipped).
+    """
+    report = analyze(log_files, n_slowest=slowest)
+
+    if as_json:
+        click.echo(json.dumps(dataclasses.asdict(report), indent=2))
+    else:
+        click.echo(format_report(report))
+
 
-    summaries = _summarize_top_abstracts(filtered_abstracts)
+@contextlib.contextmanager
+def _stage(name: str, **attributes: Any) -> Iterator[None]:
+    # A span, with memory tracking when enabled
+    with span(name, **attributes), track_memory(name, attributes.get("arxiv_id")):
+        yield
 
-    if len(summaries) > 0:
-        send_tweets(n_retrieved, summaries, doc_store, dry)
+
+def _artifacts() -> ArtifactStore | None:
+    return ArtifactStore(PRECOMPUTE_DIR) if PRECOMPUTE_DIR else None
+
+
+def _archive() -> CandidateArchive | None:
+    return CandidateArchive(CANDIDATE_ARCHIVE_DIR) if CANDIDATE_ARCHIVE_DIR else None
+
+
+def _document_store(collection: str = FIREBASE_COLLECTION) -> DocumentStore:
+    # Against the fake services (fake-services, loadgen) there are no credentials
+    if FIRESTORE_FAKE_URL:
+        return DocumentStore(
+            firebase_credentials={},
+            collection=collection,
+            client=FakeFirestoreClient(FIRESTORE_FAKE_URL),
+        )
+    return DocumentStore.from_env_variable(collection=collection)
+
+
+def _backfill_abstracts() -> Callable[..., tuple[pd.DataFrame, int]]:
+    # The ranked source fetches each HF date once for the whole range
+    if SOURCE == "ranked":
+        return ranked_papers.RangeAbstracts()
+    return _SOURCES[SOURCE].get_all_abstracts
+
+
+def _profiles(profiles_path: str | None) -> list[Profile]:
+    return load_profiles(profiles_path) if profiles_path else [DEFAULT_PROFILE]
+
+
+def run_bot(
+    window_start: int,
+    window_stop: int,
+    dry: bool,
+    profiles: list[Profile] | None = None,
+    doc_stores: dict[str, DocumentStore] | None = None,
+    llm: OpenAI | None = None,
+    artifacts: ArtifactStore | None = None,
+    archive: CandidateArchive | None = None,
+    streaming: bool = False,
+):
+    """
+    Run the bot once for each profile.
+
+    Abstracts are fetched once with the loosest threshold among the profiles,
+    and PDFs and images are shared (see extract_first_image), so N profiles
+    cost about one fetch.
+
+    :param doc_stores: document stores by collection name. Stores missing from
+    the dictionary are created and added to it, so callers can keep them warm
+    :param artifacts: summaries and images precomputed by the precompute
+    command. Papers missing from it are processed on the fly
+    :param archive: where to append the candidates of each profile, with
+    their dedup outcome, summary, image, timings and tweet
+    :param streaming: post each paper as soon as it is summarized (see
+    stream_tweets) instead of summarizing all papers first
+    """
+    logger.info("Bot starting")
+
+    # The trace id when running in a span, so that the archive can be joined
+    # with the logs of the run
+    ids = current_ids.get()
+    run_id = ids[0] if ids else uuid.uuid4().hex
+    run_started_at = datetime.now(tz=TIMEZONE)
+
+    profiles = profiles or [DEFAULT_PROFILE]
+    doc_stores = doc_stores if doc_stores is not None else {}
+
+    # This returns all abstracts above the threshold
+    with _stage("fetch"):
+        abstracts, n_retrieved = _gather_abstracts(
+            window_start,
+            window_stop,
+            score_threshold=min(p.score_threshold for p in profiles),
+        )
+
+    if abstracts.shape[0] == 0:
+        return
+
+    if llm is None:
+        llm = OpenAI()
+
+    for profile in profiles:
+        logger.info(f"Running profile {profile.name}")
+
+        if profile.firebase_collection not in doc_stores:
+            doc_stores[profile.firebase_collection] = _document_store(
+                collection=profile.firebase_collection
+            )
+        doc_store = doc_stores[profile.firebase_collection]
+
+        # Summarize the papers selected by this profile that have not been
+        # summarized before
+        selected_abstracts = profile.select(abstracts)
+
+        filtered_abstracts = _keep_only_new_abstracts(selected_abstracts, doc_store)
+
+        oauth = TwitterOAuth1(env_prefix=profile.twitter_env_prefix)
+
+        if streaming:
+            summaries, tweet_urls = _summarize_and_publish(
+                filtered_abstracts,
+                n_retrieved,
+                llm,
+                profile,
+                artifacts,
+                doc_store,
+                dry,
+                oauth,
+            )
+        else:
+            with _stage("summarize", profile=profile.name):
+                summaries = _summarize_top_abstracts(
+                    filtered_abstracts, llm, profile, artifacts
+                )
+
+            tweet_urls = {}
+            if len(summaries) > 0:
+                with _stage("publish", profile=profile.name):
+                    tweet_urls = send_tweets(
+                        n_retrieved, summaries, doc_store, dry, llm, oauth=oauth
+                    )
+
+        if archive is not None:
+            archive.append(
+                _candidate_table(
+                    selected_abstracts,
+                    filtered_abstracts,
+                    summaries,
+                    tweet_urls,
+                    profile,
+                    dry,
+                ),
+                run_id=run_id,
+                run_started_at=run_started_at,
+                profile=profile.name,
+            )
 
     logger.info("Bot finishing")
 
 
+def _summarize_and_publish(
+    new_abstracts: pd.DataFrame,
+    n_retrieved: int,
+    llm: OpenAI,
+    profile: Profile,
+    artifacts: ArtifactStore | None,
+    doc_store: DocumentStore,
+    dry: bool,
+    oauth: TwitterOAuth1,
+) -> tuple[list[dict[str, Any]], dict[str, str | None]]:
+    # Streaming version of the summarize and publish stages of run_bot
+    top_papers = new_abstracts.iloc[: profile.max_num_papers]
+
+    if len(top_papers) == 0:
+        return [], {}
+
+    _log_selection(top_papers)
+    _prefetch_images(top_papers, profile, artifacts)
+
+    with _stage("summarize_and_publish", profile=profile.name):
+        return stream_tweets(
+            n_retrieved,
+            top_papers,
+            lambda row: _summarize_paper(row, llm, profile, artifacts),
+            doc_store,
+            dry,
+            llm,
+            oauth=oauth,
+        )
+
+
+def _candidate_table(
+    selected_abstracts: pd.DataFrame,
+    new_abstracts: pd.DataFrame,
+    summaries: list[dict[str, Any]],
+    tweet_urls: dict[str, str | None],
+    profile: Profile,
+    dry: bool,
+) -> pd.DataFrame:
+    """
+    The candidates of a profile (in ranking order) with what happened to each
+    of them during the run, for the archive.
+    """
+    candidates = selected_abstracts.drop(
+        columns=["abstract", "categories"], errors="ignore"
+    ).reset_index(drop=True)
+    candidates.insert(0, "pool_rank", range(len(candidates)))
+
+    new = set(new_abstracts["arxiv"])
+    top = set(new_abstracts["arxiv"].iloc[: profile.max_num_papers])
+    by_id = {s["arxiv"]: s for s in summaries}
+
+    ids = candidates["arxiv"]
+    candidates["dedup"] = ["new" if a in new else "posted_before" for a in ids]
+    candidates["selected"] = [a in top for a in ids]
+    candidates["summary"] = [by_id.get(a, {}).get("tweet") for a in ids]
+    candidates["image"] = [by_id.get(a, {}).get("image") for a in ids]
+    candidates["process_seconds"] = [
+        by_id.get(a, {}).get("process_seconds") for a in ids
+    ]
+    candidates["posted"] = [a in tweet_urls for a in ids]
+    candidates["tweet_url"] = [tweet_urls.get(a) for a in ids]
+    candidates["dry"] = dry
+
+    return candidates
+
+
 def send_tweets(
     n_retrieved: int,
     summaries: list[dict[str, Any]],
     doc_store: DocumentStore,
     dry: bool,
-):
+    llm: OpenAI | None = None,
+    oauth: TwitterOAuth1 | None = None,
+) -> dict[str, str | None]:
+    """
+    Send the summary tweet, then one tweet per summary (in reverse order, so
+    that the best paper ends up at the top of the thread).
+
+    :return: the URL of the tweet of each paper that was posted, by arxiv ID
+    """
 
     # Send the tweets
-    oauth = TwitterOAuth1()
+    oauth = oauth or TwitterOAuth1()
+    tweet_sender = _tweet_sender(dry)
 
-    if dry:
+    summary_tweet_id = _send_summary_tweet(
+        n_retrieved, len(summaries), tweet_sender, oauth, llm
+    )
 
-        def tweet_sender(
-            tweet: str,
-            auth: TwitterOAuth1,
-            img_path: str | None = None,
-            in_reply_to_tweet_id: int | None = None,
-        ) -> tuple[str | None, int | None]:
-            return ("https://fake.url", 123456789)
+    tweet_urls: dict[str, str | None] = {}
+    for s in summaries[::-1]:
+        time.sleep(_pacing_delay() * PACING_SCALE)
+
+        this_url = _send_paper_tweet(
+            s, tweet_sender, oauth, summary_tweet_id, doc_store
+        )
+        if this_url is not None:
+            tweet_urls[s["arxiv"]] = this_url
+
+    return tweet_urls
+
+
+def stream_tweets(
+    n_retrieved: int,
+    papers: pd.DataFrame,
+    summarize: Callable[[pd.Series], dict[str, Any] | None],
+    doc_store: DocumentStore,
+    dry: bool,
+    llm: OpenAI | None = None,
+    oauth: TwitterOAuth1 | None = None,
+) -> tuple[list[dict[str, Any]], dict[str, str | None]]:
+    """
+    Like send_tweets, but each paper is posted as soon as it is summarized:
+    papers are processed in a background thread in posting order (the same
+    as send_tweets), while the main thread waits out the pacing delays.
+
+    The summary tweet is sent first, so it announces len(papers) papers even
+    if some of them end up without a summary.
+
+    :param summarize: returns the summary of a paper (see _summarize_paper),
+    or None if it could not be summarized
+    :return: the summaries (in ranking order, like _summarize_top_abstracts)
+    and the URL of the tweet of each paper that was posted, by arxiv ID
+    """
+    oauth = oauth or TwitterOAuth1()
+    tweet_sender = _tweet_sender(dry)
+
+    summary_tweet_id = _send_summary_tweet(
+        n_retrieved, len(papers), tweet_sender, oauth, llm
+    )
+    last_post = time.monotonic()
+
+    summaries: list[dict[str, Any]] = []
+    tweet_urls: dict[str, str | None] = {}
+
+    # One worker, so papers are ready in posting order and the load on
+    # OpenAI and arxiv is the same as in batch mode
+    pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="summarize")
+    try:
+        futures = [
+            pool.submit(tracing.propagate(summarize), row)
+            for _, row in papers.iloc[::-1].iterrows()
+        ]
+
+        for future in futures:
+            s = future.result()
+            if s is None:
+                continue
+            summaries.append(s)
+
+            # The delay counts from the previous post, so the time spent
+            # summarizing this paper is not added to it
+            delay = _pacing_delay() * PACING_SCALE
+            time.sleep(max(0.0, last_post + delay - time.monotonic()))
+
+            this_url = _send_paper_tweet(
+                s, tweet_sender, oauth, summary_tweet_id, doc_store
+            )
+            last_post = time.monotonic()
+            if this_url is not None:
+                tweet_urls[s["arxiv"]] = this_url
+    finally:
+        # Do not keep summarizing papers that will not be posted
+        pool.shutdown(cancel_futures=True)
+
+    return summaries[::-1], tweet_urls
+
+
+def _tweet_sender(dry: bool) -> Callable[..., tuple[str | None, int | None]]:
+    if not dry:
+        return send_tweet
+
+    def tweet_sender(
+        tweet: str,
+        auth: TwitterOAuth1,
+        img_path: str | None = None,
+        in_reply_to_tweet_id: int | None = None,
+    ) -> tuple[str | None, int | None]:
+        return ("https://fake.url", 123456789)
+
+    return tweet_sender
 
-    else:
-        tweet_sender = send_tweet
 
+def _pacing_delay() -> int:
+    # Introduce a random delay between the tweets to avoid triggering
+    # the Twitter alarm
+    delay = random.randint(10, 30)
+    logger.info(f"Waiting for {delay} seconds before sending next tweet")
+    return delay
+
+
+def _send_summary_tweet(
+    n_retrieved: int,
+    n_papers: int,
+    tweet_sender: Callable[..., tuple[str | None, int | None]],
+    oauth: TwitterOAuth1,
+    llm: OpenAI | None = None,
+) -> int | None:
     logger.info("Sending summary tweet")
-    summary_tweet = OpenAI().generate_bot_summary(n_retrieved, len(summaries))
+    llm = llm or OpenAI()
+    summary_tweet = llm.generate_bot_summary(n_retrieved, n_papers)
 
     if summary_tweet is None:
 
@@ -116,32 +906,47 @@ def send_tweets(
 
     summary_tweet_url, summary_tweet_id = tweet_sender(summary_tweet, auth=oauth)
 
-    for s in summaries[::-1]:
-        # Introduce a random delay between the tweets to avoid triggering
-        # the Twitter alarm
-        delay = random.randint(10, 30)
-        logger.info(f"Waiting for {delay} seconds before sending next tweet")
-        time.sleep(delay)
-
-        this_url, this_tweet_id = tweet_sender(
-            s["tweet"],
-            auth=oauth,
-            img_path=s["image"],
-            in_reply_to_tweet_id=summary_tweet_id,
+    return summary_tweet_id
+
+
+def _send_paper_tweet(
+    s: dict[str, Any],
+    tweet_sender: Callable[..., tuple[str | None, int | None]],
+    oauth: TwitterOAuth1,
+    summary_tweet_id: int | None,
+    doc_store: DocumentStore,
+) -> str | None:
+    # Checked again just before posting: another run (or an overlapping
+    # batch of the job queue) may have posted the paper since it was selected
+    if s["arxiv"] in doc_store:
+        logger.warning(
+            f"Paper {s['arxiv']} was posted since it was selected, skipping it",
+            extra={"title": s["title"]},
         )
+        DEDUP_HITS.inc()
+        return None
+
+    this_url, this_tweet_id = tweet_sender(
+        s["tweet"],
+        auth=oauth,
+        img_path=s["image"],
+        in_reply_to_tweet_id=summary_tweet_id,
+    )
 
-        if this_url is not None:
-            if s["url"]:
-                logger.info(f"Sending URL as reply to tweet {this_tweet_id}")
-                time.sleep(2)
-                tweet_sender(s["url"], auth=oauth, in_reply_to_tweet_id=this_tweet_id)
+    if this_url is not None:
+        if s["url"]:
+            logger.info(f"Sending URL as reply to tweet {this_tweet_id}")
+            time.sleep(2 * PACING_SCALE)
+            tweet_sender(s["url"], auth=oauth, in_reply_to_tweet_id=this_tweet_id)
 
-            doc_store[s["arxiv"]] = {
-                "tweet_id": this_tweet_id,
-                "tweet_url": this_url,
-                "title": s["title"],
-                "published_on": s["published_on"],
-            }
+        doc_store[s["arxiv"]] = {
+            "tweet_id": this_tweet_id,
+            "tweet_url": this_url,
+            "title": s["title"],
+            "published_on": s["published_on"],
+        }
+
+    return this_url
 
 
 def _keep_only_new_abstracts(
@@ -165,15 +970,33 @@ def _keep_only_new_abstracts(
                 extra={"title": row["title"], "score": row["score"]},
             )
             mask[idx] = False
+            DEDUP_HITS.inc()
 
     return abstracts[mask].reset_index(drop=True)
 
 
-def _summarize_top_abstracts(selected_abstracts: pd.DataFrame) -> list[dict[str, Any]]:
+def _summarize_top_abstracts(
+    selected_abstracts: pd.DataFrame,
+    llm: OpenAI,
+    profile: Profile = DEFAULT_PROFILE,
+    artifacts: ArtifactStore | None = None,
+) -> list[dict[str, Any]]:
     summaries: list[dict[str, Any]] = []
 
-    top_papers = selected_abstracts.iloc[:MAX_NUM_PAPERS]
+    top_papers = selected_abstracts.iloc[: profile.max_num_papers]
+
+    _log_selection(top_papers)
+    _prefetch_images(top_papers, profile, artifacts)
+
+    for _, row in top_papers.iterrows():
+        summary = _summarize_paper(row, llm, profile, artifacts)
+        if summary is not None:
+            summaries.append(summary)
+
+    return summaries
 
+
+def _log_selection(top_papers: pd.DataFrame) -> None:
     logger.info(f"Selected {len(top_papers)} papers to summarize")
     for paper_num, (_, row) in enumerate(top_papers.iterrows(), start=1):
         logger.info(
@@ -192,31 +1015,65 @@ def _summarize_top_abstracts(selected_abstracts: pd.DataFrame) -> list[dict[str,
             },
         )
 
-    for i, row in top_papers.iterrows():
-        summary, url, img_path = _summarize(row)
-
-        if summary is not None:
-            summaries.append(
-                {
-                    "arxiv": row["arxiv"],
-                    "title": row["title"],
-                    "score": row["score"],
-                    "published_on": row["published_on"],
-                    "image": img_path,
-                    "tweet": summary,
-                    "url": url,
-                }
-            )
 
-    return summaries
+def _prefetch_images(
+    top_papers: pd.DataFrame, profile: Profile, artifacts: ArtifactStore | None
+) -> None:
+    # Extract the images of the papers in parallel while they are summarized,
+    # except for the ones that were precomputed
+    prefetch_first_images(
+        arxiv_id
+        for arxiv_id in top_papers["arxiv"]
+        if artifacts is None
+        or artifacts.get(arxiv_id, profile.summary_instructions) is None
+    )
 
 
-def _summarize(row: pd.Series) -> tuple[str, str, str | None]:
-    openai_model = OpenAI()
+def _summarize_paper(
+    row: pd.Series,
+    llm: OpenAI,
+    profile: Profile = DEFAULT_PROFILE,
+    artifacts: ArtifactStore | None = None,
+) -> dict[str, Any] | None:
+    start = time.perf_counter()
+    with _stage("paper", arxiv_id=row["arxiv"]):
+        summary, url, img_path = _summarize(
+            row, llm, profile.summary_instructions, artifacts
+        )
+    process_seconds = time.perf_counter() - start
+
+    if summary is None:
+        return None
+
+    return {
+        "arxiv": row["arxiv"],
+        "title": row["title"],
+        "score": row["score"],
+        "published_on": row["published_on"],
+        "image": img_path,
+        "tweet": summary,
+        "url": url,
+        "process_seconds": process_seconds,
+    }
+
+
+def _summarize(
+    row: pd.Series,
+    llm: OpenAI,
+    instructions: str = "",
+    artifacts: ArtifactStore | None = None,
+) -> tuple[str, str, str | None]:
+    url = _SOURCES[SOURCE].get_url(row["arxiv"])
 
-    summary = openai_model.summarize_abstract(row["abstract"])
+    if artifacts is not None:
+        precomputed = artifacts.get(row["arxiv"], instructions)
+        if precomputed is not None:
+            logger.info(f"Using precomputed summary and image for {url}")
+            SUMMARIES.inc(origin="precomputed")
+            summary, img_path = precomputed
+            return summary, url, img_path
 
-    url = _SOURCES[SOURCE].get_url(row["arxiv"])
+    summary = llm.summarize_abstract(row["abstract"], instructions)
 
     logger.info(
         f"Processed abstract for {url}",
@@ -229,7 +1086,9 @@ def _summarize(row: pd.Series) -> tuple[str, str, str | None]:
     return summary, url, img_path
 
 
-def _gather_abstracts(window_start: int, window_stop: int) -> tuple[pd.DataFrame, int]:
+def _gather_abstracts(
+    window_start: int, window_stop: int, score_threshold: int = SCORE_THRESHOLD
+) -> tuple[pd.DataFrame, int]:
     """
     Get all abstracts from arxiv-sanity from the last 48 hours above the threshold
 
@@ -254,17 +1113,18 @@ def _gather_abstracts(window_start: int, window_stop: int) -> tuple[pd.DataFrame
         return abstracts, alphaxiv_count
 
     # Threshold on score
-    idx = abstracts["score"] >= SCORE_THRESHOLD
+    idx = abstracts["score"] >= score_threshold
     abstracts = abstracts[idx].reset_index(drop=True)
+    CANDIDATES.inc(abstracts.shape[0])
 
     if abstracts.shape[0] == 0:
         logger.info(
-            f"No abstract in the time window {start} - {end} above score {SCORE_THRESHOLD}"
+            f"No abstract in the time window {start} - {end} above score {score_threshold}"
         )
         return abstracts, alphaxiv_count
     else:
         logger.info(
-            f"Found {abstracts.shape[0]} abstracts in the time window {start} - {end} above score {SCORE_THRESHOLD}. "
+            f"Found {abstracts.shape[0]} abstracts in the time window {start} - {end} above score {score_threshold}. "
             f"Total AlphaXiv papers considered (before percentile filter): {alphaxiv_count}"
         )
 
@@ -1,4 +1,5 @@
 # Summarize the top N papers
+import os
 from zoneinfo import ZoneInfo
 
 # Papers under this score will not be posted
@@ -20,6 +21,9 @@ ARXIV_QUERY = (
 ARXIV_DELAY = 3  # seconds
 # Number of times to retry a failed page fetch
 ARXIV_NUM_RETRIES = 10
+# Seconds without receiving data before a PDF download is abandoned (and
+# resumed by the next retry)
+ARXIV_DOWNLOAD_TIMEOUT = 60
 # Paging settings
 ARXIV_PAGE_SIZE = 100  # papers
 ARXIV_MAX_PAGES = 10
@@ -51,10 +55,15 @@ ALPHAXIV_MAX_PAPERS = 10000
 ALPHAXIV_TOP_PERCENTILE = 98  # Keep only top 2% of papers by votes (100 - 2 = 98)
 ALPHAXIV_N_RETRIES = 10
 ALPHAXIV_WAIT_TIME = 20
+# Days of the "hot" feed, relative to now
+ALPHAXIV_FEED_DAYS = 7
 
 # HuggingFace settings
 HF_N_RETRIES = 10
 HF_WAIT_TIME = 20
+# Days of daily papers fetched for a window, up to its end (papers are
+# featured some days after their publication)
+HF_DAYS = 7
 
 # DEPRECATED: Altmetric API closed in 2024
 # How many calls we can make in parallel for the Altmetric
@@ -68,8 +77,141 @@ ABSTRACT_ALLOWED_CHARACTERS = (
     "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789.,!?'- "
 )
 
+# Endpoints of the external services. They can be overridden through
+# environment variables, e.g. to point the bot to the local fake services
+# (arxiv-sanity-bot fake-services). OpenAI honors OPENAI_BASE_URL natively
+ALPHAXIV_API_URL = os.environ.get(
+    "ARXIV_SANITY_BOT_ALPHAXIV_URL", "https://api.alphaxiv.org"
+)
+HF_API_URL = os.environ.get("ARXIV_SANITY_BOT_HF_URL", "https://huggingface.co")
+ARXIV_API_URL = os.environ.get(
+    "ARXIV_SANITY_BOT_ARXIV_API_URL", "http://export.arxiv.org/api/query"
+)
+ARXIV_PDF_URL = os.environ.get(
+    "ARXIV_SANITY_BOT_ARXIV_PDF_URL", "https://export.arxiv.org/pdf"
+)
+# Replaces https://api.twitter.com and https://upload.twitter.com when set
+TWITTER_API_URL = os.environ.get("ARXIV_SANITY_BOT_TWITTER_URL")
+# When set, the document store talks to this fake Firestore instead of Firebase
+FIRESTORE_FAKE_URL = os.environ.get("ARXIV_SANITY_BOT_FIRESTORE_URL")
+
+# Multiplier of the pauses the bot takes between calls to be polite with the
+# APIs (and to not trigger the Twitter alarm). Only lower it against fakes
+PACING_SCALE = float(os.environ.get("ARXIV_SANITY_BOT_PACING_SCALE", "1"))
+
 # The timezone to use for all time stamps
 TIMEZONE = ZoneInfo("UTC")
 
 # Store
 FIREBASE_COLLECTION = "arxiv-papers"
+
+# Daemon mode (arxiv-sanity-bot serve)
+DAEMON_INTERVAL = 24  # hours between pipeline cycles
+DAEMON_HOST = "127.0.0.1"
+DAEMON_PORT = 8765  # port of the health/metrics endpoint
+
+# Backfill (arxiv-sanity-bot backfill)
+BACKFILL_WINDOW = 24  # hours per window
+BACKFILL_WORKERS = 4  # parallel fetches, summaries and extractions
+BACKFILL_STATE_FILE = "backfill-state.json"
+
+# Job queue between the pipeline stages (arxiv-sanity-bot jobs ...)
+JOB_QUEUE_PATH = "arxiv-sanity-bot-jobs.sqlite"
+JOB_LEASE = 600  # seconds a worker holds a job before others can take it
+JOB_MAX_ATTEMPTS = 3
+JOB_POLL_INTERVAL = 5  # seconds between polls of an empty queue
+
+# Directory of the precomputed summaries and images (arxiv-sanity-bot
+# precompute). Opt-in: the posting run uses them only when this is set
+PRECOMPUTE_DIR = os.environ.get("ARXIV_SANITY_BOT_PRECOMPUTE_DIR")
+# Seconds a precomputed artifact is used. Older ones are ignored, and removed
+# by the next precompute run
+PRECOMPUTE_MAX_AGE = 3 * 24 * 3600
+# How many candidates (per profile) to precompute. Larger than MAX_NUM_PAPERS
+# because rankings move between the precompute and the posting run
+PRECOMPUTE_POOL_SIZE = 3 * MAX_NUM_PAPERS
+
+# Memory instrumentation (see telemetry/memory.py). Opt-in because
+# tracemalloc slows down allocations
+MEMORY_PROFILING = os.environ.get("ARXIV_SANITY_BOT_MEMORY_PROFILING") == "1"
+# Stages or papers whose peak RSS goes above this are flagged
+MEMORY_BUDGET_MB = float(os.environ.get("ARXIV_SANITY_BOT_MEMORY_BUDGET_MB", "1024"))
+# How many allocation sites to report for each stage and paper
+MEMORY_TOP_ALLOCATIONS = 5
+
+# OpenMetrics text file written at the end of every invocation (e.g. for the
+# node_exporter textfile collector). Not written unless set
+METRICS_FILE = os.environ.get("ARXIV_SANITY_BOT_METRICS_FILE")
+
+# Chrome trace-event file with the spans of the invocation (see
+# telemetry/tracing.py). Not written unless set
+TRACE_FILE = os.environ.get("ARXIV_SANITY_BOT_TRACE_FILE")
+# Spans kept in memory for the export, at most
+TRACE_MAX_SPANS = 100_000
+
+# Parquet dataset with the candidates of every run and what happened to them
+# (see store/archive.py). Not written unless set
+CANDIDATE_ARCHIVE_DIR = os.environ.get("ARXIV_SANITY_BOT_CANDIDATE_ARCHIVE")
+
+# Post each paper as soon as its summary and image are ready, instead of
+# summarizing all papers first (see stream_tweets in the cli)
+STREAMING_PUBLISH = os.environ.get("ARXIV_SANITY_BOT_STREAMING_PUBLISH") == "1"
+
+# How images and graphs are found in the PDFs: "pymupdf" opens each PDF once
+# and scans each page for both, "pypdf" scans the whole PDF for bitmaps with
+# pypdf and then for graphs with PyMuPDF
+IMAGE_EXTRACTION_ENGINE = os.environ.get("ARXIV_SANITY_BOT_IMAGE_ENGINE", "pymupdf")
+
+# Longest side (pixels) of the images attached to the tweets
+IMAGE_MAX_SIZE = 500
+# Graphs are rendered with this many times IMAGE_MAX_SIZE pixels on their
+# longest side, then downsampled (better quality than rendering at the
+# final size)
+GRAPH_OVERSAMPLING = 2
+# Where the JPEGs attached to the tweets are written, in a temporary directory
+# removed at exit (see image_workspace in arxiv/extract_image.py). Defaults
+# to the system temporary directory
+IMAGE_WORKSPACE_DIR = os.environ.get("ARXIV_SANITY_BOT_IMAGE_DIR") or None
+
+# On-disk cache of the PDFs downloaded and of the images extracted from them
+# (see arxiv/paper_cache.py), shared by consecutive runs. Set the variable to
+# an empty string to disable it
+PAPER_CACHE_DIR = (
+    os.environ.get(
+        "ARXIV_SANITY_BOT_PAPER_CACHE_DIR",
+        os.path.join(
+            os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+            "arxiv-sanity-bot",
+        ),
+    )
+    or None
+)
+# Least recently used files are removed above this size
+PAPER_CACHE_MAX_MB = int(os.environ.get("ARXIV_SANITY_BOT_PAPER_CACHE_MAX_MB", "2048"))
+# Seconds a PDF downloaded without a version (the latest one) is reused
+# before it is downloaded again, in case a new version was submitted
+PAPER_CACHE_MAX_AGE = 24 * 3600
+
+# Entries kept in memory by the caches of long-running processes (the
+# daemon), least recently used first out: PDFs downloaded (removed from disk
+# when evicted), outcomes of the image extractions, summaries, and ids known
+# to be in the document store
+PDF_CACHE_SIZE = int(os.environ.get("ARXIV_SANITY_BOT_PDF_CACHE_SIZE", "100"))
+IMAGE_CACHE_SIZE = 1000
+SUMMARY_CACHE_SIZE = 1000
+KNOWN_IDS_CACHE_SIZE = 100_000
+
+# Image extraction runs in this many worker processes (see
+# arxiv/extraction_pool.py), or in the calling process if 0
+EXTRACTION_WORKERS = int(os.environ.get("ARXIV_SANITY_BOT_EXTRACTION_WORKERS", "2"))
+# Seconds after which the extraction of a paper is abandoned (it has no image)
+EXTRACTION_TIMEOUT = 60
+# Memory (address space) each extraction worker can allocate for the
+# extractions, on top of the modules it imports
+EXTRACTION_MEMORY_MB = 1024
+# Per paper limits on what the extraction can decode (see
+# arxiv/decode_budget.py): bytes decompressed and pixels decoded or rendered
+# for bitmaps and graphs, and pages scanned. A paper over budget has no image
+EXTRACTION_MAX_DECODED_MB = 256
+EXTRACTION_MAX_PIXELS = 100_000_000
+EXTRACTION_MAX_PAGES = 50
@@ -0,0 +1,185 @@
+import json
+import signal
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable
+
+from arxiv_sanity_bot.logger import get_logger
+from arxiv_sanity_bot.telemetry import metrics, tracing
+
+
+logger = get_logger(__name__)
+
+
+DAEMON_CYCLES: metrics.Counter = metrics.REGISTRY.register(
+    metrics.Counter("arxiv_sanity_bot_daemon_cycles", "Daemon cycles run")
+)
+DAEMON_FAILURES: metrics.Counter = metrics.REGISTRY.register(
+    metrics.Counter("arxiv_sanity_bot_daemon_failures", "Daemon cycles that failed")
+)
+DAEMON_CYCLE_SECONDS: metrics.Gauge = metrics.REGISTRY.register(
+    metrics.Gauge(
+        "arxiv_sanity_bot_daemon_last_cycle_seconds", "Duration of the last cycle"
+    )
+)
+
+
+class Daemon:
+    """
+    Keep the bot resident and run one pipeline cycle every ``interval`` seconds.
+
+    Everything created outside of ``run_cycle`` (clients, caches, the dedup
+    index) survives between cycles. A small HTTP server exposes ``/healthz``
+    and ``/metrics`` on ``host:port`` (use port 0 to pick a free port).
+    ``/metrics`` answers in the OpenMetrics text format to scrapers asking
+    for it (Accept: application/openmetrics-text or text/plain) and with the
+    daemon stats as JSON otherwise.
+    """
+
+    def __init__(
+        self,
+        run_cycle: Callable[[], None],
+        interval: float,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self._run_cycle = run_cycle
+        self._interval = interval
+        self._stop = threading.Event()
+
+        self.stats: dict[str, Any] = {
+            "started_at": time.time(),
+            "cycles": 0,
+            "failures": 0,
+            "running": False,
+            "last_cycle_started_at": None,
+            "last_cycle_duration": None,
+            "last_success_at": None,
+            "last_error": None,
+        }
+
+        self._server = ThreadingHTTPServer((host, port), _make_handler(self))
+        self._server_thread: threading.Thread | None = None
+
+    @property
+    def address(self) -> tuple[str, int]:
+        host, port = self._server.server_address[:2]
+        return str(host), int(port)
+
+    def health(self) -> tuple[bool, dict[str, Any]]:
+        # Healthy until a cycle fails; a later successful cycle restores health
+        healthy = self.stats["last_error"] is None
+        return healthy, {"status": "ok" if healthy else "failing", **self.stats}
+
+    def metrics(self) -> dict[str, Any]:
+        return {**self.stats, "uptime": time.time() - self.stats["started_at"]}
+
+    def run_once(self) -> None:
+        self.stats["running"] = True
+        self.stats["last_cycle_started_at"] = time.time()
+        start = time.perf_counter()
+
+        try:
+            # Each cycle is its own trace
+            with tracing.span("cycle", cycle=self.stats["cycles"] + 1):
+                self._run_cycle()
+        except Exception as e:
+            self.stats["failures"] += 1
+            DAEMON_FAILURES.inc()
+            self.stats["last_error"] = f"{type(e).__name__}: {e}"
+            logger.error(
+                "Daemon cycle failed", exc_info=True, extra={"exception": str(e)}
+            )
+        else:
+            self.stats["last_success_at"] = time.time()
+            self.stats["last_error"] = None
+        finally:
+            self.stats["cycles"] += 1
+            self.stats["running"] = False
+            self.stats["last_cycle_duration"] = time.perf_counter() - start
+            DAEMON_CYCLES.inc()
+            DAEMON_CYCLE_SECONDS.set(self.stats["last_cycle_duration"])
+
+        logger.info(
+            f"Daemon cycle {self.stats['cycles']} finished in "
+            f"{self.stats['last_cycle_duration']:.1f} s",
+            extra={"failures": self.stats["failures"]},
+        )
+
+    def start_server(self) -> None:
+        self._server_thread = threading.Thread(
+            target=self._server.serve_forever, name="daemon-http", daemon=True
+        )
+        self._server_thread.start()
+
+        host, port = self.address
+        logger.info(f"Health endpoint listening on http://{host}:{port}/healthz")
+
+    def run_forever(self) -> None:
+        self.start_server()
+
+        try:
+            while not self._stop.is_set():
+                self.run_once()
+
+                logger.info(f"Next daemon cycle in {self._interval:.0f} s")
+                self._stop.wait(self._interval)
+        finally:
+            self.shutdown()
+
+    def stop(self, *_: Any) -> None:
+        logger.info("Daemon stop requested")
+        self._stop.set()
+
+    def install_signal_handlers(self) -> None:
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+    def shutdown(self) -> None:
+        # shutdown() blocks until serve_forever returns, so only call it if
+        # the server loop was actually started
+        if self._server_thread is not None:
+            self._server.shutdown()
+            self._server_thread = None
+        self._server.server_close()
+
+
+def _make_handler(daemon: Daemon) -> type[BaseHTTPRequestHandler]:
+    class _Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            if self.path == "/healthz":
+                healthy, body = daemon.health()
+                self._reply(200 if healthy else 503, body)
+            elif self.path == "/metrics" and _wants_openmetrics(self.headers):
+                self._send(
+                    200,
+                    metrics.CONTENT_TYPE,
+                    metrics.REGISTRY.render().encode(),
+                )
+            elif self.path == "/metrics":
+                self._reply(200, daemon.metrics())
+            else:
+                self._reply(404, {"error": f"Unknown path {self.path}"})
+
+        def _reply(self, status: int, body: dict[str, Any]) -> None:
+            self._send(
+                status, "application/json", json.dumps(body, default=str).encode()
+            )
+
+        def _send(self, status: int, content_type: str, payload: bytes) -> None:
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            logger.debug(format % args)
+
+    return _Handler
+
+
+def _wants_openmetrics(headers: Any) -> bool:
+    accept = headers.get("Accept", "")
+    return "application/openmetrics-text" in accept or "text/plain" in accept
@@ -0,0 +1,148 @@
+import dataclasses
+import io
+import random
+from datetime import datetime, timedelta
+from typing import Any
+from xml.sax.saxutils import escape
+
+import fitz  # type: ignore
+import numpy as np
+from PIL import Image
+
+from arxiv_sanity_bot.config import TIMEZONE
+
+
+@dataclasses.dataclass
+class SyntheticPaper:
+    arxiv_id: str
+    title: str
+    abstract: str
+    published_on: datetime
+    votes: int
+    on_hf: bool
+
+
+class SyntheticCorpus:
+    """
+    Deterministic set of fake papers, served by the fake services.
+
+    Papers are spread over the ``days`` days before ``now``. Votes follow a
+    heavy-tailed distribution like the real alphaXiv feed, and about
+    ``hf_fraction`` of the papers also appear in the HF daily papers.
+    """
+
+    def __init__(
+        self,
+        n_papers: int,
+        days: int = 7,
+        hf_fraction: float = 0.05,
+        seed: int = 0,
+        now: datetime | None = None,
+    ):
+        rng = random.Random(seed)
+        now = now or datetime.now(tz=TIMEZONE)
+
+        self.papers = [
+            SyntheticPaper(
+                arxiv_id=f"{2600 + i // 100_000:04d}.{i % 100_000:05d}",
+                title=f"Synthetic paper number {i} about {rng.choice(_TOPICS)}",
+                abstract=f"We study {rng.choice(_TOPICS)}. " * rng.randint(5, 20),
+                published_on=now - timedelta(seconds=rng.uniform(0, days * 86400)),
+                votes=int(rng.paretovariate(1.2)),
+                on_hf=rng.random() < hf_fraction,
+            )
+            for i in range(n_papers)
+        ]
+
+        # alphaXiv "Hot" feed order
+        self.by_votes = sorted(self.papers, key=lambda p: -p.votes)
+        self.by_date = sorted(self.papers, key=lambda p: p.published_on)
+        self.by_id = {p.arxiv_id: p for p in self.papers}
+
+        self._pdf: bytes | None = None
+
+    def pdf(self) -> bytes:
+        """A small PDF with text on the first page and a bitmap on the second."""
+        if self._pdf is None:
+            self._pdf = _make_pdf()
+        return self._pdf
+
+
+def alphaxiv_entry(paper: SyntheticPaper) -> dict[str, Any]:
+    """The paper as an entry of the alphaXiv feed."""
+    return {
+        "universal_paper_id": paper.arxiv_id,
+        "title": paper.title,
+        "abstract": paper.abstract,
+        "publication_date": paper.published_on.isoformat(),
+        "metrics": {"public_total_votes": paper.votes},
+    }
+
+
+def atom_feed(
+    papers: list[SyntheticPaper],
+    pdf_url: str,
+    start: int = 0,
+    total: int | None = None,
+) -> str:
+    """
+    A page of results of the arXiv API.
+
+    :param pdf_url: base URL of the PDF links
+    :param start: index of the first paper of the page
+    :param total: total number of results (default: the papers in the page)
+    """
+    entries = "".join(
+        f"""<entry>
+<id>http://arxiv.org/abs/{p.arxiv_id}v1</id>
+<updated>{p.published_on.isoformat()}</updated>
+<published>{p.published_on.isoformat()}</published>
+<title>{escape(p.title)}</title>
+<summary>{escape(p.abstract)}</summary>
+<author><name>A. Author</name></author>
+<link href="http://arxiv.org/abs/{p.arxiv_id}v1" rel="alternate" type="text/html"/>
+<link title="pdf" href="{pdf_url}/{p.arxiv_id}v1" rel="related" type="application/pdf"/>
+<arxiv:primary_category term="cs.LG" scheme="http://arxiv.org/schemas/atom"/>
+<category term="cs.LG" scheme="http://arxiv.org/schemas/atom"/>
+</entry>"""
+        for p in papers
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<feed xmlns="http://www.w3.org/2005/Atom" '
+        'xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/" '
+        'xmlns:arxiv="http://arxiv.org/schemas/atom">'
+        f"<title>Fake arXiv</title><updated>{datetime.now(tz=TIMEZONE).isoformat()}</updated>"
+        f"<opensearch:totalResults>{total if total is not None else len(papers)}</opensearch:totalResults>"
+        f"<opensearch:startIndex>{start}</opensearch:startIndex>"
+        f"<opensearch:itemsPerPage>{len(papers)}</opensearch:itemsPerPage>"
+        f"{entries}</feed>"
+    )
+
+
+_TOPICS = [
+    "diffusion models",
+    "large language models",
+    "reinforcement learning",
+    "robot manipulation",
+    "vision transformers",
+    "graph neural networks",
+]
+
+
+def _make_pdf() -> bytes:
+    rng = np.random.default_rng(0)
+    pixels = rng.integers(0, 255, size=(300, 400, 3), dtype=np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, "PNG")
+
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_text((72, 72), "A synthetic paper")
+    page = doc.new_page()
+    page.insert_image(fitz.Rect(72, 72, 472, 372), stream=buffer.getvalue())
+
+    pdf = doc.tobytes()
+    doc.close()
+
+    return pdf
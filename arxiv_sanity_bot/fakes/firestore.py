@@ -0,0 +1,60 @@
+import json
+from typing import Any
+
+from arxiv_sanity_bot.http_session import get_session
+
+
+class FakeFirestoreClient:
+    """
+    Minimal stand-in for ``firestore.Client`` talking to the fake Firestore
+    endpoint of the local fake services. It only implements what
+    DocumentStore uses: ``collection(...).document(...).get()/.set()``.
+    """
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url.rstrip("/")
+
+    def collection(self, name: str) -> "_Collection":
+        return _Collection(f"{self.base_url}/{name}")
+
+
+class _Collection:
+    def __init__(self, url: str):
+        self._url = url
+
+    def document(self, document_id: str) -> "_Document":
+        return _Document(f"{self._url}/{document_id}")
+
+
+class _Document:
+    def __init__(self, url: str):
+        self._url = url
+
+    def get(self) -> "_Snapshot":
+        response = get_session().get(self._url, timeout=30)
+        if response.status_code == 404:
+            return _Snapshot(None)
+        response.raise_for_status()
+        return _Snapshot(response.json())
+
+    def set(self, document_data: dict[str, Any]) -> None:
+        # Firestore stores timestamps natively, here they become strings
+        response = get_session().put(
+            self._url,
+            data=json.dumps(document_data, default=str),
+            headers={"Content-Type": "application/json"},
+            timeout=30,
+        )
+        response.raise_for_status()
+
+
+class _Snapshot:
+    def __init__(self, data: dict[str, Any] | None):
+        self._data = data
+
+    @property
+    def exists(self) -> bool:
+        return self._data is not None
+
+    def to_dict(self) -> dict[str, Any] | None:
+        return self._data
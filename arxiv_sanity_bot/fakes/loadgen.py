@@ -0,0 +1,105 @@
+import dataclasses
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any
+
+from arxiv_sanity_bot.fakes.corpus import SyntheticCorpus
+from arxiv_sanity_bot.fakes.server import FakeServices, ServiceBehavior
+from arxiv_sanity_bot.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+
+_PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+
+
+@dataclasses.dataclass
+class LoadReport:
+    command: list[str]
+    returncode: int
+    elapsed: float
+    services: dict[str, Any]
+
+
+def fake_environment(services: FakeServices, pacing_scale: float) -> dict[str, str]:
+    """Environment for a bot process talking only to the fake services."""
+    env = dict(os.environ)
+    env.update(services.environment())
+    env.update(
+        {
+            "ARXIV_SANITY_BOT_PACING_SCALE": str(pacing_scale),
+            "TWITTER_CONSUMER_KEY": "fake",
+            "TWITTER_CONSUMER_SECRET": "fake",
+            "TWITTER_ACCESS_TOKEN": "fake",
+            "TWITTER_ACCESS_TOKEN_SECRET": "fake",
+        }
+    )
+    # The fakes are plain HTTP on localhost
+    env.pop("HTTP_PROXY", None)
+    env.pop("HTTPS_PROXY", None)
+    env["NO_PROXY"] = "127.0.0.1,localhost"
+    # The bot runs in its own working directory, make sure it imports this
+    # very package even when it is not installed
+    env["PYTHONPATH"] = os.pathsep.join(
+        filter(None, [_PACKAGE_ROOT, env.get("PYTHONPATH")])
+    )
+    return env
+
+
+def run_load(
+    bot_args: list[str],
+    n_papers: int = 10_000,
+    behavior: ServiceBehavior | None = None,
+    pacing_scale: float = 0.0,
+    workdir: str | None = None,
+    seed: int = 0,
+) -> LoadReport:
+    """
+    Run one bot invocation (e.g. ``["--dry"]`` or ``["backfill", ...]``) as a
+    separate process against fake services serving ``n_papers`` papers.
+
+    :param bot_args: command line arguments for arxiv-sanity-bot
+    :param n_papers: size of the synthetic corpus
+    :param behavior: latency, error rate and rate limit applied to every service
+    :param pacing_scale: multiplier of the bot's polite pauses
+    :param workdir: working directory of the bot (a temporary one by default)
+    :param seed: seed of the corpus and of the error injection
+    """
+    corpus = SyntheticCorpus(n_papers, seed=seed)
+    behaviors = (
+        {name: behavior for name in ("alphaxiv", "hf", "arxiv", "openai", "twitter")}
+        if behavior is not None
+        else None
+    )
+    services = FakeServices(corpus, behaviors=behaviors, seed=seed)
+    services.start()
+
+    command = [sys.executable, "-m", "arxiv_sanity_bot.cli.arxiv_sanity_bot", *bot_args]
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            t0 = time.perf_counter()
+            process = subprocess.run(
+                command,
+                cwd=workdir or tmp_dir,
+                env=fake_environment(services, pacing_scale),
+            )
+            elapsed = time.perf_counter() - t0
+    finally:
+        services.stop()
+
+    report = LoadReport(
+        command=bot_args,
+        returncode=process.returncode,
+        elapsed=elapsed,
+        services=services.stats(),
+    )
+    logger.info(
+        f"Load run finished in {elapsed:.1f} s with exit code {process.returncode}",
+        extra=dataclasses.asdict(report),
+    )
+    return report
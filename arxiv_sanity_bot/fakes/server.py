@@ -0,0 +1,339 @@
+import dataclasses
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qs, urlparse
+
+from arxiv_sanity_bot.config import TIMEZONE
+from arxiv_sanity_bot.fakes.corpus import SyntheticCorpus, alphaxiv_entry, atom_feed
+from arxiv_sanity_bot.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+
+SERVICES = ("alphaxiv", "hf", "arxiv", "openai", "twitter", "firestore")
+
+
+@dataclasses.dataclass
+class ServiceBehavior:
+    # Seconds added to every response
+    latency: float = 0.0
+    # Fraction of requests answered with a 500
+    error_rate: float = 0.0
+    # Requests per second allowed before answering 429 (None: unlimited)
+    rate_limit: float | None = None
+
+
+class _TokenBucket:
+    def __init__(self, rate: float):
+        self._rate = rate
+        self._tokens = rate
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self._rate, self._tokens + (now - self._last) * self._rate
+            )
+            self._last = now
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+class FakeServices:
+    """
+    Local stand-ins for every external service the bot talks to, served from
+    one HTTP server under one path prefix per service (see ``environment``).
+    """
+
+    def __init__(
+        self,
+        corpus: SyntheticCorpus,
+        behaviors: dict[str, ServiceBehavior] | None = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        seed: int = 0,
+    ):
+        self.corpus = corpus
+        self.behaviors = {s: ServiceBehavior() for s in SERVICES}
+        self.behaviors.update(behaviors or {})
+
+        self._buckets = {
+            s: _TokenBucket(b.rate_limit)
+            for s, b in self.behaviors.items()
+            if b.rate_limit is not None
+        }
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+        self.documents: dict[str, dict[str, Any]] = {}
+        self.tweets: list[dict[str, Any]] = []
+        self.requests: Counter[str] = Counter()
+        self.errors: Counter[str] = Counter()
+        self.throttled: Counter[str] = Counter()
+
+        self._server = ThreadingHTTPServer((host, port), _make_handler(self))
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        if isinstance(host, bytes):
+            host = host.decode()
+        return f"http://{host}:{port}"
+
+    def environment(self) -> dict[str, str]:
+        """Environment variables pointing the bot to these services."""
+        return {
+            "ARXIV_SANITY_BOT_ALPHAXIV_URL": f"{self.base_url}/alphaxiv",
+            "ARXIV_SANITY_BOT_HF_URL": f"{self.base_url}/hf",
+            "ARXIV_SANITY_BOT_ARXIV_API_URL": f"{self.base_url}/arxiv/api/query",
+            "ARXIV_SANITY_BOT_ARXIV_PDF_URL": f"{self.base_url}/arxiv/pdf",
+            "OPENAI_BASE_URL": f"{self.base_url}/openai/v1",
+            "OPENAI_API_KEY": "fake",
+            "ARXIV_SANITY_BOT_TWITTER_URL": f"{self.base_url}/twitter",
+            "ARXIV_SANITY_BOT_FIRESTORE_URL": f"{self.base_url}/firestore",
+            # Every fake paper has the same PDF: a cache would skip the
+            # downloads and the extractions being measured
+            "ARXIV_SANITY_BOT_PAPER_CACHE_DIR": "",
+        }
+
+    def start(self) -> None:
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="fake-services", daemon=True
+        )
+        self._thread.start()
+        logger.info(f"Fake services listening on {self.base_url}")
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread = None
+        self._server.server_close()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "requests": dict(self.requests),
+            "errors": dict(self.errors),
+            "throttled": dict(self.throttled),
+            "tweets": len(self.tweets),
+            "documents": len(self.documents),
+        }
+
+    def admit(self, service: str) -> int | None:
+        """
+        Apply latency, rate limit and error injection.
+
+        :return: the status code to answer with instead of serving, or None
+        """
+        behavior = self.behaviors[service]
+
+        with self._lock:
+            self.requests[service] += 1
+            fail = self._rng.random() < behavior.error_rate
+
+        if behavior.latency:
+            time.sleep(behavior.latency)
+
+        bucket = self._buckets.get(service)
+        if bucket is not None and not bucket.take():
+            with self._lock:
+                self.throttled[service] += 1
+            return 429
+
+        if fail:
+            with self._lock:
+                self.errors[service] += 1
+            return 500
+
+        return None
+
+    # Routes. Each returns (status, content type, body)
+
+    def alphaxiv_feed(self, query: dict[str, list[str]]) -> tuple[int, str, bytes]:
+        page_num = int(query.get("pageNum", ["0"])[0])
+        page_size = int(query.get("pageSize", ["100"])[0])
+        page = self.corpus.by_votes[page_num * page_size : (page_num + 1) * page_size]
+
+        return _json(200, {"papers": [alphaxiv_entry(p) for p in page]})
+
+    def hf_daily_papers(self, query: dict[str, list[str]]) -> tuple[int, str, bytes]:
+        date = query.get("date", [""])[0]
+        papers = [
+            {
+                "paper": {
+                    "id": p.arxiv_id,
+                    "title": p.title,
+                    "summary": p.abstract,
+                    "publishedAt": p.published_on.isoformat(),
+                }
+            }
+            for p in self.corpus.papers
+            if p.on_hf and p.published_on.strftime("%Y-%m-%d") == date
+        ]
+        return _json(200, papers)
+
+    def arxiv_query(self, query: dict[str, list[str]]) -> tuple[int, str, bytes]:
+        if "id_list" in query:
+            ids = [i for i in query["id_list"][0].split(",") if i]
+            papers = [self.corpus.by_id[i] for i in ids if i in self.corpus.by_id]
+        else:
+            papers = self.corpus.by_date
+            match = re.search(
+                r"submittedDate:\[(\d{12}) TO (\d{12})\]",
+                query.get("search_query", [""])[0],
+            )
+            if match:
+                after, before = (
+                    datetime.strptime(d, "%Y%m%d%H%M").replace(tzinfo=TIMEZONE)
+                    for d in match.groups()
+                )
+                papers = [p for p in papers if after <= p.published_on <= before]
+
+        start = int(query.get("start", ["0"])[0])
+        max_results = int(query.get("max_results", ["100"])[0])
+
+        feed = atom_feed(
+            papers[start : start + max_results],
+            f"{self.base_url}/arxiv/pdf",
+            start=start,
+            total=len(papers),
+        )
+        return 200, "application/atom+xml", feed.encode()
+
+    def arxiv_pdf(self) -> tuple[int, str, bytes]:
+        return 200, "application/pdf", self.corpus.pdf()
+
+    def openai_chat(self, body: dict[str, Any]) -> tuple[int, str, bytes]:
+        prompt = body["messages"][-1]["content"]
+        content = (
+            f"A bot-generated summary of a paper ({len(prompt)} characters of prompt)."
+        )
+        return _json(
+            200,
+            {
+                "id": "chatcmpl-fake",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body.get("model", "fake"),
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": {
+                    "prompt_tokens": 1,
+                    "completion_tokens": 1,
+                    "total_tokens": 2,
+                },
+            },
+        )
+
+    def twitter_tweet(self, body: dict[str, Any]) -> tuple[int, str, bytes]:
+        with self._lock:
+            tweet_id = str(len(self.tweets) + 1)
+            self.tweets.append({"id": tweet_id, **body})
+        return _json(201, {"data": {"id": tweet_id, "text": body.get("text", "")}})
+
+    def twitter_media_upload(self) -> tuple[int, str, bytes]:
+        media_id = random.randint(1, 10**18)
+        return _json(
+            200,
+            {
+                "media_id": media_id,
+                "media_id_string": str(media_id),
+                "size": 1,
+                "expires_after_secs": 86400,
+                "image": {"image_type": "image/jpeg", "w": 1, "h": 1},
+            },
+        )
+
+    def firestore(self, method: str, path: str, body: Any) -> tuple[int, str, bytes]:
+        if method == "PUT":
+            with self._lock:
+                self.documents[path] = body
+            return _json(200, body)
+
+        if path not in self.documents:
+            return _json(404, {"error": "not found"})
+        return _json(200, self.documents[path])
+
+
+def _json(status: int, body: Any) -> tuple[int, str, bytes]:
+    return status, "application/json", json.dumps(body).encode()
+
+
+def _make_handler(services: FakeServices) -> type[BaseHTTPRequestHandler]:
+    class _Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self) -> None:
+            self._dispatch("GET")
+
+        def do_POST(self) -> None:
+            self._dispatch("POST")
+
+        def do_PUT(self) -> None:
+            self._dispatch("PUT")
+
+        def _dispatch(self, method: str) -> None:
+            url = urlparse(self.path)
+            query = parse_qs(url.query)
+            service = url.path.split("/")[1]
+
+            length = int(self.headers.get("Content-Length", 0))
+            raw_body = self.rfile.read(length) if length else b""
+
+            if service not in SERVICES:
+                return self._reply(*_json(404, {"error": f"Unknown path {url.path}"}))
+
+            status = services.admit(service)
+            if status is not None:
+                return self._reply(*_json(status, {"error": "injected"}))
+
+            path = url.path[len(service) + 1 :]
+
+            if service == "alphaxiv":
+                reply = services.alphaxiv_feed(query)
+            elif service == "hf":
+                reply = services.hf_daily_papers(query)
+            elif service == "arxiv" and path.startswith("/pdf/"):
+                reply = services.arxiv_pdf()
+            elif service == "arxiv":
+                reply = services.arxiv_query(query)
+            elif service == "openai":
+                reply = services.openai_chat(json.loads(raw_body))
+            elif service == "twitter" and "media/upload" in path:
+                reply = services.twitter_media_upload()
+            elif service == "twitter":
+                reply = services.twitter_tweet(json.loads(raw_body or b"{}"))
+            else:
+                body = json.loads(raw_body) if raw_body else None
+                reply = services.firestore(method, path, body)
+
+            self._reply(*reply)
+
+        def _reply(self, status: int, content_type: str, body: bytes) -> None:
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+    return _Handler
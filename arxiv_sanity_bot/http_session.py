@@ -0,0 +1,46 @@
+import requests
+
+
+_SESSION: requests.Session | None = None
+
+
+def get_session() -> requests.Session:
+    """
+    Return the process-wide HTTP session.
+
+    Sharing one session keeps the connection pools to the paper sources alive
+    across calls (and across cycles when running as a daemon).
+    """
+    global _SESSION
+
+    if _SESSION is None:
+        _SESSION = requests.Session()
+
+    return _SESSION
+
+
+class RedirectAdapter(requests.adapters.HTTPAdapter):
+    """
+    Transport adapter sending requests for some hosts to another base URL.
+
+    Used to point clients with hardcoded hosts (tweepy) to the local fake
+    services.
+    """
+
+    def __init__(self, hosts: list[str], base_url: str, **kwargs):
+        super().__init__(**kwargs)
+        self._hosts = hosts
+        self._base_url = base_url.rstrip("/")
+
+    def send(self, request, **kwargs):  # type: ignore[no-untyped-def]
+        for host in self._hosts:
+            if request.url.startswith(host):
+                request.url = self._base_url + request.url[len(host) :]
+                break
+        return super().send(request, **kwargs)
+
+
+def redirect(session: requests.Session, hosts: list[str], base_url: str) -> None:
+    adapter = RedirectAdapter(hosts, base_url)
+    for host in hosts:
+        session.mount(host, adapter)
@@ -0,0 +1,313 @@
+import dataclasses
+import json
+import os
+import socket
+import sqlite3
+import time
+import uuid
+from typing import Any
+
+from arxiv_sanity_bot.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+
+SUMMARIZE = "summarize"
+EXTRACT = "extract"
+STAGES = (SUMMARIZE, EXTRACT)
+
+# Job and batch states
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+PUBLISHING = "publishing"
+PUBLISHED = "published"
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS batches (
+    id TEXT PRIMARY KEY,
+    n_retrieved INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    batch_id TEXT NOT NULL REFERENCES batches(id),
+    stage TEXT NOT NULL,
+    arxiv_id TEXT NOT NULL,
+    rank INTEGER NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_expires REAL,
+    worker TEXT,
+    result TEXT,
+    blob BLOB,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    UNIQUE (batch_id, stage, arxiv_id)
+);
+CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (stage, status, id);
+"""
+
+
+@dataclasses.dataclass
+class Job:
+    id: int
+    batch_id: str
+    stage: str
+    arxiv_id: str
+    rank: int
+    payload: dict[str, Any]
+    attempts: int
+
+
+class JobQueue:
+    """
+    Durable job queue between the pipeline stages, backed by a SQLite file.
+
+    Any number of processes can share the file: jobs are claimed inside
+    ``BEGIN IMMEDIATE`` transactions and held with a lease, so a job whose
+    worker dies is handed to another worker once the lease expires.
+    """
+
+    def __init__(self, path: str, lease: float = 600, max_attempts: int = 3):
+        self._path = path
+        self._lease = lease
+        self._max_attempts = max_attempts
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+
+        # Autocommit mode: transactions are managed explicitly below
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def _transaction(self) -> "_Transaction":
+        return _Transaction(self._conn)
+
+    def enqueue_batch(
+        self, n_retrieved: int, papers: list[dict[str, Any]]
+    ) -> str | None:
+        """
+        Add one batch (the papers selected by one fetch), with one job per
+        paper and stage. Papers are published in the order given.
+
+        Papers already in the queue are skipped: those of batches not
+        published yet, and those handed to the publisher (summarized) in
+        published batches. So two overlapping fetches never post a paper
+        twice.
+
+        :return: the id of the new batch, or None if all the papers were
+        already in the queue
+        """
+        batch_id = uuid.uuid4().hex
+        now = time.time()
+
+        with self._transaction():
+            queued = {
+                row["arxiv_id"]
+                for row in self._conn.execute(
+                    "SELECT j.arxiv_id FROM jobs j JOIN batches b "
+                    "ON j.batch_id = b.id WHERE j.stage = ? "
+                    "AND (b.status != ? OR j.status = ?)",
+                    (SUMMARIZE, PUBLISHED, DONE),
+                )
+            }
+            new_papers = [
+                (rank, paper)
+                for rank, paper in enumerate(papers)
+                if paper["arxiv"] not in queued
+            ]
+
+            if len(new_papers) < len(papers):
+                logger.info(
+                    f"Skipping {len(papers) - len(new_papers)} papers already "
+                    "in the queue",
+                    extra={
+                        "arxiv_ids": [
+                            p["arxiv"] for p in papers if p["arxiv"] in queued
+                        ]
+                    },
+                )
+
+            if not new_papers:
+                return None
+
+            self._conn.execute(
+                "INSERT INTO batches VALUES (?, ?, ?, ?, ?)",
+                (batch_id, n_retrieved, PENDING, now, now),
+            )
+            self._conn.executemany(
+                "INSERT INTO jobs (batch_id, stage, arxiv_id, rank, payload, "
+                "status, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        batch_id,
+                        stage,
+                        paper["arxiv"],
+                        rank,
+                        json.dumps(paper, default=str),
+                        PENDING,
+                        now,
+                        now,
+                    )
+                    for rank, paper in new_papers
+                    for stage in STAGES
+                ],
+            )
+
+        logger.info(
+            f"Enqueued batch {batch_id} with {len(new_papers)} papers",
+            extra={"batch_id": batch_id},
+        )
+
+        return batch_id
+
+    def claim(self, stage: str) -> Job | None:
+        now = time.time()
+
+        with self._transaction():
+            row = self._conn.execute(
+                "SELECT * FROM jobs WHERE stage = ? AND attempts < ? AND "
+                "(status = ? OR (status = ? AND lease_expires < ?)) "
+                "ORDER BY id LIMIT 1",
+                (stage, self._max_attempts, PENDING, RUNNING, now),
+            ).fetchone()
+
+            if row is None:
+                return None
+
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, attempts = attempts + 1, "
+                "lease_expires = ?, worker = ?, updated_at = ? WHERE id = ?",
+                (RUNNING, now + self._lease, self.worker_id, now, row["id"]),
+            )
+
+        return Job(
+            id=row["id"],
+            batch_id=row["batch_id"],
+            stage=row["stage"],
+            arxiv_id=row["arxiv_id"],
+            rank=row["rank"],
+            payload=json.loads(row["payload"]),
+            attempts=row["attempts"] + 1,
+        )
+
+    def complete(
+        self, job: Job, result: dict[str, Any], blob: bytes | None = None
+    ) -> None:
+        self._conn.execute(
+            "UPDATE jobs SET status = ?, result = ?, blob = ?, lease_expires = NULL, "
+            "updated_at = ? WHERE id = ? AND worker = ?",
+            (DONE, json.dumps(result), blob, time.time(), job.id, self.worker_id),
+        )
+
+    def fail(self, job: Job, error: str) -> None:
+        # Back to pending (to be retried) until we run out of attempts
+        status = FAILED if job.attempts >= self._max_attempts else PENDING
+        self._conn.execute(
+            "UPDATE jobs SET status = ?, last_error = ?, lease_expires = NULL, "
+            "updated_at = ? WHERE id = ? AND worker = ?",
+            (status, error, time.time(), job.id, self.worker_id),
+        )
+
+    def claim_ready_batch(self) -> tuple[str, int] | None:
+        """
+        Claim for publishing the oldest batch whose jobs are all finished.
+
+        A claimed batch is never handed out again, even if the publisher dies
+        while posting: posting is at-most-once and the document store tells
+        which papers made it.
+
+        :return: (batch id, number of papers retrieved) or None
+        """
+        now = time.time()
+
+        # A job still running on its last attempt after its lease expired is
+        # as good as failed: nobody will claim it again
+        with self._transaction():
+            row = self._conn.execute(
+                "SELECT b.id, b.n_retrieved FROM batches b WHERE b.status = ? AND "
+                "NOT EXISTS (SELECT 1 FROM jobs j WHERE j.batch_id = b.id AND "
+                "j.status IN (?, ?) AND NOT (j.status = ? AND j.lease_expires < ? "
+                "AND j.attempts >= ?)) ORDER BY b.created_at LIMIT 1",
+                (PENDING, PENDING, RUNNING, RUNNING, now, self._max_attempts),
+            ).fetchone()
+
+            if row is None:
+                return None
+
+            self._conn.execute(
+                "UPDATE batches SET status = ?, updated_at = ? WHERE id = ?",
+                (PUBLISHING, time.time(), row["id"]),
+            )
+
+        return row["id"], row["n_retrieved"]
+
+    def mark_published(self, batch_id: str) -> None:
+        self._conn.execute(
+            "UPDATE batches SET status = ?, updated_at = ? WHERE id = ?",
+            (PUBLISHED, time.time(), batch_id),
+        )
+
+    def batch_results(
+        self, batch_id: str
+    ) -> list[
+        tuple[dict[str, Any], dict[str, Any], dict[str, Any] | None, bytes | None]
+    ]:
+        """
+        Return, in publishing order, the papers of the batch that were
+        summarized, as (paper, summary result, extraction result, image bytes).
+        The extraction result is None if extraction failed.
+        """
+        rows = self._conn.execute(
+            "SELECT * FROM jobs WHERE batch_id = ? AND status = ? ORDER BY rank",
+            (batch_id, DONE),
+        ).fetchall()
+
+        summaries = {r["arxiv_id"]: r for r in rows if r["stage"] == SUMMARIZE}
+        extractions = {r["arxiv_id"]: r for r in rows if r["stage"] == EXTRACT}
+
+        results = []
+        for arxiv_id, row in summaries.items():
+            extraction = extractions.get(arxiv_id)
+            results.append(
+                (
+                    json.loads(row["payload"]),
+                    json.loads(row["result"]),
+                    json.loads(extraction["result"]) if extraction else None,
+                    extraction["blob"] if extraction else None,
+                )
+            )
+
+        return results
+
+    def counts(self) -> dict[str, dict[str, int]]:
+        counts: dict[str, dict[str, int]] = {}
+        for row in self._conn.execute(
+            "SELECT stage, status, COUNT(*) AS n FROM jobs GROUP BY stage, status"
+        ):
+            counts.setdefault(row["stage"], {})[row["status"]] = row["n"]
+        return counts
+
+
+class _Transaction:
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+
+    def __enter__(self) -> None:
+        # IMMEDIATE takes the write lock up front, so two workers can never
+        # claim the same job
+        self._conn.execute("BEGIN IMMEDIATE")
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._conn.execute("ROLLBACK" if exc_type else "COMMIT")
@@ -0,0 +1,142 @@
+import os
+import time
+from typing import Any, Callable
+
+from arxiv_sanity_bot.arxiv.extract_image import extract_first_image, image_workspace
+from arxiv_sanity_bot.jobs.queue import EXTRACT, SUMMARIZE, Job, JobQueue
+from arxiv_sanity_bot.logger import get_logger
+from arxiv_sanity_bot.models.openai import OpenAI
+from arxiv_sanity_bot.telemetry.tracing import span
+
+
+logger = get_logger(__name__)
+
+
+Handler = Callable[[Job], tuple[dict[str, Any], bytes | None]]
+
+
+def summarize_handler(llm: OpenAI, get_url: Callable[[str], str]) -> Handler:
+    def _handle(job: Job) -> tuple[dict[str, Any], bytes | None]:
+        summary = llm.summarize_abstract(job.payload["abstract"])
+        return {"summary": summary, "url": get_url(job.arxiv_id)}, None
+
+    return _handle
+
+
+def extract_handler() -> Handler:
+    def _handle(job: Job) -> tuple[dict[str, Any], bytes | None]:
+        img_path = extract_first_image(job.arxiv_id)
+
+        if img_path is None:
+            return {"image": None}, None
+
+        # The image travels through the queue, so the publisher does not need
+        # to run on the same machine as the extraction worker
+        with open(img_path, "rb") as f:
+            return {"image": os.path.basename(img_path)}, f.read()
+
+    return _handle
+
+
+def run_worker(
+    queue: JobQueue,
+    stage: str,
+    handler: Handler,
+    poll_interval: float = 5.0,
+    exit_when_idle: bool = False,
+) -> int:
+    """
+    Process jobs of the given stage until stopped (or until the queue is
+    empty, if ``exit_when_idle``).
+
+    :return: the number of jobs processed
+    """
+    assert stage in (SUMMARIZE, EXTRACT), f"Unknown stage {stage}"
+
+    n_processed = 0
+
+    while True:
+        job = queue.claim(stage)
+
+        if job is None:
+            if exit_when_idle:
+                break
+            time.sleep(poll_interval)
+            continue
+
+        logger.info(
+            f"Processing {stage} job for {job.arxiv_id}",
+            extra={"job_id": job.id, "attempt": job.attempts},
+        )
+
+        try:
+            with span("job", stage=stage, arxiv_id=job.arxiv_id):
+                result, blob = handler(job)
+        except Exception as e:
+            logger.error(
+                f"{stage} job for {job.arxiv_id} failed",
+                exc_info=True,
+                extra={"job_id": job.id, "exception": str(e)},
+            )
+            queue.fail(job, f"{type(e).__name__}: {e}")
+        else:
+            queue.complete(job, result, blob)
+
+        n_processed += 1
+
+    logger.info(f"{stage} worker processed {n_processed} jobs")
+
+    return n_processed
+
+
+def publish_ready_batches(
+    queue: JobQueue,
+    publish: Callable[[int, list[dict[str, Any]]], None],
+) -> int:
+    """
+    Publish every batch whose jobs are finished.
+
+    Only one publisher should run at a time. Each batch is claimed before
+    posting and never handed out again, so no batch is posted twice.
+
+    :param publish: called with (n_retrieved, summaries), where summaries are
+    in the format expected by send_tweets
+    :return: the number of batches published
+    """
+    n_published = 0
+
+    while (claimed := queue.claim_ready_batch()) is not None:
+        batch_id, n_retrieved = claimed
+
+        summaries = []
+        for paper, summary, extraction, blob in queue.batch_results(batch_id):
+            img_path = None
+            if extraction is not None and blob is not None:
+                img_path = os.path.join(image_workspace(), extraction["image"])
+                with open(img_path, "wb") as f:
+                    f.write(blob)
+
+            summaries.append(
+                {
+                    "arxiv": paper["arxiv"],
+                    "title": paper["title"],
+                    "score": paper["score"],
+                    "published_on": paper["published_on"],
+                    "image": img_path,
+                    "tweet": summary["summary"],
+                    "url": summary["url"],
+                }
+            )
+
+        logger.info(
+            f"Publishing batch {batch_id} with {len(summaries)} papers",
+            extra={"batch_id": batch_id},
+        )
+
+        if summaries:
+            publish(n_retrieved, summaries)
+
+        queue.mark_published(batch_id)
+        n_published += 1
+
+    return n_published
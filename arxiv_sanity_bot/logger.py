@@ -4,6 +4,8 @@ import os
 import sys
 import warnings
 
+from arxiv_sanity_bot.telemetry.context import current_ids
+
 
 class FatalError(Exception):
     """Exception raised for fatal errors that should stop the bot."""
@@ -64,6 +66,11 @@ class JSONFormatter(logging.Formatter):
             "msg": record.getMessage(),
         }
 
+        # Correlate the record with the span it was emitted in (see tracing)
+        ids = current_ids.get()
+        if ids is not None:
+            log_dict["trace_id"], log_dict["span_id"] = ids
+
         # Extract any extra fields as context
         extra_fields = {
             key: value
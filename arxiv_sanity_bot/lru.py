@@ -0,0 +1,59 @@
+import threading
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, TypeVar
+
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class LRUCache(Generic[K, V]):
+    """
+    A mapping keeping at most ``max_size`` entries: adding one more evicts
+    the least recently used (read or written). Thread-safe.
+
+    Used for the caches that long-running processes (the daemon) keep warm
+    across cycles, so that they do not grow with every paper ever seen.
+    """
+
+    def __init__(self, max_size: int, on_evict: Callable[[K, V], None] | None = None):
+        """
+        :param max_size: the number of entries kept
+        :param on_evict: called with each evicted entry (e.g. to remove the
+            file it points to)
+        """
+        self._max_size = max_size
+        self._on_evict = on_evict
+        self._entries: OrderedDict[K, V] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._entries
+
+    def __getitem__(self, key: K) -> V:
+        with self._lock:
+            value = self._entries[key]
+            self._entries.move_to_end(key)
+            return value
+
+    def get(self, key: K, default: V | None = None) -> V | None:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __setitem__(self, key: K, value: V) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+
+            evicted = []
+            while len(self._entries) > self._max_size:
+                evicted.append(self._entries.popitem(last=False))
+
+        if self._on_evict is not None:
+            for evicted_key, evicted_value in evicted:
+                self._on_evict(evicted_key, evicted_value)
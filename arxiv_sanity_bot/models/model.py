@@ -2,7 +2,9 @@ from typing import Protocol
 
 
 class LLM(Protocol):
-    def summarize_abstract(self, abstract: str) -> str:  # pragma: no cover
+    def summarize_abstract(
+        self, abstract: str, instructions: str = ""
+    ) -> str:  # pragma: no cover
         pass
 
     def generate_bot_summary(
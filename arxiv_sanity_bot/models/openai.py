@@ -2,11 +2,14 @@ import time
 from typing import Any
 
 from arxiv_sanity_bot.logger import get_logger, FatalError
+from arxiv_sanity_bot.lru import LRUCache
 from arxiv_sanity_bot.models.model import LLM
+from arxiv_sanity_bot.telemetry.metrics import SUMMARIES, record_retry, timer
 from arxiv_sanity_bot.config import (
     CHATGPT_N_TRIALS,
     TWEET_TEXT_LENGTH,
     CHATGPT_SLEEP_TIME,
+    SUMMARY_CACHE_SIZE,
 )
 import openai
 
@@ -19,7 +22,16 @@ class OpenAI(LLM):
     def __init__(self):
         self._client = openai.OpenAI()
 
-    def summarize_abstract(self, abstract: str) -> str:
+        # Summaries already generated by this instance, keyed by
+        # (instructions, abstract)
+        self._summaries: LRUCache[tuple[str, str], str] = LRUCache(SUMMARY_CACHE_SIZE)
+
+    def summarize_abstract(self, abstract: str, instructions: str = "") -> str:
+        if (instructions, abstract) in self._summaries:
+            logger.debug("Using cached summary", extra={"abstract": abstract})
+            SUMMARIES.inc(origin="cached")
+            return self._summaries[(instructions, abstract)]
+
         summary = ""
 
         history = [
@@ -33,7 +45,7 @@ class OpenAI(LLM):
                 "content": f"Summarize the following abstract in one short tweet: `{abstract}`. "
                 "Do not include any hashtag or emojis. Make sure to highlight the innovative contribution of the paper. "
                 "Use the third person when referring to the authors. Avoid overly technical language. "
-                f"Use {TWEET_TEXT_LENGTH} characters or less.",
+                f"Use {TWEET_TEXT_LENGTH} characters or less. {instructions}".strip(),
             },
         ]
 
@@ -68,6 +80,9 @@ class OpenAI(LLM):
                 f"OpenAI could not successfully generate a tweet after {CHATGPT_N_TRIALS}"
             )
 
+        self._summaries[(instructions, abstract)] = summary
+        SUMMARIES.inc(origin="generated")
+
         return summary
 
     def generate_bot_summary(
@@ -99,16 +114,19 @@ class OpenAI(LLM):
             try:
                 logger.debug("Calling OpenAI API", extra={"history": history})
 
-                completion = self._client.chat.completions.create(
-                    model="gpt-5-mini",
-                    messages=history,
-                )
+                with timer("openai", str(self._client.base_url)):
+                    completion = self._client.chat.completions.create(
+                        model="gpt-5-mini",
+                        messages=history,
+                    )
             except Exception as e:
                 logger.error(
                     "Could not generate summary sentence",
                     exc_info=True,
                     extra={"exception": str(e)},
                 )
+                if i < CHATGPT_N_TRIALS - 1:
+                    record_retry("openai", i + 1)
                 time.sleep(CHATGPT_SLEEP_TIME)
                 continue
             else:
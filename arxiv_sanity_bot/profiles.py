@@ -0,0 +1,69 @@
+import json
+from typing import Annotated
+
+import pandas as pd
+from pydantic import BaseModel, Field, StringConstraints
+
+from arxiv_sanity_bot.config import (
+    FIREBASE_COLLECTION,
+    MAX_NUM_PAPERS,
+    SCORE_THRESHOLD,
+)
+
+
+class Profile(BaseModel):
+    """
+    One bot personality: which papers it posts, how it summarizes them and
+    where it posts them. Fetching, PDF downloads and image extraction are
+    shared among all the profiles of a run.
+    """
+
+    name: Annotated[str, StringConstraints(min_length=1)]
+    score_threshold: int = SCORE_THRESHOLD
+    max_num_papers: int = Field(default=MAX_NUM_PAPERS, ge=1)
+    # Keep only papers whose title or abstract contains one of these
+    # (case-insensitive). Empty means no filtering
+    keywords: list[str] = Field(default_factory=list)
+    # Extra instructions appended to the summarization prompt
+    summary_instructions: str = ""
+    firebase_collection: str = FIREBASE_COLLECTION
+    # Prefix of the environment variables holding the Twitter credentials
+    # (e.g. TWITTER -> TWITTER_CONSUMER_KEY, ...)
+    twitter_env_prefix: str = "TWITTER"
+
+    def select(self, abstracts: pd.DataFrame) -> pd.DataFrame:
+        if abstracts.shape[0] == 0:
+            return abstracts
+
+        idx = abstracts["score"] >= self.score_threshold
+
+        if self.keywords:
+            text = (abstracts["title"] + " " + abstracts["abstract"]).str.lower()
+            matches = pd.Series(False, index=abstracts.index)
+            for keyword in self.keywords:
+                matches |= text.str.contains(keyword.lower(), regex=False)
+            idx &= matches
+
+        return abstracts[idx].reset_index(drop=True)
+
+
+DEFAULT_PROFILE = Profile(name="default")
+
+
+def load_profiles(path: str) -> list[Profile]:
+    """
+    Load profiles from a JSON file containing a list of profile objects.
+
+    :param path: path to the JSON file
+    :return: the list of profiles, in the order they appear in the file
+    """
+    with open(path) as f:
+        raw = json.load(f)
+
+    profiles = [Profile(**p) for p in raw]
+
+    names = [p.name for p in profiles]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Duplicated profile names in {path}: {names}")
+
+    return profiles
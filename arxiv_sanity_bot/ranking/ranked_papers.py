@@ -1,5 +1,6 @@
 import re
 import random
+import threading
 import time
 from datetime import datetime, timedelta
 from typing import Any
@@ -15,16 +16,23 @@ from tenacity import (
 )
 
 from arxiv_sanity_bot.config import (
+    ALPHAXIV_FEED_DAYS,
     ALPHAXIV_PAGE_SIZE,
     ALPHAXIV_MAX_PAPERS,
     ALPHAXIV_TOP_PERCENTILE,
     ALPHAXIV_N_RETRIES,
     ALPHAXIV_WAIT_TIME,
+    HF_DAYS,
     HF_N_RETRIES,
     HF_WAIT_TIME,
+    ALPHAXIV_API_URL,
+    HF_API_URL,
+    PACING_SCALE,
 )
+from arxiv_sanity_bot.http_session import get_session
 from arxiv_sanity_bot.logger import get_logger, FatalError
 from arxiv_sanity_bot.schemas import PaperSource, RawPaper, RankedPaper
+from arxiv_sanity_bot.telemetry.metrics import PAPERS_FETCHED, count_retries, timed
 
 
 logger = get_logger(__name__)
@@ -133,12 +141,14 @@ def _extract_field(
     retry=retry_if_exception_type(AlphaXivAPIError),
     stop=stop_after_attempt(ALPHAXIV_N_RETRIES),
     wait=wait_exponential(multiplier=1, min=1, max=ALPHAXIV_WAIT_TIME),
+    before_sleep=count_retries("alphaxiv_page"),
     reraise=True,
 )
+@timed("alphaxiv_page", ALPHAXIV_API_URL)
 def _fetch_alphaxiv_page(
     page_num: int, days: int = 7, page_size: int = ALPHAXIV_PAGE_SIZE
 ) -> list[RawPaper]:
-    url = "https://api.alphaxiv.org/papers/v3/feed"
+    url = f"{ALPHAXIV_API_URL}/papers/v3/feed"
     params = {
         "pageNum": str(page_num),
         "sort": "Hot",
@@ -148,7 +158,7 @@ def _fetch_alphaxiv_page(
     }
 
     try:
-        response = requests.get(url, params=params, timeout=30)
+        response = get_session().get(url, params=params, timeout=30)
         response.raise_for_status()
         data = response.json()
         raw_papers = data.get("papers", [])
@@ -178,6 +188,15 @@ def fetch_alphaxiv_papers(
     after: datetime | None = None,
     before: datetime | None = None,
 ) -> tuple[list[RawPaper], int]:
+    all_papers = _fetch_alphaxiv_feed(days, max_papers, top_percentile)
+    return _select_alphaxiv_papers(
+        all_papers, max_papers, top_percentile, after, before
+    )
+
+
+def _fetch_alphaxiv_feed(
+    days: int, max_papers: int, top_percentile: float
+) -> list[RawPaper]:
     all_papers: list[RawPaper] = []
     page_num = 0
     max_pages = (max_papers + ALPHAXIV_PAGE_SIZE - 1) // ALPHAXIV_PAGE_SIZE
@@ -204,10 +223,21 @@ def fetch_alphaxiv_papers(
             break
 
         delay = random.randint(1, 3)
-        time.sleep(delay)
+        time.sleep(delay * PACING_SCALE)
 
-    papers_with_votes = [p for p in all_papers if p.votes is not None]
+    PAPERS_FETCHED.inc(len(all_papers), source="alphaxiv")
 
+    return all_papers
+
+
+def _select_alphaxiv_papers(
+    all_papers: list[RawPaper],
+    max_papers: int,
+    top_percentile: float,
+    after: datetime | None,
+    before: datetime | None,
+) -> tuple[list[RawPaper], int]:
+    papers_with_votes = [p for p in all_papers if p.votes is not None]
     if not papers_with_votes:
         logger.info("No papers with vote data from alphaXiv")
         return [], 0
@@ -249,13 +279,15 @@ def fetch_alphaxiv_papers(
     retry=retry_if_exception_type(HuggingFaceAPIError),
     stop=stop_after_attempt(HF_N_RETRIES),
     wait=wait_exponential(multiplier=1, min=1, max=HF_WAIT_TIME),
+    before_sleep=count_retries("hf_date"),
     reraise=True,
 )
+@timed("hf_date", HF_API_URL)
 def _fetch_hf_papers_for_date(date_str: str) -> list[RawPaper]:
-    url = f"https://huggingface.co/api/daily_papers?date={date_str}"
+    url = f"{HF_API_URL}/api/daily_papers?date={date_str}"
 
     try:
-        response = requests.get(url, timeout=30)
+        response = get_session().get(url, timeout=30)
         response.raise_for_status()
         raw_papers = response.json()
 
@@ -269,21 +301,39 @@ def _fetch_hf_papers_for_date(date_str: str) -> list[RawPaper]:
         raise HuggingFaceAPIError(str(e))
 
 
-def fetch_hf_papers_date_range(days: int = 7) -> list[RawPaper]:
+def fetch_hf_papers_date_range(
+    days: int = 7,
+    end: datetime | None = None,
+    cache: dict[str, list[RawPaper]] | None = None,
+) -> list[RawPaper]:
+    """
+    :param days: the number of days to fetch, up to end
+    :param end: the last day (today by default)
+    :param cache: the papers of the dates already fetched, updated with the
+        dates fetched by this call
+    """
     all_papers = []
-    today = datetime.now()
+    today = end if end is not None else datetime.now()
+    n_fetched = 0
 
-    logger.info(f"Fetching HuggingFace papers (last {days} days)")
+    logger.info(f"Fetching HuggingFace papers ({days} days up to {today:%Y-%m-%d})")
 
     for i in range(days):
         date = (today - timedelta(days=i)).strftime("%Y-%m-%d")
+        if cache is not None and date in cache:
+            all_papers.extend(cache[date])
+            continue
+
         try:
             papers = _fetch_hf_papers_for_date(date)
             all_papers.extend(papers)
+            n_fetched += len(papers)
+            if cache is not None:
+                cache[date] = papers
             logger.info(f"Fetched {len(papers)} papers from HF for {date}")
 
             delay = random.randint(1, 3)
-            time.sleep(delay)
+            time.sleep(delay * PACING_SCALE)
         except HuggingFaceAPIError as e:
             logger.error(
                 f"Could not fetch HF papers for {date}, continuing",
@@ -294,9 +344,10 @@ def fetch_hf_papers_date_range(days: int = 7) -> list[RawPaper]:
 
         logger.info("Waiting 10s before next HF API call...")
 
-        time.sleep(20)
+        time.sleep(20 * PACING_SCALE)
 
-    logger.info(f"Total HuggingFace papers fetched: {len(all_papers)}")
+    logger.info(f"Total HuggingFace papers fetched: {n_fetched}")
+    PAPERS_FETCHED.inc(n_fetched, source="hf")
     return all_papers
 
 
@@ -315,6 +366,7 @@ def _merge_and_score_papers(
             alphaxiv_rank=rank,
             hf_rank=None,
             source=PaperSource.ALPHAXIV,
+            votes=paper.votes,
         )
 
     for rank, paper in enumerate(hf_papers):
@@ -383,6 +435,7 @@ def _papers_to_dataframe(papers: list[RankedPaper]) -> pd.DataFrame:
                 "alphaxiv_rank": paper.alphaxiv_rank,
                 "hf_rank": paper.hf_rank,
                 "average_rank": paper.average_rank,
+                "votes": paper.votes,
             }
         )
 
@@ -395,16 +448,88 @@ def get_all_abstracts(after: datetime, before: datetime) -> tuple[pd.DataFrame,
         return pd.DataFrame(), 0
 
     alphaxiv_papers, alphaxiv_count_before_percentile = fetch_alphaxiv_papers(
-        days=7,
+        days=ALPHAXIV_FEED_DAYS,
         max_papers=ALPHAXIV_MAX_PAPERS,
         top_percentile=ALPHAXIV_TOP_PERCENTILE,
         after=after,
         before=before,
     )
-    hf_papers = fetch_hf_papers_date_range(days=7)
+    # HF daily papers can be queried for any date, so historical windows
+    # (backfill) get the right days. AlphaXiv only has a "hot" feed relative
+    # to now
+    hf_papers = fetch_hf_papers_date_range(days=HF_DAYS, end=before)
 
-    scored_papers = _merge_and_score_papers(alphaxiv_papers, hf_papers)
+    return _window_abstracts(
+        alphaxiv_papers, alphaxiv_count_before_percentile, hf_papers, after, before
+    )
 
+
+class RangeAbstracts:
+    """
+    get_all_abstracts for the windows of a range (backfill). Each HF date is
+    fetched once for the whole range (the HF papers of a window come from the
+    days before it, shared with the previous windows), and the alphaXiv feed
+    at most once, and only if some window is recent enough to be in it.
+
+    Windows can be requested from several threads: the fetches are
+    serialized, which also keeps the pace of the HF calls.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._hf_papers: dict[str, list[RawPaper]] = {}
+        self._alphaxiv_feed: list[RawPaper] | None = None
+
+    def __call__(self, after: datetime, before: datetime) -> tuple[pd.DataFrame, int]:
+        if after >= before:
+            logger.info("Invalid time window, returning empty DataFrame")
+            return pd.DataFrame(), 0
+
+        with self._lock:
+            alphaxiv_papers, alphaxiv_count_before_percentile = self._alphaxiv(
+                after, before
+            )
+            hf_papers = fetch_hf_papers_date_range(
+                days=HF_DAYS, end=before, cache=self._hf_papers
+            )
+
+        return _window_abstracts(
+            alphaxiv_papers, alphaxiv_count_before_percentile, hf_papers, after, before
+        )
+
+    def _alphaxiv(
+        self, after: datetime, before: datetime
+    ) -> tuple[list[RawPaper], int]:
+        feed_start = datetime.now(before.tzinfo) - timedelta(days=ALPHAXIV_FEED_DAYS)
+        if before < feed_start:
+            logger.info(
+                f"Window older than the alphaXiv feed ({ALPHAXIV_FEED_DAYS} days), "
+                "skipping alphaXiv"
+            )
+            return [], 0
+
+        if self._alphaxiv_feed is None:
+            self._alphaxiv_feed = _fetch_alphaxiv_feed(
+                ALPHAXIV_FEED_DAYS, ALPHAXIV_MAX_PAPERS, ALPHAXIV_TOP_PERCENTILE
+            )
+
+        return _select_alphaxiv_papers(
+            self._alphaxiv_feed,
+            ALPHAXIV_MAX_PAPERS,
+            ALPHAXIV_TOP_PERCENTILE,
+            after,
+            before,
+        )
+
+
+def _window_abstracts(
+    alphaxiv_papers: list[RawPaper],
+    alphaxiv_count_before_percentile: int,
+    hf_papers: list[RawPaper],
+    after: datetime,
+    before: datetime,
+) -> tuple[pd.DataFrame, int]:
+    scored_papers = _merge_and_score_papers(alphaxiv_papers, hf_papers)
     if not scored_papers:
         logger.info("No papers found in time window")
         return pd.DataFrame(), 0
@@ -0,0 +1,315 @@
+"""
+Record every outbound interaction of a run into a cassette directory, and
+replay it later without touching the network.
+
+Interactions are captured at the boundary functions that talk to alphaXiv,
+HuggingFace, arXiv, OpenAI, Twitter and Firestore, rather than at the HTTP
+layer, because these services are reached through several different clients
+(requests, httpx, tweepy, gRPC).
+"""
+
+import contextlib
+import dataclasses
+import importlib
+import json
+import os
+import pickle
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Callable, Iterator
+
+from arxiv_sanity_bot.config import FIREBASE_COLLECTION, KNOWN_IDS_CACHE_SIZE
+from arxiv_sanity_bot.logger import get_logger
+from arxiv_sanity_bot.lru import LRUCache
+from arxiv_sanity_bot.store.store import DocumentStore
+from arxiv_sanity_bot.telemetry.metrics import REPLAY_FALLBACKS
+
+
+logger = get_logger(__name__)
+
+
+@dataclasses.dataclass(frozen=True)
+class _Target:
+    name: str
+    module: str
+    attribute: str
+    # Builds the lookup key from the call arguments (excluding the ones that
+    # change between runs, like clients)
+    key: Callable[..., str]
+    # The result is the path of a file whose content must be recorded
+    returns_file: bool = False
+
+
+def _iso(value: Any) -> str:
+    return value.isoformat() if hasattr(value, "isoformat") else str(value)
+
+
+TARGETS = (
+    _Target(
+        "alphaxiv_page",
+        "arxiv_sanity_bot.ranking.ranked_papers",
+        "_fetch_alphaxiv_page",
+        lambda page_num, *args, **kwargs: str(page_num),
+    ),
+    _Target(
+        "hf_date",
+        "arxiv_sanity_bot.ranking.ranked_papers",
+        "_fetch_hf_papers_for_date",
+        lambda date_str: date_str,
+    ),
+    _Target(
+        "arxiv_query",
+        "arxiv_sanity_bot.arxiv.arxiv_abstracts",
+        "_fetch_from_arxiv",
+        lambda after, before, *args, **kwargs: f"{_iso(after)}/{_iso(before)}",
+    ),
+    _Target(
+        "arxiv_download",
+        "arxiv_sanity_bot.arxiv.extract_image",
+        "download_paper",
+        lambda arxiv_id: arxiv_id,
+        returns_file=True,
+    ),
+    _Target(
+        "openai",
+        "arxiv_sanity_bot.models.openai",
+        "OpenAI._call_openai",
+        lambda self, history: json.dumps(history, sort_keys=True),
+    ),
+    _Target(
+        "twitter_media_upload",
+        "arxiv_sanity_bot.twitter.send_tweet",
+        "_upload_image_with_retry",
+        lambda api, img_path: os.path.basename(img_path),
+    ),
+    _Target(
+        "twitter_create_tweet",
+        "arxiv_sanity_bot.twitter.send_tweet",
+        "_create_tweet",
+        lambda client, text, *args, **kwargs: text,
+    ),
+    _Target(
+        "firestore_contains",
+        "arxiv_sanity_bot.store.store",
+        "DocumentStore.__contains__",
+        lambda self, document_id: f"{self._collection}/{document_id}",
+    ),
+    _Target(
+        "firestore_get",
+        "arxiv_sanity_bot.store.store",
+        "DocumentStore.__getitem__",
+        lambda self, document_id: f"{self._collection}/{document_id}",
+    ),
+    _Target(
+        "firestore_set",
+        "arxiv_sanity_bot.store.store",
+        "DocumentStore.__setitem__",
+        lambda self, document_id, data: f"{self._collection}/{document_id}",
+    ),
+)
+
+# Modules that import a target by name, so the name must be patched there too
+_ALIASES = {
+    "download_paper": ("arxiv_sanity_bot.backfill",),
+}
+
+
+def _resolve(module_name: str, attribute: str) -> tuple[Any, str]:
+    owner: Any = importlib.import_module(module_name)
+    *path, name = attribute.split(".")
+    for part in path:
+        owner = getattr(owner, part)
+    return owner, name
+
+
+class Cassette:
+    """
+    A directory holding the interactions of one run: ``interactions.jsonl``
+    (one line per call, with the call duration) and a pickled payload per call
+    under ``payloads/``.
+    """
+
+    def __init__(self, directory: str):
+        self._directory = directory
+        self._payloads = os.path.join(directory, "payloads")
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def record(self) -> Iterator[None]:
+        os.makedirs(self._payloads, exist_ok=True)
+        index = open(os.path.join(self._directory, "interactions.jsonl"), "w")
+        counter = iter(range(10**9))
+
+        def _wrap(target: _Target, original: Callable) -> Callable:
+            def _recorded(*args: Any, **kwargs: Any) -> Any:
+                start = time.perf_counter()
+                result = original(*args, **kwargs)
+                duration = time.perf_counter() - start
+
+                payload = result
+                if target.returns_file and result is not None:
+                    with open(result, "rb") as f:
+                        payload = {"name": os.path.basename(result), "data": f.read()}
+
+                with self._lock:
+                    n = next(counter)
+                    path = os.path.join(self._payloads, f"{n:06d}.pkl")
+                    with open(path, "wb") as f:
+                        pickle.dump(payload, f)
+                    line = {
+                        "n": n,
+                        "target": target.name,
+                        "key": target.key(*args, **kwargs),
+                        "duration": duration,
+                    }
+                    index.write(json.dumps(line) + "\n")
+                    index.flush()
+
+                return result
+
+            return _recorded
+
+        try:
+            with self._patched(_wrap):
+                logger.info(f"Recording interactions into {self._directory}")
+                yield
+        finally:
+            index.close()
+
+    @contextlib.contextmanager
+    def replay(
+        self, latency_scale: float = 1.0, strict: bool = True
+    ) -> Iterator[None]:
+        """
+        Serve the recorded interactions instead of calling the services.
+
+        Calls are matched by target and key. Recorded files (e.g. the PDFs) are
+        written to a temporary directory that is removed when the replay ends.
+
+        :param latency_scale: multiplies the recorded durations (0 means no
+        waiting at all)
+        :param strict: raise KeyError for calls whose key is not in the
+        cassette. Otherwise (e.g. for a date that depends on when the run
+        happens) they get the next unused interaction of the same target, and
+        every such fallback is logged and counted
+        """
+        by_key: dict[tuple[str, str], list[dict[str, Any]]] = defaultdict(list)
+        by_target: dict[str, list[dict[str, Any]]] = defaultdict(list)
+
+        with open(os.path.join(self._directory, "interactions.jsonl")) as f:
+            for line in f:
+                interaction = json.loads(line)
+                by_key[(interaction["target"], interaction["key"])].append(interaction)
+                by_target[interaction["target"]].append(interaction)
+
+        used: set[int] = set()
+
+        def _next(target: _Target, key: str) -> dict[str, Any]:
+            with self._lock:
+                candidates = by_key.get((target.name, key), [])
+                if not candidates and not strict:
+                    candidates = by_target[target.name]
+                    if candidates:
+                        logger.warning(
+                            f"No recorded interaction for {target.name} {key}, "
+                            f"falling back to another one of the same target",
+                            extra={"target": target.name, "key": key},
+                        )
+                        REPLAY_FALLBACKS.inc(target=target.name)
+
+                for interaction in candidates:
+                    if interaction["n"] not in used:
+                        used.add(interaction["n"])
+                        return interaction
+
+            if not candidates:
+                raise KeyError(f"No recorded interaction for {target.name} {key}")
+
+            # Exhausted: repeat the last answer (e.g. polling the same document)
+            return candidates[-1]
+
+        def _wrap(target: _Target, original: Callable) -> Callable:
+            def _replayed(*args: Any, **kwargs: Any) -> Any:
+                interaction = _next(target, target.key(*args, **kwargs))
+
+                time.sleep(interaction["duration"] * latency_scale)
+
+                path = os.path.join(self._payloads, f"{interaction['n']:06d}.pkl")
+                with open(path, "rb") as f:
+                    payload = pickle.load(f)
+
+                if target.returns_file and payload is not None:
+                    file_path = os.path.join(files_dir, payload["name"])
+                    with open(file_path, "wb") as f:
+                        f.write(payload["data"])
+                    return file_path
+
+                return payload
+
+            return _replayed
+
+        with (
+            tempfile.TemporaryDirectory(prefix="replay-") as files_dir,
+            self._patched(_wrap),
+            _offline_document_store(),
+        ):
+            logger.info(
+                f"Replaying interactions from {self._directory}",
+                extra={"latency_scale": latency_scale, "strict": strict},
+            )
+            yield
+
+    @contextlib.contextmanager
+    def _patched(self, wrap: Callable[[_Target, Callable], Callable]) -> Iterator[None]:
+        restore: list[tuple[Any, str, Any]] = []
+
+        try:
+            for target in TARGETS:
+                owner, name = _resolve(target.module, target.attribute)
+                original = getattr(owner, name)
+                wrapped = wrap(target, original)
+
+                restore.append((owner, name, original))
+                setattr(owner, name, wrapped)
+
+                for alias_module in _ALIASES.get(name, ()):
+                    alias_owner = importlib.import_module(alias_module)
+                    restore.append((alias_owner, name, getattr(alias_owner, name)))
+                    setattr(alias_owner, name, wrapped)
+
+            yield
+        finally:
+            for owner, name, original in reversed(restore):
+                setattr(owner, name, original)
+
+
+@contextlib.contextmanager
+def _offline_document_store() -> Iterator[None]:
+    # There are no credentials when replaying: never connect to Firebase
+    def _init(
+        self: Any,
+        firebase_credentials: Any,
+        collection: str = FIREBASE_COLLECTION,
+        client: Any = None,
+    ) -> None:
+        self._client = None
+        self._collection = collection
+        self._known_ids = LRUCache(KNOWN_IDS_CACHE_SIZE)
+
+    originals = {
+        name: DocumentStore.__dict__[name]
+        for name in ("__init__", "_decode_credentials_from_env_variable")
+    }
+
+    DocumentStore.__init__ = _init  # type: ignore[method-assign]
+    DocumentStore._decode_credentials_from_env_variable = staticmethod(  # type: ignore[method-assign]
+        lambda env_variable_name: {}
+    )
+
+    try:
+        yield
+    finally:
+        for name, original in originals.items():
+            setattr(DocumentStore, name, original)
@@ -35,6 +35,8 @@ class RankedPaper(BasePaper):
     alphaxiv_rank: int | None = None
     hf_rank: int | None = None
     source: PaperSource
+    # alphaXiv votes, when the paper comes from alphaXiv
+    votes: int | None = None
 
     @property
     def average_rank(self) -> float:
@@ -0,0 +1,119 @@
+import os
+from datetime import datetime
+from typing import Any
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from arxiv_sanity_bot.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+
+# One row per candidate of a profile in a run. Explicit so that the files of
+# different runs (and sources) always share the same types
+SCHEMA = pa.schema(
+    [
+        ("run_id", pa.string()),
+        ("run_started_at", pa.timestamp("us", tz="UTC")),
+        # Position in the ranked pool of the profile (0 is the best)
+        ("pool_rank", pa.int32()),
+        ("arxiv", pa.string()),
+        ("title", pa.string()),
+        ("published_on", pa.timestamp("us", tz="UTC")),
+        ("score", pa.float64()),
+        ("alphaxiv_rank", pa.int32()),
+        ("hf_rank", pa.int32()),
+        ("average_rank", pa.float64()),
+        ("votes", pa.int32()),
+        # "new" or "posted_before" (null if the paper was not checked)
+        ("dedup", pa.string()),
+        # Among the top max_num_papers new ones
+        ("selected", pa.bool_()),
+        ("summary", pa.string()),
+        ("image", pa.string()),
+        # Time to summarize the paper and extract its image
+        ("process_seconds", pa.float64()),
+        ("posted", pa.bool_()),
+        ("tweet_url", pa.string()),
+        ("dry", pa.bool_()),
+    ]
+)
+
+PARTITIONING = ds.partitioning(
+    pa.schema([("run_date", pa.string()), ("profile", pa.string())]), flavor="hive"
+)
+
+
+class CandidateArchive:
+    """
+    Candidates of every run, with what happened to them, as a Parquet dataset
+    partitioned by day and profile::
+
+        <root>/run_date=2025-01-31/profile=default/<run_id>.parquet
+
+    Readers only touch the columns and partitions they ask for.
+    """
+
+    def __init__(self, root: str):
+        self._root = root
+
+    def append(
+        self,
+        candidates: pd.DataFrame,
+        run_id: str,
+        run_started_at: datetime,
+        profile: str,
+    ) -> str:
+        """
+        Write the candidates of one profile in one run as a new file.
+
+        :param candidates: a frame with (a subset of) the columns of SCHEMA.
+        Missing columns are stored as nulls
+        :return: the path of the file
+        """
+        frame = candidates.assign(run_id=run_id, run_started_at=run_started_at)
+        frame = frame.reindex(columns=SCHEMA.names)
+        for name in ("published_on", "run_started_at"):
+            frame[name] = pd.to_datetime(frame[name], utc=True)
+
+        table = pa.Table.from_pandas(frame, schema=SCHEMA, preserve_index=False)
+
+        directory = os.path.join(
+            self._root,
+            f"run_date={run_started_at.strftime('%Y-%m-%d')}",
+            f"profile={profile}",
+        )
+        os.makedirs(directory, exist_ok=True)
+
+        # Readers ignore files starting with a dot, so they never see a
+        # partially written one
+        path = os.path.join(directory, f"{run_id}.parquet")
+        tmp_path = os.path.join(directory, f".{run_id}.parquet.tmp")
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, path)
+
+        logger.info(
+            f"Archived {len(frame)} candidates to {path}",
+            extra={"run_id": run_id, "profile": profile},
+        )
+
+        return path
+
+    def read(
+        self, columns: list[str] | None = None, filters: Any = None
+    ) -> pd.DataFrame:
+        """
+        :param columns: columns to read (default: all). The partition columns
+        run_date and profile can be used as well
+        :param filters: a pyarrow expression, e.g.
+        ``pc.field("profile") == "default"``
+        """
+        if not os.path.isdir(self._root):
+            return pd.DataFrame(columns=columns or SCHEMA.names)
+
+        dataset = ds.dataset(self._root, format="parquet", partitioning=PARTITIONING)
+        return dataset.to_table(columns=columns, filter=filters).to_pandas()
@@ -0,0 +1,119 @@
+import contextlib
+import json
+import os
+import shutil
+import time
+from typing import Any
+
+from arxiv_sanity_bot.config import PRECOMPUTE_MAX_AGE
+from arxiv_sanity_bot.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+
+class ArtifactStore:
+    """
+    Summaries and images computed ahead of the posting run, keyed by arxiv ID.
+
+    Each paper has a ``<arxiv_id>.json`` file with its summaries (one per set of
+    summary instructions) and, if an image was found, a ``<arxiv_id>.jpg``.
+
+    Artifacts not updated for ``max_age`` seconds are ignored, and removed by
+    prune().
+    """
+
+    def __init__(self, directory: str, max_age: float = PRECOMPUTE_MAX_AGE):
+        self._directory = directory
+        self._max_age = max_age
+        os.makedirs(directory, exist_ok=True)
+
+    def _json_path(self, arxiv_id: str) -> str:
+        return os.path.join(self._directory, f"{arxiv_id}.json")
+
+    def _image_path(self, arxiv_id: str) -> str:
+        return os.path.join(self._directory, f"{arxiv_id}.jpg")
+
+    def _load(self, arxiv_id: str) -> dict[str, Any] | None:
+        try:
+            with open(self._json_path(arxiv_id)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def get(
+        self, arxiv_id: str, instructions: str = ""
+    ) -> tuple[str, str | None] | None:
+        """
+        :return: (summary, image path or None if the paper has no image), or
+        None if nothing was precomputed for this paper and instructions
+        """
+        artifact = self._load(arxiv_id)
+
+        if artifact is None or instructions not in artifact["summaries"]:
+            return None
+
+        if self._expired(artifact):
+            return None
+
+        img_path = self._image_path(arxiv_id) if artifact["has_image"] else None
+        if img_path is not None and not os.path.exists(img_path):
+            return None
+
+        return artifact["summaries"][instructions], img_path
+
+    def put(
+        self,
+        arxiv_id: str,
+        summary: str,
+        img_path: str | None,
+        instructions: str = "",
+    ) -> None:
+        artifact = self._load(arxiv_id) or {"summaries": {}}
+
+        if img_path is not None:
+            shutil.copyfile(img_path, self._image_path(arxiv_id))
+
+        artifact["summaries"][instructions] = summary
+        artifact["has_image"] = img_path is not None
+        artifact["updated_at"] = time.time()
+
+        tmp_path = f"{self._json_path(arxiv_id)}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(artifact, f, indent=2)
+        os.replace(tmp_path, self._json_path(arxiv_id))
+
+        logger.info(f"Stored precomputed artifacts for {arxiv_id}")
+
+    def prune(self) -> int:
+        """
+        Remove the expired artifacts.
+
+        :return: how many papers were removed
+        """
+        removed = 0
+
+        for name in os.listdir(self._directory):
+            if not name.endswith(".json"):
+                continue
+
+            arxiv_id = name[: -len(".json")]
+            artifact = self._load(arxiv_id)
+            if artifact is None or not self._expired(artifact):
+                continue
+
+            for path in (self._json_path(arxiv_id), self._image_path(arxiv_id)):
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(path)
+            removed += 1
+
+        if removed:
+            logger.info(f"Removed {removed} expired precomputed artifacts")
+
+        return removed
+
+    def _expired(self, artifact: dict[str, Any]) -> bool:
+        return time.time() - artifact.get("updated_at", 0) > self._max_age
+
+    def __contains__(self, arxiv_id: str) -> bool:
+        return os.path.exists(self._json_path(arxiv_id))
@@ -5,8 +5,10 @@ from typing import Any
 import firebase_admin  # type: ignore
 from firebase_admin import credentials, firestore  # type: ignore
 
-from arxiv_sanity_bot.config import FIREBASE_COLLECTION
+from arxiv_sanity_bot.config import FIREBASE_COLLECTION, KNOWN_IDS_CACHE_SIZE
 from arxiv_sanity_bot.logger import get_logger
+from arxiv_sanity_bot.lru import LRUCache
+from arxiv_sanity_bot.telemetry.metrics import timer
 
 import os
 
@@ -14,20 +16,56 @@ import os
 logger = get_logger(__name__)
 
 
+_FIRESTORE_URL = "https://firestore.googleapis.com"
+
+
 class DocumentStore:
-    def __init__(self, firebase_credentials):
-        cred = credentials.Certificate(firebase_credentials)
-        firebase_admin.initialize_app(cred)
-        self._client = firestore.client()
+    def __init__(
+        self,
+        firebase_credentials,
+        collection: str = FIREBASE_COLLECTION,
+        client: Any = None,
+    ):
+        """
+        :param firebase_credentials: the service account of the Firebase app
+        :param collection: the collection of the documents
+        :param client: a client with the interface of ``firestore.Client``
+            (e.g. a FakeFirestoreClient), instead of the Firebase one
+        """
+        self._collection = collection
+
+        if client is not None:
+            self._client = client
+        else:
+            # Several stores (one per profile) can live in the same process,
+            # but the Firebase app can only be initialized once
+            try:
+                firebase_admin.get_app()
+            except ValueError:
+                cred = credentials.Certificate(firebase_credentials)
+                firebase_admin.initialize_app(cred)
+
+            self._client = firestore.client()
+
+        # For the spans of the calls
+        self._url = getattr(self._client, "base_url", _FIRESTORE_URL)
+
+        # Ids known to be in the store. Papers are never removed from the
+        # collection, so positive answers can be cached for the lifetime of
+        # the process (this keeps the dedup index warm in daemon mode)
+        self._known_ids: LRUCache[str, bool] = LRUCache(KNOWN_IDS_CACHE_SIZE)
 
     @classmethod
     def from_env_variable(
-        cls, env_variable_name: str = "FIREBASE_CREDENTIALS"
+        cls,
+        env_variable_name: str = "FIREBASE_CREDENTIALS",
+        collection: str = FIREBASE_COLLECTION,
     ) -> "DocumentStore":
         return cls(
             firebase_credentials=cls._decode_credentials_from_env_variable(
                 env_variable_name
-            )
+            ),
+            collection=collection,
         )
 
     @staticmethod
@@ -35,15 +73,27 @@ class DocumentStore:
         return json.loads(base64.b64decode(os.environ[env_variable_name]))
 
     def __setitem__(self, document_id: str, document_data: dict[str, Any]):
-        doc_ref = self._client.collection(FIREBASE_COLLECTION).document(document_id)
-        doc_ref.set(document_data)
+        doc_ref = self._client.collection(self._collection).document(document_id)
+        with timer("firestore_set", self._url):
+            doc_ref.set(document_data)
+        self._known_ids[document_id] = True
 
         logger.info(f"Document created with ID: {document_id}")
 
     def __getitem__(self, document_id: str) -> dict[str, Any] | None:
-        doc_ref = self._client.collection(FIREBASE_COLLECTION).document(document_id)
-        return doc_ref.get().to_dict()
+        doc_ref = self._client.collection(self._collection).document(document_id)
+        with timer("firestore_get", self._url):
+            return doc_ref.get().to_dict()
 
     def __contains__(self, document_id: str) -> bool:
-        doc_ref = self._client.collection(FIREBASE_COLLECTION).document(document_id)
-        return doc_ref.get().exists
+        if document_id in self._known_ids:
+            return True
+
+        doc_ref = self._client.collection(self._collection).document(document_id)
+        with timer("firestore_get", self._url):
+            exists = doc_ref.get().exists
+
+        if exists:
+            self._known_ids[document_id] = True
+
+        return exists
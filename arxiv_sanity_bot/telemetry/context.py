@@ -0,0 +1,8 @@
+import contextvars
+
+
+# (trace id, span id) of the span the current code runs in. Kept apart from
+# tracing.py so that the log formatter can read it without import cycles
+current_ids: contextvars.ContextVar[tuple[str, str] | None] = contextvars.ContextVar(
+    "arxiv_sanity_bot_trace", default=None
+)
@@ -0,0 +1,405 @@
+import array
+import dataclasses
+import gzip
+import json
+import re
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import IO, Any, Iterable, Iterator
+
+import numpy as np
+
+
+# Spans that are not stages of the pipeline: papers are reported on their
+# own, and calls to external services (spans with a host) per host
+PAPER_SPAN = "paper"
+
+PERCENTILES = (50, 90, 99)
+
+# GitHub Actions prefixes every line of the logs it stores with a timestamp
+_CI_TIMESTAMP = re.compile(r"^\ufeff?\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(\.\d+)?Z ")
+
+# Logs written before the spans have no durations. Their stages are inferred
+# from the messages logged when each stage starts (None ends the stage
+# without starting another one, e.g. the dedup between fetch and summarize)
+_LEGACY_RUN_START = "Bot starting"
+_LEGACY_RUN_STOP = "Bot finishing"
+_LEGACY_STAGES = (
+    (re.compile(r"Considering time interval "), "fetch"),
+    (re.compile(r"Checking if paper "), None),
+    (re.compile(r"Selected \d+ papers to summarize"), "summarize"),
+    (re.compile(r"Sending summary tweet"), "publish"),
+)
+_LEGACY_PAPER = re.compile(r"Processed abstract for \S*?([^/\s]+)$")
+_LEGACY_TIME_FORMAT = "%Y-%m-%d %H:%M:%S,%f"
+
+
+@dataclasses.dataclass
+class Stats:
+    count: int
+    mean: float
+    p50: float
+    p90: float
+    p99: float
+    max: float
+
+    @classmethod
+    def of(cls, values: Iterable[float]) -> "Stats":
+        data = np.fromiter(values, dtype=float)
+        p50, p90, p99 = np.percentile(data, PERCENTILES)
+        return cls(
+            count=len(data),
+            mean=float(data.mean()),
+            p50=float(p50),
+            p90=float(p90),
+            p99=float(p99),
+            max=float(data.max()),
+        )
+
+
+@dataclasses.dataclass
+class LogReport:
+    n_records: int
+    # Records that could not be parsed (e.g. truncated by a crash)
+    n_invalid: int
+    # Distinct traces, i.e. runs, daemon cycles or job invocations
+    n_runs: int
+    first_timestamp: str | None
+    last_timestamp: str | None
+    # Duration (s) of each stage, by span name
+    stages: dict[str, Stats]
+    # Latency (s) of each attempt of an external call, by host
+    hosts: dict[str, Stats]
+    # Calls made to each host, by call name
+    host_calls: dict[str, dict[str, int]]
+    # Failed attempts and retries, by call name
+    errors: dict[str, int]
+    retries: dict[str, int]
+    # Processing time (s) of each paper, and the slowest ones
+    papers: Stats | None
+    slowest_papers: list[dict[str, Any]]
+    # Median duration (s) of each stage, by day, to spot regressions
+    daily: dict[str, dict[str, float]]
+
+
+def iter_records(f: IO[str]) -> Iterator[dict[str, Any] | None]:
+    """
+    Stream the records of a log written by JSONFormatter, one at a time.
+
+    Records are pretty-printed over several lines: a record starts with a
+    "{" at the beginning of a line and ends with a "}" alone on a line (one
+    line records are supported as well). Lines outside of records, e.g. the
+    output of other tools in CI logs, are skipped, and the timestamp that
+    GitHub Actions puts in front of each line is removed.
+
+    :return: the records, with None for each record that is not valid JSON
+    """
+    lines: list[str] = []
+
+    for line in f:
+        line = _CI_TIMESTAMP.sub("", line, count=1)
+
+        if not lines:
+            if not line.startswith("{"):
+                continue
+            if line.rstrip().endswith("}"):
+                # A one line record (or the line is just "{...")
+                try:
+                    yield json.loads(line)
+                    continue
+                except json.JSONDecodeError:
+                    pass
+
+        lines.append(line)
+
+        if line.rstrip() == "}":
+            try:
+                yield json.loads("".join(lines))
+            except json.JSONDecodeError:
+                yield None
+            lines = []
+
+    if lines:
+        # Truncated last record
+        yield None
+
+
+def _open(path: str) -> IO[str]:
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", errors="replace")
+    return open(path, errors="replace")
+
+
+@dataclasses.dataclass
+class _LegacyRun:
+    started_at: datetime
+    timestamp: str
+    # Time of the last record of the run
+    last: datetime
+    # Durations (s) of the finished stages and papers, with the timestamp at
+    # which they started
+    stages: list[tuple[str, float, str]] = dataclasses.field(default_factory=list)
+    papers: list[tuple[float, str, str]] = dataclasses.field(default_factory=list)
+    # The run logged spans: its durations are taken from them instead
+    has_spans: bool = False
+    stage: tuple[str, datetime, str] | None = None
+    paper: tuple[str, datetime, str] | None = None
+
+    def end_paper(self, when: datetime) -> None:
+        if self.paper is not None:
+            arxiv_id, started_at, timestamp = self.paper
+            self.papers.append(
+                ((when - started_at).total_seconds(), arxiv_id, timestamp)
+            )
+            self.paper = None
+
+    def end_stage(self, when: datetime) -> None:
+        self.end_paper(when)
+        if self.stage is not None:
+            name, started_at, timestamp = self.stage
+            self.stages.append((name, (when - started_at).total_seconds(), timestamp))
+            self.stage = None
+
+
+class _LegacyTimings:
+    """
+    Infer the stage and paper durations of a run from the timestamps of its
+    messages, for the logs written before the spans.
+
+    A run goes from "Bot starting" to "Bot finishing" (or to its last record,
+    for runs that stop early or crash) and a stage from the message that
+    starts it to the one that starts the next. The summary of a paper is
+    generated right before "Processed abstract for" is logged and its image
+    is extracted right after, so a paper goes from the record preceding that
+    message to the record preceding the one of the next paper.
+    """
+
+    def __init__(self) -> None:
+        self._run: _LegacyRun | None = None
+        self._previous: tuple[datetime, str] | None = None
+
+    def feed(self, record: dict[str, Any], has_span: bool) -> _LegacyRun | None:
+        """
+        :param record: the next record of the log
+        :param has_span: the record is about a span
+        :return: the run that this record finished, if any
+        """
+        timestamp = record.get("timestamp")
+        msg = record.get("msg")
+        try:
+            when = datetime.strptime(timestamp or "", _LEGACY_TIME_FORMAT)
+        except ValueError:
+            return None
+
+        finished = None
+        run = self._run
+
+        if msg == _LEGACY_RUN_START:
+            finished = self.close()
+            run = self._run = _LegacyRun(when, timestamp or "", when)
+
+        if run is not None and isinstance(msg, str):
+            run.has_spans = run.has_spans or has_span
+            run.last = when
+
+            for pattern, name in _LEGACY_STAGES:
+                if pattern.match(msg):
+                    run.end_stage(when)
+                    if name is not None:
+                        run.stage = (name, when, timestamp or "")
+                    break
+            else:
+                paper = _LEGACY_PAPER.match(msg)
+                if paper is not None and self._previous is not None:
+                    previous, previous_timestamp = self._previous
+                    run.end_paper(previous)
+                    run.paper = (paper.group(1), previous, previous_timestamp)
+
+            if msg == _LEGACY_RUN_STOP:
+                finished = self.close()
+
+        self._previous = (when, timestamp or "")
+        return finished
+
+    def close(self) -> _LegacyRun | None:
+        """End the current run (e.g. at the end of a file) and return it."""
+        run, self._run = self._run, None
+        self._previous = None
+        if run is not None:
+            run.end_stage(run.last)
+        return run
+
+
+def analyze(paths: Iterable[str], n_slowest: int = 10) -> LogReport:
+    """
+    Summarize the spans and retries logged by one or more runs. Files are
+    streamed, so they can be larger than memory (the durations are kept, as
+    8 bytes each). For runs logged before the spans, the durations of the
+    stages and papers are inferred from the timestamps of their messages (see
+    _LegacyTimings).
+
+    :param paths: log files (plain or gzipped)
+    :param n_slowest: how many of the slowest papers to report
+    """
+    stages: dict[str, array.array] = defaultdict(lambda: array.array("d"))
+    hosts: dict[str, array.array] = defaultdict(lambda: array.array("d"))
+    host_calls: dict[str, Counter] = defaultdict(Counter)
+    papers: list[tuple[float, str, str]] = []
+    daily: dict[tuple[str, str], array.array] = defaultdict(lambda: array.array("d"))
+    errors: Counter = Counter()
+    retries: Counter = Counter()
+    traces: set[str] = set()
+    legacy = _LegacyTimings()
+    n_legacy_runs = 0
+
+    def add_legacy(run: _LegacyRun | None) -> None:
+        nonlocal n_legacy_runs
+        if run is None or run.has_spans:
+            return
+
+        n_legacy_runs += 1
+        stages["run"].append((run.last - run.started_at).total_seconds())
+        daily[(run.timestamp[:10], "run")].append(stages["run"][-1])
+        for name, duration, timestamp in run.stages:
+            stages[name].append(duration)
+            daily[(timestamp[:10], name)].append(duration)
+        papers.extend(run.papers)
+
+    n_records = n_invalid = 0
+    first_timestamp = last_timestamp = None
+
+    for path in paths:
+        with _open(path) as f:
+            for record in iter_records(f):
+                if record is None:
+                    n_invalid += 1
+                    continue
+
+                add_legacy(
+                    legacy.feed(
+                        record,
+                        has_span="trace_id" in record
+                        or record.get("msg") == "Span finished",
+                    )
+                )
+
+                n_records += 1
+                timestamp = record.get("timestamp")
+                if timestamp:
+                    first_timestamp = min(first_timestamp or timestamp, timestamp)
+                    last_timestamp = max(last_timestamp or timestamp, timestamp)
+                if "trace_id" in record:
+                    traces.add(record["trace_id"])
+
+                context = record.get("context") or {}
+                msg = record.get("msg")
+
+                if msg == "Span finished" and "duration" in context:
+                    name = context.get("span", "unknown")
+                    duration = float(context["duration"])
+
+                    if context.get("host") is not None:
+                        hosts[context["host"]].append(duration)
+                        host_calls[context["host"]][name] += 1
+                        if "error" in context:
+                            errors[name] += 1
+                    elif name == PAPER_SPAN:
+                        papers.append(
+                            (duration, context.get("arxiv_id", ""), timestamp or "")
+                        )
+                    else:
+                        stages[name].append(duration)
+                        if timestamp:
+                            daily[(timestamp[:10], name)].append(duration)
+
+                elif (
+                    isinstance(msg, str)
+                    and msg.startswith("Retrying ")
+                    and ("call" in context)
+                ):
+                    retries[context["call"]] += 1
+
+        # Runs do not continue across files
+        add_legacy(legacy.close())
+
+    by_day: dict[str, dict[str, float]] = defaultdict(dict)
+    for (day, name), durations in sorted(daily.items()):
+        by_day[day][name] = float(np.median(durations))
+
+    papers.sort(reverse=True)
+
+    return LogReport(
+        n_records=n_records,
+        n_invalid=n_invalid,
+        n_runs=len(traces) + n_legacy_runs,
+        first_timestamp=first_timestamp,
+        last_timestamp=last_timestamp,
+        stages={name: Stats.of(d) for name, d in sorted(stages.items())},
+        hosts={host: Stats.of(d) for host, d in sorted(hosts.items())},
+        host_calls={host: dict(calls) for host, calls in sorted(host_calls.items())},
+        errors=dict(errors),
+        retries=dict(retries),
+        papers=Stats.of(d for d, _, _ in papers) if papers else None,
+        slowest_papers=[
+            {"arxiv_id": arxiv_id, "seconds": duration, "timestamp": timestamp}
+            for duration, arxiv_id, timestamp in papers[:n_slowest]
+        ],
+        daily=dict(by_day),
+    )
+
+
+def format_report(report: LogReport) -> str:
+    """The report as plain text tables."""
+    lines = [
+        f"{report.n_records} records ({report.n_invalid} invalid) from "
+        f"{report.n_runs} runs, {report.first_timestamp} to {report.last_timestamp}",
+    ]
+
+    def table(title: str, rows: dict[str, Stats]) -> None:
+        if not rows:
+            return
+        width = max(len(title), *(len(name) for name in rows))
+        lines.extend(
+            [
+                "",
+                f"{title:<{width}} {'count':>7} {'mean':>8} {'p50':>8} "
+                f"{'p90':>8} {'p99':>8} {'max':>8}",
+            ]
+        )
+        for name, s in rows.items():
+            lines.append(
+                f"{name:<{width}} {s.count:>7} {s.mean:>8.3f} {s.p50:>8.3f} "
+                f"{s.p90:>8.3f} {s.p99:>8.3f} {s.max:>8.3f}"
+            )
+
+    table("stage (s)", report.stages)
+    table("host (s)", report.hosts)
+    if report.papers is not None:
+        table("paper (s)", {"all papers": report.papers})
+
+    if report.retries or report.errors:
+        lines.extend(["", "call: retries / failed attempts"])
+        for call in sorted({*report.retries, *report.errors}):
+            lines.append(
+                f"{call}: {report.retries.get(call, 0)} / {report.errors.get(call, 0)}"
+            )
+
+    if report.slowest_papers:
+        lines.extend(["", "slowest papers"])
+        for paper in report.slowest_papers:
+            lines.append(
+                f"{paper['arxiv_id']} {paper['seconds']:.3f}s ({paper['timestamp']})"
+            )
+
+    if report.daily:
+        names = sorted({name for day in report.daily.values() for name in day})
+        lines.extend(
+            ["", "median stage duration (s) by day", " ".join(["day", *names])]
+        )
+        for day, medians in report.daily.items():
+            values = [
+                f"{medians[name]:.3f}" if name in medians else "-" for name in names
+            ]
+            lines.append(" ".join([day, *values]))
+
+    return "\n".join(lines)
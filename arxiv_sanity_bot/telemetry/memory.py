@@ -0,0 +1,193 @@
+import contextlib
+import dataclasses
+import resource
+import sys
+import threading
+import tracemalloc
+from typing import Iterator
+
+from arxiv_sanity_bot.config import MEMORY_BUDGET_MB, MEMORY_TOP_ALLOCATIONS
+from arxiv_sanity_bot.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+
+_MB = 1024 * 1024
+
+_enabled = False
+_budget_mb = MEMORY_BUDGET_MB
+
+# Scopes currently open in this thread (innermost last)
+_scopes = threading.local()
+
+
+@dataclasses.dataclass
+class _Scope:
+    snapshot: tracemalloc.Snapshot | None
+    peak_rss: int = 0
+    peak_traced: int = 0
+
+
+def enable(budget_mb: float | None = None) -> None:
+    """
+    Turn on the memory instrumentation of track_memory for this process (and
+    for the processes it forks). Off by default because tracemalloc slows
+    down allocations noticeably.
+
+    :param budget_mb: peak RSS above which a scope is flagged (default:
+    MEMORY_BUDGET_MB)
+    """
+    global _enabled, _budget_mb
+
+    _enabled = True
+    if budget_mb is not None:
+        _budget_mb = budget_mb
+
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def disable() -> None:
+    global _enabled
+
+    _enabled = False
+    tracemalloc.stop()
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def budget_mb() -> float:
+    return _budget_mb
+
+
+@contextlib.contextmanager
+def track_memory(stage: str, arxiv_id: str | None = None) -> Iterator[None]:
+    """
+    Measure peak RSS and peak Python allocations (tracemalloc) while the block
+    runs, and log them with the allocation sites that grew the most. Scopes
+    whose peak RSS is above the memory budget are logged as warnings.
+
+    Scopes can be nested (e.g. a paper within a stage): the peak of a scope
+    includes the peaks of its children. RSS is per process, so when several
+    threads are tracked at the same time their peaks overlap.
+
+    Does nothing unless enable() was called (the CLI calls it with
+    --memory_profile or when MEMORY_PROFILING is set).
+
+    :param stage: name of the stage, e.g. "fetch" or "extract_image"
+    :param arxiv_id: the paper being processed, if any
+    """
+    if not _enabled:
+        yield
+        return
+
+    stack: list[_Scope] = _scopes.__dict__.setdefault("stack", [])
+
+    # The peaks are reset below, save what the parent has seen so far
+    if stack:
+        _update(stack[-1])
+
+    rss_before = _current_rss()
+    _reset_peaks()
+
+    scope = _Scope(_snapshot() if MEMORY_TOP_ALLOCATIONS > 0 else None)
+    stack.append(scope)
+
+    try:
+        yield
+    finally:
+        stack.pop()
+        _update(scope)
+        if stack:
+            stack[-1].peak_rss = max(stack[-1].peak_rss, scope.peak_rss)
+            stack[-1].peak_traced = max(stack[-1].peak_traced, scope.peak_traced)
+
+        _report(stage, arxiv_id, scope, rss_before)
+
+
+def _report(stage: str, arxiv_id: str | None, scope: _Scope, rss_before: int) -> None:
+    extra = {
+        "stage": stage,
+        "arxiv_id": arxiv_id,
+        "peak_rss_mb": round(scope.peak_rss / _MB, 1),
+        "rss_delta_mb": round((_current_rss() - rss_before) / _MB, 1),
+        "peak_traced_mb": round(scope.peak_traced / _MB, 1),
+        "top_allocations": _top_allocations(scope.snapshot, MEMORY_TOP_ALLOCATIONS),
+    }
+
+    if scope.peak_rss > _budget_mb * _MB:
+        logger.warning(
+            f"Memory budget of {_budget_mb} MB exceeded in {stage}"
+            + (f" for {arxiv_id}" if arxiv_id else ""),
+            extra={**extra, "budget_mb": _budget_mb},
+        )
+    else:
+        logger.info(f"Memory usage of {stage}", extra=extra)
+
+
+def _update(scope: _Scope) -> None:
+    scope.peak_rss = max(scope.peak_rss, _peak_rss())
+    scope.peak_traced = max(scope.peak_traced, tracemalloc.get_traced_memory()[1])
+
+
+def _reset_peaks() -> None:
+    tracemalloc.reset_peak()
+
+    # Linux can reset the high water mark of the RSS (VmHWM). Elsewhere the
+    # peak is the one of the whole process
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def _peak_rss() -> int:
+    hwm = _proc_status("VmHWM")
+    if hwm is not None:
+        return hwm
+
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+def _current_rss() -> int:
+    rss = _proc_status("VmRSS")
+    return rss if rss is not None else _peak_rss()
+
+
+def _proc_status(field: str) -> int | None:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(f"{field}:"):
+                    # e.g. "VmHWM:	  123456 kB"
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+
+    return None
+
+
+def _snapshot() -> tracemalloc.Snapshot:
+    return tracemalloc.take_snapshot().filter_traces(
+        [tracemalloc.Filter(False, tracemalloc.__file__)]
+    )
+
+
+def _top_allocations(before: tracemalloc.Snapshot | None, n: int) -> list[str]:
+    """The n sites whose allocations grew the most since the snapshot."""
+    if before is None:
+        return []
+
+    stats = _snapshot().compare_to(before, "lineno")
+    return [
+        f"{stat.traceback[0].filename}:{stat.traceback[0].lineno} "
+        f"{stat.size_diff / _MB:+.1f} MB in {stat.count_diff:+d} blocks"
+        for stat in stats[:n]
+        if stat.size_diff > 0
+    ]
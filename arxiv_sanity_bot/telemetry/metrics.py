@@ -0,0 +1,316 @@
+import bisect
+import contextlib
+import functools
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Iterator, TypeVar
+from urllib.parse import urlparse
+
+from arxiv_sanity_bot.logger import get_logger
+from arxiv_sanity_bot.telemetry.tracing import span
+
+
+logger = get_logger(__name__)
+
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+# Seconds. Covers everything from a cached Firestore read to a slow PDF
+# download or OpenAI completion
+DEFAULT_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, str]) -> tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"{self.name} takes labels {self.labelnames}, got {tuple(labels)}"
+            )
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def _labels(self, key: tuple[str, ...], **extra: str) -> str:
+        pairs = [*zip(self.labelnames, key), *extra.items()]
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in pairs) + "}"
+
+    def samples(self) -> list[str]:
+        raise NotImplementedError
+
+    def reset(self) -> None:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            return [
+                f"{self.name}_total{self._labels(key)} {_number(value)}"
+                for key, value in sorted(self._values.items())
+            ]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Gauge(_Metric):
+    type_name = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            return [
+                f"{self.name}{self._labels(key)} {_number(value)}"
+                for key, value in sorted(self._values.items())
+            ]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: (count per bucket, with +Inf last), sum
+        self._values: dict[tuple[str, ...], tuple[list[int], float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._values[key] = (counts, total + value)
+
+    def count(self, **labels: str) -> int:
+        counts, _ = self._values.get(self._key(labels), ([], 0.0))
+        return sum(counts)
+
+    def samples(self) -> list[str]:
+        lines = []
+        with self._lock:
+            for key, (counts, total) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, n in zip([*self.buckets, float("inf")], counts):
+                    cumulative += n
+                    le = "+Inf" if bound == float("inf") else _number(bound)
+                    lines.append(
+                        f"{self.name}_bucket{self._labels(key, le=le)} {cumulative}"
+                    )
+                lines.append(f"{self.name}_count{self._labels(key)} {cumulative}")
+                lines.append(f"{self.name}_sum{self._labels(key)} {_number(total)}")
+        return lines
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> Any:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """The metrics in the OpenMetrics text format."""
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {_escape(metric.help)}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            lines.extend(metric.samples())
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str) -> None:
+        """Write the metrics to path atomically (safe for textfile collectors)."""
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            f.write(self.render())
+        os.replace(tmp_path, path)
+
+        logger.debug(f"Metrics written to {path}")
+
+    def reset(self) -> None:
+        for metric in self._metrics.values():
+            metric.reset()
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+REGISTRY = Registry()
+
+PAPERS_FETCHED: Counter = REGISTRY.register(
+    Counter("arxiv_sanity_bot_papers_fetched", "Papers fetched per source", ("source",))
+)
+CANDIDATES: Counter = REGISTRY.register(
+    Counter(
+        "arxiv_sanity_bot_candidates",
+        "Papers above the score threshold in the time window",
+    )
+)
+DEDUP_HITS: Counter = REGISTRY.register(
+    Counter(
+        "arxiv_sanity_bot_dedup_hits",
+        "Candidates skipped because they were already in the store",
+    )
+)
+SUMMARIES: Counter = REGISTRY.register(
+    Counter(
+        "arxiv_sanity_bot_summaries",
+        "Summaries by origin (generated, cached or precomputed)",
+        ("origin",),
+    )
+)
+RETRIES: Counter = REGISTRY.register(
+    Counter("arxiv_sanity_bot_retries", "Retries of external calls", ("call",))
+)
+TWEETS: Counter = REGISTRY.register(Counter("arxiv_sanity_bot_tweets", "Tweets sent"))
+EXTRACTION_FAILURES: Counter = REGISTRY.register(
+    Counter(
+        "arxiv_sanity_bot_extraction_failures",
+        "Image extractions that failed, timed out or killed their worker",
+        ("reason",),
+    )
+)
+REPLAY_FALLBACKS: Counter = REGISTRY.register(
+    Counter(
+        "arxiv_sanity_bot_replay_fallbacks",
+        "Replayed calls served by an interaction recorded under another key",
+        ("target",),
+    )
+)
+EXTERNAL_CALL_ERRORS: Counter = REGISTRY.register(
+    Counter(
+        "arxiv_sanity_bot_external_call_errors",
+        "Failed attempts of external calls",
+        ("call",),
+    )
+)
+EXTERNAL_CALL_SECONDS: Histogram = REGISTRY.register(
+    Histogram(
+        "arxiv_sanity_bot_external_call_seconds",
+        "Latency of each attempt of an external call",
+        ("call",),
+    )
+)
+
+
+@contextlib.contextmanager
+def timer(call: str, url: str | None = None) -> Iterator[None]:
+    """
+    Record the latency of the block in EXTERNAL_CALL_SECONDS, and count it
+    in EXTERNAL_CALL_ERRORS if it raises. The block also runs in a span
+    named after the call.
+
+    :param url: URL of the service called. Its host is added to the span
+    (see analyze-logs)
+    """
+    attributes = {"host": urlparse(url).netloc} if url else {}
+
+    start = time.perf_counter()
+    try:
+        with span(call, **attributes):
+            yield
+    except Exception:
+        EXTERNAL_CALL_ERRORS.inc(call=call)
+        raise
+    finally:
+        EXTERNAL_CALL_SECONDS.observe(time.perf_counter() - start, call=call)
+
+
+def timed(call: str, url: str | None = None) -> Callable[[F], F]:
+    """
+    Decorator version of timer. Put it below @retry so that every attempt is
+    recorded.
+    """
+
+    def decorator(func: F) -> F:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with timer(call, url):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+def count_retries(
+    call: str, before_sleep: Callable[[Any], None] | None = None
+) -> Callable[[Any], None]:
+    """
+    Tenacity before_sleep callback counting retries in RETRIES (and logging
+    them, see analyze-logs), then calling ``before_sleep`` (if any).
+    """
+
+    def callback(retry_state: Any) -> None:
+        record_retry(call, retry_state.attempt_number)
+        if before_sleep is not None:
+            before_sleep(retry_state)
+
+    return callback
+
+
+def record_retry(call: str, attempt: int) -> None:
+    """
+    Count a retry of call after its attempt-th attempt failed, for calls
+    retried without tenacity.
+    """
+    RETRIES.inc(call=call)
+    logger.info(f"Retrying {call}", extra={"call": call, "attempt": attempt})
@@ -0,0 +1,179 @@
+import contextlib
+import contextvars
+import dataclasses
+import functools
+import json
+import os
+import secrets
+import threading
+import time
+from typing import Any, Callable, Iterator
+
+from arxiv_sanity_bot.config import TRACE_MAX_SPANS
+from arxiv_sanity_bot.logger import get_logger
+from arxiv_sanity_bot.telemetry.context import current_ids
+
+
+logger = get_logger(__name__)
+
+
+@dataclasses.dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: str | None
+    # time.time() at the start, and duration, in seconds
+    start: float
+    duration: float = 0.0
+    attributes: dict[str, Any] = dataclasses.field(default_factory=dict)
+    pid: int = 0
+    thread_id: int = 0
+
+
+_recording = False
+_finished: list[Span] = []
+_lock = threading.Lock()
+
+
+def start_recording() -> None:
+    """Keep finished spans in memory so that they can be exported."""
+    global _recording
+    _recording = True
+
+
+def stop_recording() -> list[Span]:
+    """Stop recording and return (and forget) the finished spans."""
+    global _recording
+    _recording = False
+    with _lock:
+        spans = list(_finished)
+        _finished.clear()
+    return spans
+
+
+def finished_spans() -> list[Span]:
+    with _lock:
+        return list(_finished)
+
+
+@contextlib.contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Span]:
+    """
+    Run the block in a new span, child of the current one (or the root of a
+    new trace). Log records emitted inside carry its trace and span ids.
+
+    When the block ends, a "Span finished" debug record with the duration and
+    the attributes is logged, and the span is kept for export if recording.
+
+    :param name: e.g. "run", "summarize", "paper", "openai"
+    :param attributes: e.g. arxiv_id=...
+    """
+    parent = current_ids.get()
+    this = Span(
+        name=name,
+        trace_id=parent[0] if parent else secrets.token_hex(16),
+        span_id=secrets.token_hex(8),
+        parent_id=parent[1] if parent else None,
+        start=time.time(),
+        attributes=attributes,
+        pid=os.getpid(),
+        thread_id=threading.get_ident(),
+    )
+
+    token = current_ids.set((this.trace_id, this.span_id))
+    t0 = time.perf_counter()
+    try:
+        yield this
+    except BaseException as e:
+        this.attributes["error"] = type(e).__name__
+        raise
+    finally:
+        this.duration = time.perf_counter() - t0
+
+        logger.debug(
+            "Span finished",
+            extra={
+                "span": name,
+                "parent_id": this.parent_id,
+                "duration": this.duration,
+                **this.attributes,
+            },
+        )
+        current_ids.reset(token)
+
+        if _recording:
+            with _lock:
+                if len(_finished) < TRACE_MAX_SPANS:
+                    _finished.append(this)
+
+
+def propagate(func: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Bind func to the current span, for code running in another thread (e.g.
+    ``pool.submit(propagate(func), ...)``): spans and log records there are
+    then children of the current span.
+    """
+    context = contextvars.copy_context()
+
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        # A context can only be entered by one thread at a time
+        return context.copy().run(func, *args, **kwargs)
+
+    return wrapper
+
+
+def propagate_to_process(func: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Like propagate, for code running in another process (the result can be
+    pickled). Only the ids travel: spans finished there are logged but not
+    recorded for export by this process.
+    """
+    return functools.partial(_run_in_trace, current_ids.get(), func)
+
+
+def _run_in_trace(
+    ids: tuple[str, str] | None, func: Callable[..., Any], *args: Any, **kwargs: Any
+) -> Any:
+    token = current_ids.set(ids)
+    try:
+        return func(*args, **kwargs)
+    finally:
+        current_ids.reset(token)
+
+
+def to_chrome_trace(spans: list[Span]) -> dict[str, Any]:
+    """
+    Spans as Chrome trace events ("X" complete events), viewable in
+    chrome://tracing, Perfetto or speedscope.
+    """
+    events = [
+        {
+            "name": s.name,
+            "cat": s.name,
+            "ph": "X",
+            "ts": s.start * 1e6,
+            "dur": s.duration * 1e6,
+            "pid": s.pid,
+            "tid": s.thread_id,
+            "args": {
+                "trace_id": s.trace_id,
+                "span_id": s.span_id,
+                "parent_id": s.parent_id,
+                **{k: str(v) for k, v in s.attributes.items()},
+            },
+        }
+        for s in sorted(spans, key=lambda s: s.start)
+    ]
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def export_chrome_trace(path: str, spans: list[Span] | None = None) -> None:
+    """Write the recorded spans (or the given ones) as a Chrome trace file."""
+    spans = finished_spans() if spans is None else spans
+
+    with open(path, "w") as f:
+        json.dump(to_chrome_trace(spans), f)
+
+    logger.info(f"Exported {len(spans)} spans to {path}")
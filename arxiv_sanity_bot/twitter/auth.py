@@ -8,9 +8,11 @@ class TwitterOAuth1:
     consumer_secret: str = ""
     access_token: str = ""
     access_token_secret: str = ""
+    env_prefix: str = "TWITTER"
 
     def __post_init__(self):
-        self.consumer_key = os.environ.get("TWITTER_CONSUMER_KEY", "")
-        self.consumer_secret = os.environ.get("TWITTER_CONSUMER_SECRET", "")
-        self.access_token = os.environ.get("TWITTER_ACCESS_TOKEN", "")
-        self.access_token_secret = os.environ.get("TWITTER_ACCESS_TOKEN_SECRET", "")
+        p = self.env_prefix
+        self.consumer_key = os.environ.get(f"{p}_CONSUMER_KEY", "")
+        self.consumer_secret = os.environ.get(f"{p}_CONSUMER_SECRET", "")
+        self.access_token = os.environ.get(f"{p}_ACCESS_TOKEN", "")
+        self.access_token_secret = os.environ.get(f"{p}_ACCESS_TOKEN_SECRET", "")
@@ -9,21 +9,33 @@ from tenacity import (
     before_sleep_log,
 )
 
-from arxiv_sanity_bot.config import TWITTER_N_TRIALS, TWITTER_SLEEP_TIME
+from arxiv_sanity_bot.config import (
+    TWITTER_API_URL,
+    TWITTER_N_TRIALS,
+    TWITTER_SLEEP_TIME,
+)
+from arxiv_sanity_bot.http_session import redirect
 from arxiv_sanity_bot.logger import get_logger
+from arxiv_sanity_bot.telemetry.metrics import TWEETS, count_retries, timed
 from arxiv_sanity_bot.twitter.auth import TwitterOAuth1
 
 
 logger = get_logger(__name__)
 
 
+_TWITTER_HOSTS = ["https://api.twitter.com", "https://upload.twitter.com"]
+
+
 @retry(
     retry=retry_if_exception_type(tweepy.errors.TweepyException),
     stop=stop_after_attempt(TWITTER_N_TRIALS),
     wait=wait_fixed(TWITTER_SLEEP_TIME),
-    before_sleep=before_sleep_log(logger, logging.WARNING, exc_info=True),
+    before_sleep=count_retries(
+        "create_tweet", before_sleep_log(logger, logging.WARNING, exc_info=True)
+    ),
     reraise=True,
 )
+@timed("create_tweet", TWITTER_API_URL or _TWITTER_HOSTS[0])
 def _create_tweet(
     client: tweepy.Client,
     text: str,
@@ -46,9 +58,12 @@ def _create_tweet(
     retry=retry_if_exception_type(tweepy.errors.TweepyException),
     stop=stop_after_attempt(TWITTER_N_TRIALS),
     wait=wait_fixed(TWITTER_SLEEP_TIME),
-    before_sleep=before_sleep_log(logger, logging.WARNING, exc_info=True),
+    before_sleep=count_retries(
+        "media_upload", before_sleep_log(logger, logging.WARNING, exc_info=True)
+    ),
     reraise=True,
 )
+@timed("media_upload", TWITTER_API_URL or _TWITTER_HOSTS[1])
 def _upload_image_with_retry(api: tweepy.API, img_path: str) -> Any:
     return api.simple_upload(img_path)
 
@@ -84,6 +99,8 @@ def send_tweet(
         access_token=auth.access_token,
         access_token_secret=auth.access_token_secret,
     )
+    if TWITTER_API_URL:
+        redirect(client.session, _TWITTER_HOSTS, TWITTER_API_URL)
 
     mids = media_ids if len(media_ids) > 0 else None
 
@@ -97,6 +114,7 @@ def send_tweet(
         response = _create_tweet(client, tweet, None, in_reply_to_tweet_id)
 
     logger.info(f"Sent tweet {tweet}")
+    TWEETS.inc()
 
     tweet_url = (
         f"https://twitter.com/user/status/{response.data['id']}" if response else None
@@ -108,6 +126,8 @@ def send_tweet(
 
 def _upload_image(auth: Any, img_path: str | None) -> list[str]:
     api = tweepy.API(auth)
+    if TWITTER_API_URL:
+        redirect(api.session, _TWITTER_HOSTS, TWITTER_API_URL)
     media_ids: list[str] = []
     if img_path is not None:
         try:
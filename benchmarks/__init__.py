@@ -0,0 +1,14 @@
+"""
+Offline micro-benchmarks of the hot paths. Run them with
+
+    python -m benchmarks run --output benchmarks/baselines/<name>.json
+    python -m benchmarks compare benchmarks/baselines/<name>.json
+
+(see ``python -m benchmarks --help``).
+
+Timings are only comparable on the same machine and Python version: record
+the baseline under the interpreter the project supports (see pyproject.toml)
+on the machine that runs the comparison. Image extraction runs in the
+benchmark process (no worker processes), whatever
+ARXIV_SANITY_BOT_EXTRACTION_WORKERS says.
+"""
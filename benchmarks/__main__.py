@@ -0,0 +1,113 @@
+import fnmatch
+import json
+import os
+import sys
+
+# Keep the instrumented code quiet, logging would dominate the timings
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+# Time the downloads and extractions, not hits of the paper cache
+os.environ["ARXIV_SANITY_BOT_PAPER_CACHE_DIR"] = ""
+# Extract in this process: worker processes would add their start-up and the
+# pickling of the results to the timings, depending on the pool size
+os.environ["ARXIV_SANITY_BOT_EXTRACTION_WORKERS"] = "0"
+
+import click  # noqa: E402
+
+# Imported to register their benchmarks
+from benchmarks import (  # noqa: E402, F401
+    bench_arxiv,
+    bench_images,
+    bench_logging,
+    bench_ranking,
+)
+from benchmarks.harness import (  # noqa: E402
+    BENCHMARKS,
+    compare,
+    format_comparisons,
+    run,
+)
+
+
+@click.group()
+def cli():
+    """Micro-benchmarks of the hot paths (offline)."""
+
+
+@cli.command("list")
+def list_benchmarks():
+    """List the benchmarks."""
+    for name in BENCHMARKS:
+        click.echo(name)
+
+
+@cli.command("run")
+@click.option(
+    "-k", "pattern", default="*", help="Only run benchmarks matching this glob"
+)
+@click.option("--repeat", default=5, help="Timed repeats of each benchmark", type=int)
+@click.option(
+    "--output",
+    default=None,
+    help="Save the results to this JSON file (e.g. as a new baseline)",
+    type=click.Path(dir_okay=False),
+)
+def run_command(pattern, repeat, output):
+    """Run the benchmarks."""
+    results = run(_select(pattern), repeat=repeat, progress=click.echo)
+
+    if output:
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with open(output, "w") as f:
+            json.dump(results, f, indent=2)
+        click.echo(f"Results saved to {output}")
+
+
+@cli.command("compare")
+@click.argument("baseline", type=click.Path(exists=True, dir_okay=False))
+@click.argument("current", required=False, type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "--threshold",
+    default=0.2,
+    help="Relative slowdown of the median time that fails the comparison",
+    type=float,
+)
+@click.option("--repeat", default=5, help="Timed repeats (when running)", type=int)
+def compare_command(baseline, current, threshold, repeat):
+    """
+    Compare CURRENT (default: a fresh run of the benchmarks in BASELINE)
+    with BASELINE. Exits with 1 if any benchmark got slower.
+    """
+    with open(baseline) as f:
+        base_results = json.load(f)
+
+    if current is not None:
+        with open(current) as f:
+            current_results = json.load(f)
+    else:
+        names = [n for n in base_results["results"] if n in BENCHMARKS]
+        current_results = run(names, repeat=repeat)
+
+    for key in ("python", "machine"):
+        if base_results.get(key) != current_results.get(key):
+            click.echo(
+                f"Warning: the baseline was recorded with {key} "
+                f"{base_results.get(key)}, not {current_results.get(key)}",
+                err=True,
+            )
+
+    comparisons = compare(base_results, current_results, threshold)
+    click.echo(format_comparisons(comparisons))
+
+    if any(c.status == "slower" for c in comparisons):
+        sys.exit(1)
+
+
+def _select(pattern: str) -> list[str]:
+    names = [n for n in BENCHMARKS if fnmatch.fnmatchcase(n, pattern)]
+    if not names:
+        raise click.UsageError(f"No benchmark matches {pattern}")
+    return names
+
+
+if __name__ == "__main__":
+    cli()
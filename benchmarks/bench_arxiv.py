@@ -0,0 +1,25 @@
+from datetime import timedelta
+from unittest import mock
+
+from benchmarks.data import NOW, corpus
+from benchmarks.harness import benchmark
+
+from arxiv_sanity_bot.arxiv import arxiv_abstracts
+from arxiv_sanity_bot.fakes.corpus import atom_feed
+
+
+@benchmark("arxiv.fetch_from_arxiv[2k]")
+def fetch_from_arxiv():
+    response = mock.Mock(
+        content=atom_feed(corpus(2000).by_date, "http://export.arxiv.org/pdf").encode()
+    )
+
+    def parse():
+        # Only the parsing is timed, the response is canned
+        session = mock.Mock(get=mock.Mock(return_value=response))
+        with mock.patch.object(arxiv_abstracts, "get_session", return_value=session):
+            return arxiv_abstracts._fetch_from_arxiv(
+                NOW - timedelta(days=8), NOW, max_results=5000
+            )
+
+    return parse
@@ -0,0 +1,78 @@
+import fitz  # type: ignore
+from PIL import Image
+
+from benchmarks.data import PAPERS, RESOURCES, dense_plot_page, photo_jpeg
+from benchmarks.harness import benchmark
+
+from arxiv_sanity_bot.arxiv import extract_graph, extract_image, image_validation
+from arxiv_sanity_bot.arxiv.decode_budget import paper_budget
+
+
+def _register(kind: str, pdf_path: str) -> None:
+    arxiv_id = f"bench-{kind}"
+
+    benchmark(f"images.extract_image[{kind}]")(
+        lambda: lambda: extract_image.extract_image(pdf_path, arxiv_id)
+    )
+    benchmark(f"images.extract_graph[{kind}]")(
+        lambda: lambda: extract_graph.extract_graph(pdf_path, arxiv_id)
+    )
+    benchmark(f"images.graph_bounding_boxes[{kind}]")(
+        lambda: _all_pages_bounding_boxes(pdf_path)
+    )
+    # Passing the path bypasses the download and the image cache
+    benchmark(f"images.extract_first_image[{kind}]")(
+        lambda: lambda: extract_image.extract_first_image(arxiv_id, pdf_path)
+    )
+    benchmark(f"images.extract_first_image_pypdf[{kind}]")(
+        lambda: lambda: extract_image._find_first_image_or_graph_pypdf(
+            arxiv_id, pdf_path, paper_budget()
+        )
+    )
+
+
+def _all_pages_bounding_boxes(pdf_path: str):
+    pages = list(fitz.open(pdf_path))
+    return lambda: [extract_graph._get_bounding_boxes(page) for page in pages]
+
+
+for _kind, _path in PAPERS.items():
+    _register(_kind, str(_path))
+
+
+@benchmark("images.graph_bounding_boxes[dense]")
+def graph_bounding_boxes_dense():
+    page = dense_plot_page()
+    return lambda: extract_graph._get_bounding_boxes(page)
+
+
+@benchmark("images.has_image_content[bitmap]", number=10)
+def has_image_content_bitmap():
+    path = str(RESOURCES / "three_image1.jpg")
+    return lambda: image_validation.has_image_content(path)
+
+
+@benchmark("images.has_image_content[graph]", number=10)
+def has_image_content_graph():
+    path = str(RESOURCES / "graph-three-page26.png")
+    return lambda: image_validation.has_image_content(path)
+
+
+@benchmark("images.convert_to_jpeg[graph]", number=10)
+def convert_to_jpeg():
+    with Image.open(RESOURCES / "graph-three-page26.png") as image:
+        image.load()
+    # _convert_to_jpeg downsizes the image in place
+    return lambda: extract_image._convert_to_jpeg(image.copy())
+
+
+@benchmark("images.decode_and_convert[photo]", number=3)
+def decode_and_convert_photo():
+    data = photo_jpeg()
+
+    def run():
+        image = extract_image._decode("bench-photo", data)
+        image_validation.has_image_content(image)
+        return extract_image._convert_to_jpeg(image)
+
+    return run
@@ -0,0 +1,18 @@
+import logging
+
+from benchmarks.harness import benchmark
+
+from arxiv_sanity_bot.logger import JSONFormatter
+
+
+@benchmark("logging.json_formatter", number=10_000)
+def json_formatter():
+    formatter = JSONFormatter()
+    record = logging.LogRecord(
+        "arxiv_sanity_bot.bench", logging.INFO, __file__, 1, "Paper %s", ("1",), None
+    )
+    record.arxiv_id = "2501.00001"
+    record.title = "A paper"
+    record.score = 2
+
+    return lambda: formatter.format(record)
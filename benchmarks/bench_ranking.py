@@ -0,0 +1,36 @@
+from benchmarks.data import corpus
+from benchmarks.harness import benchmark
+
+from arxiv_sanity_bot.fakes.corpus import alphaxiv_entry
+from arxiv_sanity_bot.ranking import ranked_papers
+
+
+@benchmark("ranking.from_alphaxiv[10k]")
+def from_alphaxiv():
+    entries = [alphaxiv_entry(p) for p in corpus(10_000).by_votes]
+
+    return lambda: [ranked_papers._from_alphaxiv(e) for e in entries]
+
+
+@benchmark("ranking.merge_and_score[10k]")
+def merge_and_score():
+    papers = corpus(10_000)
+    alphaxiv = [
+        ranked_papers._from_alphaxiv(alphaxiv_entry(p)) for p in papers.by_votes
+    ]
+    hf = [
+        ranked_papers._from_huggingface(
+            {
+                "paper": {
+                    "id": p.arxiv_id,
+                    "title": p.title,
+                    "summary": p.abstract,
+                    "publishedAt": p.published_on.isoformat(),
+                }
+            }
+        )
+        for p in papers.papers
+        if p.on_hf
+    ]
+
+    return lambda: ranked_papers._merge_and_score_papers(alphaxiv, hf)
@@ -0,0 +1,70 @@
+import functools
+import io
+import random
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+import fitz  # type: ignore
+import numpy as np
+from PIL import Image
+
+from arxiv_sanity_bot.config import TIMEZONE
+from arxiv_sanity_bot.fakes.corpus import SyntheticCorpus
+
+
+# Fixed, so that every run benchmarks the same inputs
+NOW = datetime(2026, 1, 15, tzinfo=TIMEZONE)
+
+RESOURCES = Path(__file__).parent.parent / "tests" / "resources"
+
+# The PDFs of the test suite, by what they contain
+PAPERS = {
+    "no_figures": RESOURCES / "compressed-2304.09167v1.pdf",
+    "graph": RESOURCES / "compressed-2304.09116v1.pdf",
+    "graph_and_bitmap": RESOURCES / "compressed-2101.00027v1.pdf",
+}
+
+
+@functools.cache
+def dense_plot_page(n_markers: int = 20_000) -> Any:
+    """
+    A PDF page with a scatter plot of n_markers small markers, like the
+    plot-heavy pages that make graph extraction slow.
+    """
+    rng = random.Random(0)
+    doc = fitz.open()
+    page = doc.new_page()
+
+    shape = page.new_shape()
+    for _ in range(n_markers):
+        x, y, size = rng.uniform(72, 540), rng.uniform(72, 720), rng.uniform(1, 4)
+        shape.draw_rect(fitz.Rect(x, y, x + 1.5 * size, y + size))
+        shape.finish(color=(0.1, 0.3, 0.9), fill=(0.1, 0.3, 0.9))
+    shape.commit()
+
+    return page
+
+
+@functools.cache
+def photo_jpeg(width: int = 6000, height: int = 4000) -> bytes:
+    """
+    A photo-like JPEG (smooth gradients with noise), like the scanned or
+    photographic figures that are slow to decode and validate.
+    """
+    rng = np.random.default_rng(0)
+    x = np.linspace(0, 255, width)
+    y = np.linspace(0, 255, height)[:, None]
+    pixels = np.stack([x + 0 * y, y + 0 * x, (x + y) / 2], axis=-1)
+    pixels += rng.normal(0, 20, pixels.shape)
+
+    buffer = io.BytesIO()
+    Image.fromarray(pixels.clip(0, 255).astype(np.uint8)).save(
+        buffer, "JPEG", quality=90
+    )
+    return buffer.getvalue()
+
+
+@functools.cache
+def corpus(n_papers: int) -> SyntheticCorpus:
+    return SyntheticCorpus(n_papers, seed=0, now=NOW)
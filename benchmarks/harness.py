@@ -0,0 +1,162 @@
+import contextlib
+import dataclasses
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Iterator
+
+
+# A setup function prepares the inputs and returns the callable to time
+Setup = Callable[[], Callable[[], Any]]
+
+
+@dataclasses.dataclass
+class Benchmark:
+    name: str
+    setup: Setup
+    # Calls per timed repeat
+    number: int
+
+
+@dataclasses.dataclass
+class Comparison:
+    name: str
+    baseline: float | None
+    current: float | None
+    status: str
+
+    @property
+    def ratio(self) -> float | None:
+        if self.baseline is None or self.current is None:
+            return None
+        return self.current / self.baseline
+
+
+BENCHMARKS: dict[str, Benchmark] = {}
+
+
+def benchmark(name: str, number: int = 1) -> Callable[[Setup], Setup]:
+    """Register a setup function as the benchmark ``name``."""
+
+    def decorator(setup: Setup) -> Setup:
+        if name in BENCHMARKS:
+            raise ValueError(f"Benchmark {name} is already registered")
+        BENCHMARKS[name] = Benchmark(name, setup, number)
+        return setup
+
+    return decorator
+
+
+def run(
+    names: list[str], repeat: int = 5, progress: Callable[[str], None] | None = None
+) -> dict[str, Any]:
+    """
+    Time the given benchmarks and return the results in the format of the
+    JSON baselines. Times are seconds per call.
+    """
+    results = {}
+
+    # Some hot paths write their output files to the working directory
+    with _in_temporary_directory():
+        for name in names:
+            bench = BENCHMARKS[name]
+            func = bench.setup()
+
+            # Warm up (imports, caches, lazy initializations)
+            func()
+
+            times = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                for _ in range(bench.number):
+                    func()
+                times.append((time.perf_counter() - start) / bench.number)
+
+            results[name] = {
+                "median": statistics.median(times),
+                "min": min(times),
+                "max": max(times),
+                "number": bench.number,
+                "repeat": repeat,
+            }
+
+            if progress is not None:
+                progress(f"{name}: {_format_time(results[name]['median'])}")
+
+    return {
+        "created_at": datetime.now(tz=timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+
+
+def compare(
+    baseline: dict[str, Any], current: dict[str, Any], threshold: float = 0.2
+) -> list[Comparison]:
+    """
+    Compare the median times of two runs.
+
+    :param threshold: relative change above which a benchmark is flagged as
+    slower (or faster)
+    """
+    base_results = baseline["results"]
+    current_results = current["results"]
+
+    comparisons = []
+    for name in sorted(set(base_results) | set(current_results)):
+        base = base_results.get(name, {}).get("median")
+        cur = current_results.get(name, {}).get("median")
+
+        if base is None:
+            status = "new"
+        elif cur is None:
+            status = "missing"
+        elif cur > base * (1 + threshold):
+            status = "slower"
+        elif cur < base * (1 - threshold):
+            status = "faster"
+        else:
+            status = "ok"
+
+        comparisons.append(Comparison(name, base, cur, status))
+
+    return comparisons
+
+
+def format_comparisons(comparisons: list[Comparison]) -> str:
+    width = max([len(c.name) for c in comparisons] + [9])
+    lines = [f"{'benchmark':<{width}}  {'baseline':>10}  {'current':>10}  {'ratio':>6}"]
+    for c in comparisons:
+        ratio = f"{c.ratio:.2f}" if c.ratio is not None else "-"
+        lines.append(
+            f"{c.name:<{width}}  {_format_time(c.baseline):>10}  "
+            f"{_format_time(c.current):>10}  {ratio:>6}  {c.status}"
+        )
+    return "\n".join(lines)
+
+
+def _format_time(seconds: float | None) -> str:
+    if seconds is None:
+        return "-"
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.1f} us"
+    if seconds < 1:
+        return f"{seconds * 1e3:.1f} ms"
+    return f"{seconds:.2f} s"
+
+
+@contextlib.contextmanager
+def _in_temporary_directory() -> Iterator[None]:
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        os.chdir(tmp_dir)
+        try:
+            yield
+        finally:
+            os.chdir(cwd)
@@ -0,0 +1,18 @@
+import pytest
+
+from arxiv_sanity_bot.arxiv import extract_image
+
+
+@pytest.fixture(autouse=True)
+def extract_in_process(monkeypatch):
+    # Tests patch the extraction (e.g. the engine) in this process, which
+    # worker processes would not see. See test_extraction_pool.py for them
+    monkeypatch.setattr(extract_image, "EXTRACTION_WORKERS", 0)
+
+
+@pytest.fixture(autouse=True)
+def no_paper_cache(monkeypatch):
+    # Tests count downloads and extractions, which a cache shared with other
+    # runs would skip. See test_paper_cache.py for it
+    monkeypatch.setattr(extract_image, "PAPER_CACHE_DIR", None)
+    monkeypatch.setattr(extract_image, "_PAPER_CACHE", None)
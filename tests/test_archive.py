@@ -0,0 +1,105 @@
+from datetime import datetime, timezone
+
+import pandas as pd
+import pyarrow.compute as pc
+
+from arxiv_sanity_bot.cli.arxiv_sanity_bot import _candidate_table
+from arxiv_sanity_bot.profiles import DEFAULT_PROFILE
+from arxiv_sanity_bot.store.archive import SCHEMA, CandidateArchive
+
+
+STARTED_AT = datetime(2025, 1, 31, 12, tzinfo=timezone.utc)
+
+
+def _abstracts(n):
+    return pd.DataFrame(
+        {
+            "arxiv": [f"2501.{i:05d}" for i in range(n)],
+            "title": [f"Paper {i}" for i in range(n)],
+            "abstract": ["An abstract"] * n,
+            "published_on": [STARTED_AT] * n,
+            "score": [float(100 - i) for i in range(n)],
+            "alphaxiv_rank": [i + 1 for i in range(n)],
+            "hf_rank": [None] * n,
+            "average_rank": [float(i + 1) for i in range(n)],
+            "votes": [50 - i for i in range(n)],
+        }
+    )
+
+
+def test_append_and_read(tmp_path):
+    archive = CandidateArchive(str(tmp_path))
+
+    archive.append(_abstracts(3), "run1", STARTED_AT, "default")
+    archive.append(_abstracts(2), "run2", STARTED_AT, "robotics")
+
+    everything = archive.read()
+    assert len(everything) == 5
+    assert set(SCHEMA.names) <= set(everything.columns)
+    # Missing columns are nulls
+    assert everything["summary"].isna().all()
+
+    robotics = archive.read(
+        columns=["arxiv", "votes"], filters=pc.field("profile") == "robotics"
+    )
+    assert list(robotics.columns) == ["arxiv", "votes"]
+    assert robotics["votes"].tolist() == [50, 49]
+
+
+def test_partitions_and_no_temporary_files(tmp_path):
+    archive = CandidateArchive(str(tmp_path))
+
+    path = archive.append(_abstracts(1), "run1", STARTED_AT, "default")
+
+    partition = tmp_path / "run_date=2025-01-31" / "profile=default"
+    assert path == str(partition / "run1.parquet")
+    assert [p.name for p in partition.iterdir()] == ["run1.parquet"]
+
+
+def test_read_empty_archive(tmp_path):
+    assert len(CandidateArchive(str(tmp_path / "missing")).read()) == 0
+
+
+def test_candidate_table(tmp_path):
+    candidates = _abstracts(4)
+    # The second paper was posted in a previous run
+    new = candidates.drop(index=1).reset_index(drop=True)
+    summaries = [
+        {
+            "arxiv": "2501.00000",
+            "tweet": "A summary",
+            "image": "image.jpg",
+            "process_seconds": 1.5,
+        },
+        {
+            "arxiv": "2501.00002",
+            "tweet": "Another summary",
+            "image": None,
+            "process_seconds": 2.0,
+        },
+    ]
+    profile = DEFAULT_PROFILE.model_copy(update={"max_num_papers": 2})
+
+    table = _candidate_table(
+        candidates,
+        new,
+        summaries,
+        {"2501.00000": "https://x.com/1"},
+        profile,
+        dry=True,
+    )
+
+    assert table["pool_rank"].tolist() == [0, 1, 2, 3]
+    assert table["dedup"].tolist() == ["new", "posted_before", "new", "new"]
+    assert table["selected"].tolist() == [True, False, True, False]
+    assert table["summary"].notna().tolist() == [True, False, True, False]
+    assert table["posted"].tolist() == [True, False, False, False]
+    assert table["tweet_url"].tolist()[0] == "https://x.com/1"
+    assert "abstract" not in table.columns
+
+    archive = CandidateArchive(str(tmp_path))
+    archive.append(table, "run1", STARTED_AT, profile.name)
+
+    stored = archive.read(columns=["arxiv", "process_seconds", "dry"])
+    assert stored["process_seconds"].fillna(0).tolist() == [1.5, 0, 2.0, 0]
+    assert stored["dry"].all()
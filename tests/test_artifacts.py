@@ -0,0 +1,113 @@
+import os
+import time
+from datetime import datetime, timezone
+from unittest import mock
+
+import pandas as pd
+
+from arxiv_sanity_bot.arxiv import extract_image
+from arxiv_sanity_bot.cli import arxiv_sanity_bot as cli
+from arxiv_sanity_bot.store.artifacts import ArtifactStore
+
+
+def test_put_and_get(tmp_path):
+    image = tmp_path / "image.jpg"
+    image.write_bytes(b"jpeg bytes")
+
+    artifacts = ArtifactStore(str(tmp_path / "precomputed"))
+    artifacts.put("2501.00001", "A summary", str(image))
+
+    assert "2501.00001" in artifacts
+    summary, img_path = artifacts.get("2501.00001")
+    assert summary == "A summary"
+    assert open(img_path, "rb").read() == b"jpeg bytes"
+
+
+def test_no_image_is_remembered(tmp_path):
+    artifacts = ArtifactStore(str(tmp_path))
+    artifacts.put("2501.00001", "A summary", None)
+
+    assert artifacts.get("2501.00001") == ("A summary", None)
+
+
+def test_summaries_are_keyed_by_instructions(tmp_path):
+    artifacts = ArtifactStore(str(tmp_path))
+    artifacts.put("2501.00001", "Default summary", None)
+    artifacts.put("2501.00001", "Robotics summary", None, "Focus on robotics.")
+
+    assert artifacts.get("2501.00001")[0] == "Default summary"
+    assert artifacts.get("2501.00001", "Focus on robotics.")[0] == "Robotics summary"
+    assert artifacts.get("2501.00001", "Something else") is None
+    assert artifacts.get("2501.99999") is None
+
+
+def test_expired_artifacts_are_ignored_and_pruned(tmp_path, monkeypatch):
+    image = tmp_path / "image.jpg"
+    image.write_bytes(b"jpeg bytes")
+
+    artifacts = ArtifactStore(str(tmp_path / "precomputed"), max_age=3600)
+    artifacts.put("2501.00001", "Old summary", str(image))
+    artifacts.put("2501.00002", "New summary", None)
+
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 1800)
+    artifacts.put("2501.00002", "New summary", None)
+    monkeypatch.setattr(time, "time", lambda: now + 3601)
+
+    assert artifacts.get("2501.00001") is None
+    assert artifacts.get("2501.00002") == ("New summary", None)
+
+    assert artifacts.prune() == 1
+    assert "2501.00001" not in artifacts
+    assert "2501.00002" in artifacts
+    assert sorted(os.listdir(tmp_path / "precomputed")) == ["2501.00002.json"]
+
+
+def test_artifacts_are_opt_in(monkeypatch):
+    monkeypatch.setattr(cli, "PRECOMPUTE_DIR", None)
+
+    assert cli._artifacts() is None
+
+
+def test_posting_run_uses_precomputed_artifacts(tmp_path, monkeypatch):
+    image = tmp_path / "image.jpg"
+    image.write_bytes(b"jpeg bytes")
+    artifacts = ArtifactStore(str(tmp_path / "precomputed"))
+    artifacts.put("2501.00001", "Precomputed summary", str(image))
+
+    abstracts = pd.DataFrame(
+        {
+            "arxiv": ["2501.00001"],
+            "title": ["Paper"],
+            "abstract": ["Abstract"],
+            "score": [100],
+            "published_on": [datetime(2025, 1, 31, tzinfo=timezone.utc)],
+        }
+    )
+    monkeypatch.setattr(
+        cli, "_gather_abstracts", lambda *args, **kwargs: (abstracts, 1)
+    )
+    monkeypatch.setattr(cli, "_document_store", lambda collection: {})
+
+    def _fail(*args, **kwargs):
+        raise AssertionError("The image should not be extracted")
+
+    monkeypatch.setattr(extract_image, "_get_pdf", _fail)
+    monkeypatch.setattr(extract_image, "_extract_first_image_from_pdf", _fail)
+
+    llm = mock.Mock()
+    llm.generate_bot_summary.return_value = "Summary tweet"
+
+    posted = []
+
+    def sender(tweet, auth, img_path=None, in_reply_to_tweet_id=None):
+        posted.append((tweet, img_path))
+        return f"https://x.com/{len(posted)}", len(posted)
+
+    monkeypatch.setattr(cli, "_tweet_sender", lambda dry: sender)
+    monkeypatch.setattr(cli, "PACING_SCALE", 0)
+
+    cli.run_bot(48, 0, dry=True, llm=llm, artifacts=artifacts)
+
+    llm.summarize_abstract.assert_not_called()
+    assert posted[1] == ("Precomputed summary", artifacts.get("2501.00001")[1])
@@ -113,11 +113,12 @@ def test_fetch_from_arxiv_retries_on_zero_results():
     mock_response_with_data.raise_for_status = Mock()
 
     with (
-        patch("arxiv_sanity_bot.arxiv.arxiv_abstracts.requests.get") as mock_get,
+        patch("arxiv_sanity_bot.arxiv.arxiv_abstracts.get_session") as mock_session,
         patch("arxiv_sanity_bot.arxiv.arxiv_abstracts.time.sleep") as mock_sleep,
         patch("arxiv_sanity_bot.arxiv.arxiv_abstracts.logger") as mock_logger,
     ):
 
+        mock_get = mock_session.return_value.get
         mock_get.side_effect = [mock_response_empty, mock_response_with_data]
 
         result = _fetch_from_arxiv(after, before, max_results=1000)
@@ -146,8 +147,8 @@ def test_fetch_from_arxiv_raises_after_max_retries():
 
     with (
         patch(
-            "arxiv_sanity_bot.arxiv.arxiv_abstracts.requests.get",
-            return_value=mock_response,
+            "arxiv_sanity_bot.arxiv.arxiv_abstracts.get_session",
+            return_value=Mock(get=Mock(return_value=mock_response)),
         ),
         patch("arxiv_sanity_bot.arxiv.arxiv_abstracts.time.sleep"),
         patch("arxiv_sanity_bot.arxiv.arxiv_abstracts.logger"),
@@ -169,8 +170,8 @@ def test_fetch_from_arxiv_does_not_retry_on_api_errors():
 
     with (
         patch(
-            "arxiv_sanity_bot.arxiv.arxiv_abstracts.requests.get",
-            return_value=mock_response,
+            "arxiv_sanity_bot.arxiv.arxiv_abstracts.get_session",
+            return_value=Mock(get=Mock(return_value=mock_response)),
         ),
         patch("arxiv_sanity_bot.arxiv.arxiv_abstracts.time.sleep") as mock_sleep,
         patch("arxiv_sanity_bot.arxiv.arxiv_abstracts.logger"),
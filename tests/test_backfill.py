@@ -0,0 +1,214 @@
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+import pytest
+
+from arxiv_sanity_bot.backfill import BackfillState, run_backfill, split_windows
+
+
+def get_resource(resource):
+    return Path(__file__).parent / "resources" / resource
+
+
+@pytest.fixture
+def windows():
+    return split_windows(
+        datetime(2025, 1, 1, tzinfo=timezone.utc),
+        datetime(2025, 1, 3, tzinfo=timezone.utc),
+        24,
+    )
+
+
+def test_split_windows():
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    end = datetime(2025, 1, 2, 12, tzinfo=timezone.utc)
+
+    windows = split_windows(start, end, 24)
+
+    assert windows == [
+        (start, datetime(2025, 1, 2, tzinfo=timezone.utc)),
+        (datetime(2025, 1, 2, tzinfo=timezone.utc), end),
+    ]
+    assert split_windows(end, start, 24) == []
+
+
+def test_backfill_state_resumes(tmp_path, windows):
+    path = str(tmp_path / "state.json")
+
+    state = BackfillState(path)
+    state.mark_done(windows[0])
+
+    resumed = BackfillState(path)
+    assert resumed.is_done(windows[0])
+    assert not resumed.is_done(windows[1])
+
+
+def test_run_backfill(tmp_path, monkeypatch, windows):
+    monkeypatch.chdir(tmp_path)
+
+    def _abstracts(after, before):
+        day = after.day
+        return (
+            pd.DataFrame(
+                [
+                    {
+                        "arxiv": f"2501.0000{day}",
+                        "title": f"Paper {day}",
+                        "abstract": f"Abstract {day}",
+                        "published_on": after,
+                        "score": 2,
+                    },
+                    {
+                        "arxiv": "2501.99999",
+                        "title": "Below threshold",
+                        "abstract": "Abstract",
+                        "published_on": after,
+                        "score": 0,
+                    },
+                ]
+            ),
+            2,
+        )
+
+    doc_store = MagicMock()
+    doc_store.__contains__.return_value = False
+    llm = MagicMock()
+    llm.summarize_abstract.side_effect = lambda abstract: f"Summary of {abstract}"
+
+    state = BackfillState(str(tmp_path / "state.json"))
+
+    with patch(
+        "arxiv_sanity_bot.backfill.download_paper",
+        return_value=str(get_resource("compressed-2304.09116v1.pdf")),
+    ):
+        report = run_backfill(
+            windows,
+            get_all_abstracts=_abstracts,
+            get_url=lambda arxiv_id: f"https://arxiv.org/abs/{arxiv_id}",
+            doc_store=doc_store,
+            llm=llm,
+            state=state,
+            workers=2,
+        )
+
+    assert report.n_windows == 2
+    assert report.n_papers == 2
+    assert report.papers_per_minute > 0
+
+    stored = {c.args[0]: c.args[1] for c in doc_store.__setitem__.call_args_list}
+    assert set(stored) == {"2501.00001", "2501.00002"}
+    assert stored["2501.00001"]["summary"] == "Summary of Abstract 1"
+    assert stored["2501.00001"]["has_image"]
+    assert stored["2501.00001"]["backfilled"]
+
+    # Running again does nothing: all windows are done
+    report = run_backfill(
+        windows,
+        get_all_abstracts=_abstracts,
+        get_url=lambda arxiv_id: arxiv_id,
+        doc_store=doc_store,
+        llm=llm,
+        state=BackfillState(str(tmp_path / "state.json")),
+        workers=2,
+    )
+    assert report.n_skipped_windows == 2
+    assert report.n_papers == 0
+
+
+def test_failed_extraction_keeps_the_summary(tmp_path, monkeypatch, windows):
+    monkeypatch.chdir(tmp_path)
+
+    def _abstracts(after, before):
+        return (
+            pd.DataFrame(
+                [
+                    {
+                        "arxiv": f"2501.0000{after.day}",
+                        "title": "Paper",
+                        "abstract": "Abstract",
+                        "published_on": after,
+                        "score": 2,
+                    }
+                ]
+            ),
+            1,
+        )
+
+    doc_store = MagicMock()
+    doc_store.__contains__.return_value = False
+    llm = MagicMock()
+    llm.summarize_abstract.return_value = "Summary"
+
+    with (
+        patch("arxiv_sanity_bot.backfill.download_paper", return_value="paper.pdf"),
+        patch(
+            "arxiv_sanity_bot.backfill.extract_first_image",
+            side_effect=RuntimeError("worker died"),
+        ),
+    ):
+        report = run_backfill(
+            windows,
+            get_all_abstracts=_abstracts,
+            get_url=lambda arxiv_id: arxiv_id,
+            doc_store=doc_store,
+            llm=llm,
+            state=BackfillState(str(tmp_path / "state.json")),
+            workers=2,
+        )
+
+    assert report.n_papers == 2
+    assert report.n_failed == 0
+    stored = [c.args[1] for c in doc_store.__setitem__.call_args_list]
+    assert [d["summary"] for d in stored] == ["Summary", "Summary"]
+    assert [d["has_image"] for d in stored] == [False, False]
+
+
+def test_windows_are_processed_while_the_next_are_fetched(tmp_path, windows):
+    summarized = threading.Event()
+
+    def _abstracts(after, before):
+        if after.day == 2:
+            # The first window must not wait for this fetch
+            assert summarized.wait(timeout=10)
+        return (
+            pd.DataFrame(
+                [
+                    {
+                        "arxiv": f"2501.0000{after.day}",
+                        "title": "Paper",
+                        "abstract": "Abstract",
+                        "published_on": after,
+                        "score": 2,
+                    }
+                ]
+            ),
+            1,
+        )
+
+    def _summarize(abstract):
+        summarized.set()
+        return "Summary"
+
+    doc_store = MagicMock()
+    doc_store.__contains__.return_value = False
+    llm = MagicMock()
+    llm.summarize_abstract.side_effect = _summarize
+
+    with (
+        patch("arxiv_sanity_bot.backfill.download_paper", return_value="paper.pdf"),
+        patch("arxiv_sanity_bot.backfill.extract_first_image", return_value=None),
+    ):
+        report = run_backfill(
+            windows,
+            get_all_abstracts=_abstracts,
+            get_url=lambda arxiv_id: arxiv_id,
+            doc_store=doc_store,
+            llm=llm,
+            state=BackfillState(str(tmp_path / "state.json")),
+            workers=1,
+        )
+
+    assert report.n_papers == 2
@@ -0,0 +1,31 @@
+from benchmarks import bench_logging  # noqa: F401
+from benchmarks.harness import compare, format_comparisons, run
+
+
+def _results(**medians):
+    return {"results": {name: {"median": m} for name, m in medians.items()}}
+
+
+def test_compare_flags_slowdowns():
+    comparisons = compare(
+        _results(a=1.0, b=1.0, c=1.0, d=1.0),
+        _results(a=1.1, b=1.5, c=0.5, e=1.0),
+        threshold=0.2,
+    )
+
+    assert {c.name: c.status for c in comparisons} == {
+        "a": "ok",
+        "b": "slower",
+        "c": "faster",
+        "d": "missing",
+        "e": "new",
+    }
+    assert "slower" in format_comparisons(comparisons)
+
+
+def test_run():
+    results = run(["logging.json_formatter"], repeat=1)
+
+    timing = results["results"]["logging.json_formatter"]
+    assert timing["median"] > 0
+    assert timing["number"] == 10_000
@@ -0,0 +1,84 @@
+import os
+
+import pytest
+
+from arxiv_sanity_bot.arxiv import extract_image
+from arxiv_sanity_bot.ranking import ranked_papers
+from arxiv_sanity_bot.replay.cassette import Cassette
+from arxiv_sanity_bot.schemas import RawPaper
+from arxiv_sanity_bot.store.store import DocumentStore
+from arxiv_sanity_bot.telemetry.metrics import REPLAY_FALLBACKS
+
+
+@pytest.fixture
+def paper():
+    return RawPaper(
+        arxiv_id="2501.00001",
+        title="Test",
+        abstract="Test abstract",
+        published_on="2025-01-01T00:00:00Z",
+    )
+
+
+def _fail(*args, **kwargs):
+    raise AssertionError("The network should not be used when replaying")
+
+
+def test_record_and_replay(tmp_path, monkeypatch, paper):
+    cassette_dir = str(tmp_path / "cassette")
+    pdf = tmp_path / "2501.00001v1.pdf"
+    pdf.write_bytes(b"%PDF-1.4 content %%EOF")
+
+    monkeypatch.setattr(ranked_papers, "_fetch_hf_papers_for_date", lambda d: [paper])
+    monkeypatch.setattr(extract_image, "download_paper", lambda arxiv_id: str(pdf))
+
+    with Cassette(cassette_dir).record():
+        recorded_papers = ranked_papers._fetch_hf_papers_for_date("2025-01-01")
+        recorded_pdf = extract_image.download_paper("2501.00001")
+
+    assert recorded_papers == [paper]
+    assert recorded_pdf == str(pdf)
+
+    # Originals are restored after recording
+    assert ranked_papers._fetch_hf_papers_for_date("2025-01-01") == [paper]
+
+    monkeypatch.setattr(ranked_papers, "_fetch_hf_papers_for_date", _fail)
+    monkeypatch.setattr(extract_image, "download_paper", _fail)
+    monkeypatch.chdir(tmp_path)
+
+    with Cassette(cassette_dir).replay(latency_scale=0):
+        assert ranked_papers._fetch_hf_papers_for_date("2025-01-01") == [paper]
+
+        replayed_pdf = extract_image.download_paper("2501.00001")
+        assert open(replayed_pdf, "rb").read() == b"%PDF-1.4 content %%EOF"
+        assert not replayed_pdf.startswith(str(tmp_path))
+
+        store = DocumentStore.from_env_variable("DOES_NOT_EXIST")
+        assert store._client is None
+
+    # The replayed files are removed with the replay
+    assert not os.path.exists(replayed_pdf)
+
+    with pytest.raises(AssertionError):
+        extract_image.download_paper("2501.00001")
+
+
+def test_replay_is_strict_by_default(tmp_path, monkeypatch, paper):
+    cassette_dir = str(tmp_path / "cassette")
+    monkeypatch.setattr(ranked_papers, "_fetch_hf_papers_for_date", lambda d: [paper])
+
+    with Cassette(cassette_dir).record():
+        ranked_papers._fetch_hf_papers_for_date("2025-01-01")
+
+    REPLAY_FALLBACKS.reset()
+
+    with Cassette(cassette_dir).replay(latency_scale=0):
+        with pytest.raises(KeyError):
+            ranked_papers._fetch_hf_papers_for_date("2025-02-01")
+
+    # A different date (e.g. replaying on another day) falls back to the next
+    # recorded interaction of the same kind only when asked to
+    with Cassette(cassette_dir).replay(latency_scale=0, strict=False):
+        assert ranked_papers._fetch_hf_papers_for_date("2025-02-01") == [paper]
+
+    assert REPLAY_FALLBACKS.value(target="hf_date") == 1
@@ -0,0 +1,106 @@
+import json
+import urllib.error
+import urllib.request
+
+import pytest
+
+from arxiv_sanity_bot.daemon.server import Daemon
+
+
+@pytest.fixture
+def daemon_factory():
+    daemons = []
+
+    def _make(run_cycle):
+        daemon = Daemon(run_cycle, interval=3600)
+        daemons.append(daemon)
+        return daemon
+
+    yield _make
+
+    for daemon in daemons:
+        daemon.shutdown()
+
+
+def _get(daemon, path):
+    host, port = daemon.address
+    try:
+        with urllib.request.urlopen(f"http://{host}:{port}{path}") as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def test_run_once_records_success(daemon_factory):
+    calls = []
+    daemon = daemon_factory(lambda: calls.append(1))
+
+    daemon.run_once()
+    daemon.run_once()
+
+    assert len(calls) == 2
+    assert daemon.stats["cycles"] == 2
+    assert daemon.stats["failures"] == 0
+    assert daemon.stats["last_success_at"] is not None
+
+
+def test_run_once_survives_failures(daemon_factory):
+    def _fail():
+        raise RuntimeError("boom")
+
+    daemon = daemon_factory(_fail)
+
+    daemon.run_once()
+
+    assert daemon.stats["cycles"] == 1
+    assert daemon.stats["failures"] == 1
+    assert "boom" in daemon.stats["last_error"]
+
+
+def test_health_and_metrics_endpoints(daemon_factory):
+    state = {"fail": False}
+
+    def _cycle():
+        if state["fail"]:
+            raise RuntimeError("boom")
+
+    daemon = daemon_factory(_cycle)
+    daemon.start_server()
+
+    daemon.run_once()
+    status, body = _get(daemon, "/healthz")
+    assert status == 200
+    assert body["status"] == "ok"
+
+    state["fail"] = True
+    daemon.run_once()
+    status, body = _get(daemon, "/healthz")
+    assert status == 503
+    assert body["status"] == "failing"
+
+    status, body = _get(daemon, "/metrics")
+    assert status == 200
+    assert body["cycles"] == 2
+    assert body["failures"] == 1
+
+    status, _ = _get(daemon, "/nope")
+    assert status == 404
+
+
+def test_metrics_endpoint_speaks_openmetrics(daemon_factory):
+    daemon = daemon_factory(lambda: None)
+    daemon.start_server()
+    daemon.run_once()
+
+    host, port = daemon.address
+    request = urllib.request.Request(
+        f"http://{host}:{port}/metrics",
+        headers={"Accept": "application/openmetrics-text; version=1.0.0"},
+    )
+    with urllib.request.urlopen(request) as response:
+        content_type = response.headers["Content-Type"]
+        body = response.read().decode()
+
+    assert content_type.startswith("application/openmetrics-text")
+    assert "# TYPE arxiv_sanity_bot_daemon_cycles counter" in body
+    assert body.endswith("# EOF\n")
@@ -0,0 +1,60 @@
+import zlib
+from pathlib import Path
+
+import pypdf.errors
+import pypdf.filters
+import pytest
+
+from arxiv_sanity_bot.arxiv import decode_budget, extract_image
+from arxiv_sanity_bot.arxiv.decode_budget import (
+    BudgetExceeded,
+    DecodeBudget,
+    pypdf_output_limit,
+)
+
+
+PDF = str(Path(__file__).parent / "resources" / "compressed-2101.00027v1.pdf")
+
+
+def test_decode_budget():
+    budget = DecodeBudget(max_bytes=1000, max_pixels=500, max_pages=2)
+
+    budget.decode(10, 10, 3)
+    assert budget.remaining_bytes == 700
+    with pytest.raises(BudgetExceeded):
+        budget.decode(20, 20, 3)
+    with pytest.raises(BudgetExceeded):
+        budget.decode(30, 15, 1)
+
+    budget.scan_page(0)
+    budget.scan_page(1)
+    # Scanned again (e.g. for graphs after bitmaps)
+    budget.scan_page(0)
+    with pytest.raises(BudgetExceeded):
+        budget.scan_page(2)
+
+
+def test_pypdf_output_limit():
+    data = zlib.compress(b"0" * 10_000)
+
+    with pypdf_output_limit(1000):
+        with pytest.raises(pypdf.errors.LimitReachedError):
+            pypdf.filters.FlateDecode.decode(data)
+
+    assert len(pypdf.filters.FlateDecode.decode(data)) == 10_000
+
+
+@pytest.mark.parametrize("engine", ["pymupdf", "pypdf"])
+@pytest.mark.parametrize(
+    "limit, value",
+    [("EXTRACTION_MAX_PAGES", 1), ("EXTRACTION_MAX_PIXELS", 100_000)],
+)
+def test_papers_over_budget_have_no_image(engine, limit, value, tmp_path, monkeypatch):
+    monkeypatch.setattr(extract_image, "IMAGE_EXTRACTION_ENGINE", engine)
+    assert extract_image._extract_first_image_from_pdf("three", PDF, str(tmp_path))
+
+    # The first image is on the second page, and has 126,840 pixels
+    monkeypatch.setattr(decode_budget, limit, value)
+    assert (
+        extract_image._extract_first_image_from_pdf("three", PDF, str(tmp_path)) is None
+    )
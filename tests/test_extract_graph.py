@@ -0,0 +1,118 @@
+import random
+from types import SimpleNamespace
+
+import fitz  # type: ignore
+import pytest
+
+from arxiv_sanity_bot.arxiv.extract_graph import (
+    MAX_ZOOM,
+    PADDING,
+    _get_bounding_boxes,
+    _render_zoom,
+    _union_all_rectangles,
+    is_grayish_or_blackish,
+)
+
+
+def _reference_is_not_noise(r, color):
+    # The original per-drawing noise filter
+    ratio = r.width / (r.height + 1e-3)
+    area = r.width * r.height
+
+    if color is not None and is_grayish_or_blackish(color):
+        return 1 < ratio < 10 and r.width > 50 and r.height > 50 and area > 1000
+    else:
+        return (ratio > 1) and (r.width > 1) and (r.height > 1) and (area > 0)
+
+
+def _reference_bounding_boxes(page):
+    # The original quadratic clustering
+    new_rects = []
+
+    for p in page.get_drawings():
+        color = p["color"] or p["fill"] or None
+        r = p["rect"] + (-PADDING, -PADDING, PADDING, PADDING)
+        for i in range(len(new_rects)):
+            if abs(r & new_rects[i]) > 0:
+                new_rects[i] |= r
+                break
+        remainder = [s for s in new_rects if r in s]
+
+        if remainder == [] and _reference_is_not_noise(r, color):
+            new_rects.append(r)
+
+    return new_rects
+
+
+def _fake_page(n_drawings, seed):
+    rng = random.Random(seed)
+    drawings = []
+
+    for _ in range(n_drawings):
+        # Mostly small marks, some lines and large boxes, some off the page
+        x0 = rng.uniform(-50, 650)
+        y0 = rng.uniform(-50, 850)
+        w, h = rng.choice(
+            [
+                (rng.uniform(0, 5), rng.uniform(0, 5)),
+                (rng.uniform(50, 300), rng.uniform(0, 2)),
+                (rng.uniform(0, 2), rng.uniform(50, 300)),
+                (rng.uniform(50, 400), rng.uniform(50, 400)),
+            ]
+        )
+        gray = rng.random()
+        drawings.append(
+            {
+                "rect": fitz.Rect(x0, y0, x0 + w, y0 + h),
+                "color": rng.choice([None, (gray, gray, gray), (1.0, 0.2, 0.1)]),
+                "fill": rng.choice([None, (0.0, 0.0, 0.0), (0.2, 0.5, 0.9)]),
+            }
+        )
+
+    # Like PyMuPDF, where get_drawings converts the tuples of get_cdrawings
+    return SimpleNamespace(
+        rect=fitz.Rect(0, 0, 612, 792),
+        get_drawings=lambda: drawings,
+        get_cdrawings=lambda: [{**d, "rect": tuple(d["rect"])} for d in drawings],
+    )
+
+
+def test_is_grayish_or_blackish():
+    assert is_grayish_or_blackish((0.5, 0.5, 0.52))
+    assert is_grayish_or_blackish((0.01, 0.0, 0.03))
+    assert not is_grayish_or_blackish((1.0, 0.2, 0.1))
+
+    colors = [(0.5, 0.5, 0.5), (1.0, 0.2, 0.1), (float("nan"),) * 3]
+    assert is_grayish_or_blackish(colors).tolist() == [True, False, False]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_same_clusters_as_reference(seed):
+    page = _fake_page(1500, seed)
+
+    boxes = _get_bounding_boxes(page)
+    reference = _reference_bounding_boxes(page)
+
+    # The reference also keeps drawings that are inside a cluster but stick
+    # out of it by float32 rounding (Rect unions are computed in float32).
+    # They do not change the cutout
+    assert tuple(_union_all_rectangles(boxes)) == pytest.approx(
+        tuple(_union_all_rectangles(reference)), abs=1e-3
+    )
+
+
+def test_dense_page_is_fast():
+    page = _fake_page(20_000, 0)
+
+    # A few seconds with the quadratic clustering
+    boxes = _get_bounding_boxes(page)
+
+    assert len(boxes) > 0
+
+
+def test_render_zoom():
+    # Large graphs are rendered at GRAPH_OVERSAMPLING x IMAGE_MAX_SIZE
+    assert _render_zoom(fitz.Rect(0, 0, 500, 250)) * 500 == pytest.approx(1000)
+    # Small ones at the maximum zoom
+    assert _render_zoom(fitz.Rect(0, 0, 100, 50)) == MAX_ZOOM
+    assert _render_zoom(fitz.Rect()) == MAX_ZOOM
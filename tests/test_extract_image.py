@@ -1,12 +1,16 @@
 import glob
+import io
 import os
+import shutil
 from pathlib import Path
 from unittest.mock import patch
 
+import fitz  # type: ignore
 import numpy as np
 import pytest
 from PIL import Image
 
+from arxiv_sanity_bot.arxiv import extract_graph, extract_image
 from arxiv_sanity_bot.arxiv.extract_image import (
     extract_first_image,
     _select_image_or_graph,
@@ -76,7 +80,7 @@ def test_extract_first_image_only_graph(paper_with_only_graph):
         assert image is not None
 
         assert os.path.exists(image)
-        assert image == "two_image1.jpg"
+        assert os.path.basename(image) == "two_image1.jpg"
 
         check_image_content(
             new_image=image, reference_image_path=get_resource("two_image1.jpg")
@@ -94,13 +98,104 @@ def test_extract_first_image_both_bitmap_and_graph(paper_with_both_graph_and_bit
         assert image is not None
 
         assert os.path.exists(image)
-        assert image == "three_image1.jpg"
+        assert os.path.basename(image) == "three_image1.jpg"
 
         check_image_content(
             new_image=image, reference_image_path=get_resource("three_image1.jpg")
         )
 
 
+@pytest.mark.parametrize(
+    "paper, arxiv_id",
+    [
+        ("compressed-2304.09167v1.pdf", "one"),
+        ("compressed-2304.09116v1.pdf", "two"),
+        ("compressed-2101.00027v1.pdf", "three"),
+    ],
+)
+def test_engines_agree(paper, arxiv_id, monkeypatch):
+    pdf_path = str(get_resource(paper))
+
+    monkeypatch.setattr(extract_image, "IMAGE_EXTRACTION_ENGINE", "pypdf")
+    pypdf_image = extract_first_image(arxiv_id, pdf_path)
+    if pypdf_image is not None:
+        pypdf_image = shutil.copy(pypdf_image, f"{arxiv_id}_pypdf.jpg")
+
+    monkeypatch.setattr(extract_image, "IMAGE_EXTRACTION_ENGINE", "pymupdf")
+    pymupdf_image = extract_first_image(arxiv_id, pdf_path)
+
+    if pypdf_image is None:
+        assert pymupdf_image is None
+    else:
+        check_image_content(pymupdf_image, pypdf_image)
+        os.remove(pypdf_image)
+
+
+def test_only_the_final_image_is_written(tmp_path, monkeypatch):
+    pdf_path = str(get_resource("compressed-2101.00027v1.pdf"))
+    monkeypatch.chdir(tmp_path)
+
+    workspace = tmp_path / "workspace"
+    workspace.mkdir()
+    image = extract_first_image("three", pdf_path, workspace=str(workspace))
+
+    assert image == str(workspace / "three_image1.jpg")
+    assert [p.name for p in workspace.iterdir()] == ["three_image1.jpg"]
+    # No intermediate files in the working directory
+    assert [p.name for p in tmp_path.iterdir()] == ["workspace"]
+
+
+def test_image_workspace():
+    workspace = extract_image.image_workspace()
+
+    assert os.path.isdir(workspace)
+    assert extract_image.image_workspace() == workspace
+
+
+@pytest.mark.parametrize(
+    "paper",
+    [
+        "compressed-2304.09167v1.pdf",
+        "compressed-2304.09116v1.pdf",
+        "compressed-2101.00027v1.pdf",
+    ],
+)
+def test_same_decisions_as_full_resolution(paper):
+    # Every candidate bitmap and graph of the corpus is accepted or rejected
+    # as when it was validated at full resolution
+    with fitz.open(get_resource(paper)) as doc:
+        for page in doc:
+            candidates = []
+            for xref, *_ in page.get_images(full=True):
+                data = doc.extract_image(xref)["image"]
+                with Image.open(io.BytesIO(data)) as full:
+                    reference = np.std(np.array(full.convert("L"))) >= 10
+                candidates.append((extract_image._decode("x", data), reference))
+
+            graph = extract_graph._get_bounding_boxes(page)
+            if graph:
+                cutout = extract_graph._render_cutout(graph, page)
+                reference = np.std(np.array(cutout.convert("L"))) >= 10
+                candidates.append((cutout, reference))
+
+            for image, reference in candidates:
+                assert has_image_content(image) == reference
+
+
+def test_jpegs_are_decoded_at_a_reduced_scale():
+    image = Image.effect_mandelbrot((4000, 3000), (-2, -1.5, 1, 1.5), 100)
+    buffer = io.BytesIO()
+    image.convert("RGB").save(buffer, "JPEG")
+
+    decoded = extract_image._decode("x", buffer.getvalue())
+
+    # 1/2 scale: the largest that keeps both sides above 2 x IMAGE_MAX_SIZE
+    assert decoded.size == (2000, 1500)
+    assert has_image_content(decoded)
+    with Image.open(io.BytesIO(extract_image._convert_to_jpeg(decoded))) as jpeg:
+        assert jpeg.size == (500, 375)
+
+
 def test_select_image_or_graph():
     # If both are present and on the same page, we should return the image
     graph_file = "graph"
@@ -188,3 +283,7 @@ def test_has_image_content_with_actual_content():
     assert has_image_content("test_content.png")
 
     os.remove("test_content.png")
+
+    # Decoded images are accepted as well
+    assert has_image_content(content_image)
+    assert not has_image_content(Image.new("RGB", (100, 100), color="white"))
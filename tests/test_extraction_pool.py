@@ -0,0 +1,138 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from arxiv_sanity_bot.arxiv import extract_image
+from arxiv_sanity_bot.arxiv.extraction_pool import ExtractionPool
+from arxiv_sanity_bot.telemetry import memory
+from arxiv_sanity_bot.telemetry.metrics import EXTRACTION_FAILURES
+
+
+RESOURCES = Path(__file__).parent / "resources"
+
+
+# Run in the workers, so they must be module-level functions
+
+
+def _pid(seconds=0.0):
+    time.sleep(seconds)
+    return os.getpid()
+
+
+def _fail():
+    raise ValueError("Not a PDF")
+
+
+def _crash():
+    os._exit(1)
+
+
+def _allocate(mb):
+    return len(bytearray(mb * 1024 * 1024))
+
+
+def _hang(arxiv_id, pdf_path, workspace):
+    time.sleep(10)
+
+
+def _memory_tracking():
+    return memory.is_enabled(), memory.budget_mb()
+
+
+@pytest.fixture
+def pool():
+    with ExtractionPool(workers=2, timeout=5, memory_mb=256) as pool:
+        yield pool
+
+
+def test_runs_in_workers(pool):
+    assert pool.run(_pid) not in (None, os.getpid())
+
+
+def test_runs_in_parallel(pool):
+    with ThreadPoolExecutor(2) as threads:
+        pids = list(threads.map(lambda _: pool.run(_pid, 1.0), range(2)))
+
+    assert len(set(pids)) == 2
+
+
+def test_errors_keep_the_worker(pool):
+    pids = {pool.run(_pid), pool.run(_pid)}
+
+    assert pool.run(_fail) is None
+    assert pool.run(_pid) in pids
+
+
+@pytest.mark.parametrize(
+    "func, args, reason",
+    [(_pid, (30,), "timed out"), (_crash, (), "died"), (_allocate, (512,), "died")],
+)
+def test_lost_workers_are_replaced(func, args, reason):
+    before = EXTRACTION_FAILURES.value(reason=reason)
+
+    with ExtractionPool(workers=1, timeout=2, memory_mb=256) as pool:
+        start = time.monotonic()
+        assert pool.run(func, *args) is None
+        assert time.monotonic() - start < 10
+
+        # A new worker takes over
+        assert pool.run(_allocate, 64) == 64 * 1024 * 1024
+
+    assert EXTRACTION_FAILURES.value(reason=reason) == before + 1
+
+
+def test_extract_first_image_in_workers(tmp_path, monkeypatch):
+    monkeypatch.setattr(extract_image, "EXTRACTION_WORKERS", 1)
+    monkeypatch.setattr(extract_image, "_POOL", None)
+
+    try:
+        image = extract_image.extract_first_image(
+            "three",
+            str(RESOURCES / "compressed-2101.00027v1.pdf"),
+            workspace=str(tmp_path),
+        )
+    finally:
+        extract_image._POOL.close()
+
+    assert image == str(tmp_path / "three_image1.jpg")
+    with Image.open(image) as new, Image.open(RESOURCES / "three_image1.jpg") as ref:
+        assert np.array_equal(np.asarray(new), np.asarray(ref))
+
+
+def test_failed_extractions_are_not_cached(tmp_path, monkeypatch):
+    monkeypatch.setattr(extract_image, "EXTRACTION_WORKERS", 1)
+    monkeypatch.setattr(extract_image, "EXTRACTION_TIMEOUT", 0.1)
+    monkeypatch.setattr(extract_image, "_POOL", None)
+    monkeypatch.setattr(extract_image, "_IMAGE_CACHE", {})
+    monkeypatch.setattr(
+        extract_image,
+        "_get_pdf",
+        lambda arxiv_id: str(RESOURCES / "compressed-2101.00027v1.pdf"),
+    )
+    monkeypatch.setattr(extract_image, "_extract_first_image_from_pdf", _hang)
+
+    try:
+        assert (
+            extract_image.extract_first_image("three", workspace=str(tmp_path)) is None
+        )
+    finally:
+        extract_image._POOL.close()
+
+    assert "three" not in extract_image._IMAGE_CACHE
+
+
+def test_workers_track_memory_if_enabled():
+    with ExtractionPool(workers=1, timeout=5) as pool:
+        assert pool.run(_memory_tracking) == (False, memory.budget_mb())
+
+    memory.enable(budget_mb=123)
+    try:
+        with ExtractionPool(workers=1, timeout=5) as pool:
+            assert pool.run(_memory_tracking) == (True, 123)
+    finally:
+        memory.disable()
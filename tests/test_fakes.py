@@ -0,0 +1,87 @@
+import pytest
+import requests
+
+from arxiv_sanity_bot.fakes.corpus import SyntheticCorpus
+from arxiv_sanity_bot.fakes.firestore import FakeFirestoreClient
+from arxiv_sanity_bot.fakes.server import FakeServices, ServiceBehavior
+from arxiv_sanity_bot.http_session import redirect
+from arxiv_sanity_bot.store.store import DocumentStore
+
+
+@pytest.fixture
+def services():
+    services = FakeServices(SyntheticCorpus(500))
+    services.start()
+    yield services
+    services.stop()
+
+
+def test_alphaxiv_feed_is_sorted_by_votes(services):
+    response = requests.get(
+        f"{services.base_url}/alphaxiv/papers/v3/feed",
+        params={"pageNum": "1", "pageSize": "100"},
+    )
+    papers = response.json()["papers"]
+
+    assert len(papers) == 100
+    votes = [p["metrics"]["public_total_votes"] for p in papers]
+    assert votes == sorted(votes, reverse=True)
+
+
+def test_arxiv_query_by_id(services):
+    response = requests.get(
+        f"{services.base_url}/arxiv/api/query", params={"id_list": "2600.00007"}
+    )
+
+    assert response.text.count("<entry>") == 1
+    assert f"{services.base_url}/arxiv/pdf/2600.00007v1" in response.text
+    assert requests.get(
+        f"{services.base_url}/arxiv/pdf/2600.00007v1"
+    ).content.startswith(b"%PDF")
+
+
+def test_document_store_uses_fake_firestore(services):
+    client = FakeFirestoreClient(
+        services.environment()["ARXIV_SANITY_BOT_FIRESTORE_URL"]
+    )
+
+    doc_store = DocumentStore(firebase_credentials={}, client=client)
+
+    assert "2600.00001" not in doc_store
+    doc_store["2600.00001"] = {"tweet_id": "1"}
+    assert "2600.00001" in doc_store
+    assert doc_store["2600.00001"] == {"tweet_id": "1"}
+    assert services.stats()["documents"] == 1
+
+
+def test_error_injection_and_rate_limit():
+    services = FakeServices(
+        SyntheticCorpus(10),
+        behaviors={
+            "hf": ServiceBehavior(error_rate=1.0),
+            "openai": ServiceBehavior(rate_limit=1),
+        },
+    )
+    services.start()
+    try:
+        assert (
+            requests.get(f"{services.base_url}/hf/api/daily_papers").status_code == 500
+        )
+
+        body = {"model": "m", "messages": [{"role": "user", "content": "x"}]}
+        url = f"{services.base_url}/openai/v1/chat/completions"
+        statuses = [requests.post(url, json=body).status_code for _ in range(3)]
+        assert statuses[0] == 200
+        assert 429 in statuses
+    finally:
+        services.stop()
+
+
+def test_redirect(services):
+    session = requests.Session()
+    redirect(session, ["https://api.twitter.com"], f"{services.base_url}/twitter")
+
+    response = session.post("https://api.twitter.com/2/tweets", json={"text": "hi"})
+
+    assert response.json()["data"]["text"] == "hi"
+    assert services.stats()["tweets"] == 1
@@ -0,0 +1,83 @@
+from pathlib import Path
+
+import fitz  # type: ignore
+import pypdf
+from PIL import Image
+
+from arxiv_sanity_bot.arxiv import extract_image
+from arxiv_sanity_bot.arxiv.decode_budget import paper_budget
+from arxiv_sanity_bot.arxiv.image_candidates import (
+    ImageCandidate,
+    pymupdf_candidates,
+    pypdf_candidates,
+    rank_candidates,
+)
+
+
+PDF = str(Path(__file__).parent / "resources" / "compressed-2101.00027v1.pdf")
+
+
+def _candidate(key, width=400, height=300, length=10_000, filters=(), bits=8):
+    return ImageCandidate(key, width, height, length, filters, bits, stencil=False)
+
+
+def test_both_libraries_see_the_same_images():
+    with fitz.open(PDF) as doc:
+        pymupdf = [
+            [(c.width, c.height, c.length) for c in pymupdf_candidates(doc, page)]
+            for page in doc
+        ]
+
+    reader = pypdf.PdfReader(PDF)
+    pypdf_ = [
+        [(c.width, c.height, c.length) for c in pypdf_candidates(page)]
+        for page in reader.pages
+    ]
+
+    assert pymupdf == pypdf_
+    # Without the soft masks
+    assert pymupdf[1] == [(453, 280, 17511)]
+
+
+def test_rank_candidates():
+    candidates = [
+        _candidate("tiny", length=500),
+        _candidate("strip", width=1000, height=100),
+        _candidate("small", width=100, height=100),
+        _candidate("bomb", width=100_000, height=100_000),
+        _candidate("scan", filters=("/JBIG2Decode",)),
+        _candidate("mask", bits=1),
+        _candidate("photo", filters=("/DCTDecode",)),
+        # Downsized to 500 x 166
+        _candidate("large", width=3000, height=1000),
+    ]
+
+    ranked = rank_candidates(candidates, max_size=500)
+
+    assert [c.key for c in ranked] == ["photo", "large", "scan", "mask"]
+
+
+def test_rank_candidates_without_pixel_limit(monkeypatch):
+    monkeypatch.setattr(Image, "MAX_IMAGE_PIXELS", None)
+
+    ranked = rank_candidates(
+        [_candidate("bomb", width=100_000, height=100_000)], max_size=500
+    )
+
+    assert [c.key for c in ranked] == ["bomb"]
+
+
+def test_only_candidates_are_decoded(monkeypatch):
+    decoded = []
+    decode = extract_image._decode
+
+    def _decode(arxiv_id, data):
+        decoded.append(len(data))
+        return decode(arxiv_id, data)
+
+    monkeypatch.setattr(extract_image, "_decode", _decode)
+
+    image = extract_image._find_first_image_or_graph("three", PDF, paper_budget())
+
+    assert image.size == (453, 280)
+    assert len(decoded) == 1
@@ -1,9 +1,10 @@
 from pathlib import Path
 
+import numpy as np
 from PIL import Image
 
 from arxiv_sanity_bot.arxiv import image_validation
-from arxiv_sanity_bot.arxiv.image_validation import is_uploadable
+from arxiv_sanity_bot.arxiv.image_validation import has_image_content, is_uploadable
 
 
 def _make_image(path: Path, size: tuple[int, int]) -> str:
@@ -54,3 +55,29 @@ def test_is_uploadable_returns_false_on_unreadable_file(tmp_path):
     p = tmp_path / "garbage.jpg"
     p.write_bytes(b"not an image at all")
     assert not is_uploadable(str(p))
+
+
+def test_is_uploadable_accepts_bytes(tmp_path):
+    p = _make_image(tmp_path / "ok.jpg", (300, 300))
+    data = Path(p).read_bytes()
+
+    assert is_uploadable(data)
+    assert not is_uploadable(b"not an image at all")
+
+
+def test_has_image_content_samples_large_images(monkeypatch):
+    monkeypatch.setattr(image_validation, "VALIDATION_MAX_PIXELS", 10_000)
+    rng = np.random.default_rng(0)
+
+    blank = Image.new("L", (1000, 800), color=255)
+    assert not has_image_content(blank)
+
+    # Thin lines, like a plot: the sample keeps their contrast (averaging
+    # blocks of pixels would blur them)
+    pixels = np.full((800, 1000), 255, dtype=np.uint8)
+    pixels[rng.integers(0, 800, 100), :] = 0
+    pixels[:, rng.integers(0, 1000, 100)] = 0
+    lines = Image.fromarray(pixels)
+    std = np.std(pixels)
+    assert has_image_content(lines, min_std=0.8 * std)
+    assert not has_image_content(lines, min_std=1.25 * std)
@@ -0,0 +1,149 @@
+import os
+from unittest.mock import patch
+
+import pytest
+
+from arxiv_sanity_bot.jobs.queue import EXTRACT, SUMMARIZE, JobQueue
+from arxiv_sanity_bot.jobs.workers import publish_ready_batches, run_worker
+
+
+@pytest.fixture
+def queue_path(tmp_path):
+    return str(tmp_path / "jobs.sqlite")
+
+
+@pytest.fixture
+def papers():
+    return [
+        {
+            "arxiv": f"2501.0000{i}",
+            "title": f"Paper {i}",
+            "abstract": f"Abstract {i}",
+            "score": 2,
+            "published_on": "2025-01-01",
+        }
+        for i in range(3)
+    ]
+
+
+def _summarize(job):
+    return {"summary": f"Summary of {job.arxiv_id}", "url": job.arxiv_id}, None
+
+
+def _extract(job):
+    return {"image": f"{job.arxiv_id}_image1.jpg"}, b"jpeg bytes"
+
+
+def test_claim_is_exclusive_across_connections(queue_path, papers):
+    q1 = JobQueue(queue_path)
+    q2 = JobQueue(queue_path)
+    q1.enqueue_batch(10, papers)
+
+    claimed = []
+    while (job := (q1 if len(claimed) % 2 else q2).claim(SUMMARIZE)) is not None:
+        claimed.append(job.arxiv_id)
+
+    assert sorted(claimed) == [p["arxiv"] for p in papers]
+
+
+def test_failed_jobs_are_retried_then_given_up(queue_path, papers):
+    queue = JobQueue(queue_path, max_attempts=2)
+    queue.enqueue_batch(10, papers[:1])
+
+    job = queue.claim(SUMMARIZE)
+    queue.fail(job, "boom")
+
+    job = queue.claim(SUMMARIZE)
+    assert job.attempts == 2
+    queue.fail(job, "boom")
+
+    assert queue.claim(SUMMARIZE) is None
+    assert queue.counts()[SUMMARIZE] == {"failed": 1}
+
+
+def test_expired_lease_is_reclaimed(queue_path, papers):
+    queue = JobQueue(queue_path, lease=-1)
+    queue.enqueue_batch(10, papers[:1])
+
+    first = queue.claim(SUMMARIZE)
+    second = queue.claim(SUMMARIZE)
+
+    assert first.id == second.id
+    assert second.attempts == 2
+
+
+def test_pipeline_publishes_each_batch_once(queue_path, papers, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    queue = JobQueue(queue_path)
+    queue.enqueue_batch(10, papers)
+
+    published = []
+
+    def _publish(n_retrieved, summaries):
+        published.append((n_retrieved, summaries))
+
+    # Nothing is ready until both stages are drained
+    run_worker(queue, SUMMARIZE, _summarize, exit_when_idle=True)
+    assert publish_ready_batches(queue, _publish) == 0
+
+    def _extract_or_fail(job):
+        if job.arxiv_id == "2501.00001":
+            raise RuntimeError("bad pdf")
+        return _extract(job)
+
+    with patch("arxiv_sanity_bot.jobs.workers.time.sleep"):
+        while run_worker(queue, EXTRACT, _extract_or_fail, exit_when_idle=True):
+            pass
+
+    assert publish_ready_batches(queue, _publish) == 1
+    assert publish_ready_batches(queue, _publish) == 0
+
+    assert len(published) == 1
+    n_retrieved, summaries = published[0]
+    assert n_retrieved == 10
+    assert [s["arxiv"] for s in summaries] == [p["arxiv"] for p in papers]
+    assert summaries[0]["tweet"] == "Summary of 2501.00000"
+    # Written into the image workspace of the publisher
+    assert os.path.basename(summaries[0]["image"]) == "2501.00000_image1.jpg"
+    with open(summaries[0]["image"], "rb") as f:
+        assert f.read() == b"jpeg bytes"
+    # The failed extraction degrades to a tweet without image
+    assert summaries[1]["image"] is None
+
+
+def test_papers_already_queued_are_not_enqueued_again(queue_path, papers):
+    queue = JobQueue(queue_path)
+    first = queue.enqueue_batch(10, papers[:2])
+
+    # Overlapping fetch, while the first batch is pending
+    second = queue.enqueue_batch(10, papers)
+    assert queue.enqueue_batch(10, papers) is None
+
+    results = {}
+    for batch_id in (first, second):
+        for stage in (SUMMARIZE, EXTRACT):
+            run_worker(
+                queue,
+                stage,
+                {SUMMARIZE: _summarize, EXTRACT: _extract}[stage],
+                exit_when_idle=True,
+            )
+        results[batch_id] = [p["arxiv"] for p, *_ in queue.batch_results(batch_id)]
+
+    assert results == {first: ["2501.00000", "2501.00001"], second: ["2501.00002"]}
+
+    # Still skipped once published
+    publish_ready_batches(queue, lambda n_retrieved, summaries: None)
+    assert queue.enqueue_batch(10, papers) is None
+
+
+def test_papers_not_summarized_can_be_enqueued_again(queue_path, papers):
+    queue = JobQueue(queue_path, max_attempts=1)
+    queue.enqueue_batch(10, papers[:1])
+
+    queue.fail(queue.claim(SUMMARIZE), "boom")
+    run_worker(queue, EXTRACT, _extract, exit_when_idle=True)
+    assert publish_ready_batches(queue, lambda n_retrieved, summaries: None) == 1
+
+    assert queue.enqueue_batch(10, papers[:1]) is not None
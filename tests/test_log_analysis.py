@@ -0,0 +1,203 @@
+import gzip
+import io
+import json
+import logging
+
+import pytest
+from tenacity import retry, stop_after_attempt, wait_none
+
+from arxiv_sanity_bot.logger import JSONFormatter
+from arxiv_sanity_bot.telemetry.log_analysis import (
+    analyze,
+    format_report,
+    iter_records,
+)
+from arxiv_sanity_bot.telemetry.metrics import count_retries, timed
+from arxiv_sanity_bot.telemetry.tracing import span
+
+
+@pytest.fixture
+def log_file(tmp_path):
+    """Log of the package written to a file, as in production"""
+    path = tmp_path / "arxiv-sanity-bot.log"
+    handler = logging.FileHandler(path)
+    handler.setFormatter(JSONFormatter())
+
+    root = logging.getLogger("arxiv_sanity_bot")
+    level = root.level
+    root.addHandler(handler)
+    root.setLevel(logging.DEBUG)
+    yield path
+    root.removeHandler(handler)
+    root.setLevel(level)
+    handler.close()
+
+
+def _run(n_papers):
+    attempts = []
+
+    @retry(
+        stop=stop_after_attempt(2),
+        wait=wait_none(),
+        before_sleep=count_retries("openai"),
+    )
+    @timed("openai", "https://api.openai.com/v1")
+    def call_openai():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("Rate limited")
+
+    with span("run"):
+        with span("fetch"):
+            pass
+        with span("summarize"):
+            for i in range(n_papers):
+                with span("paper", arxiv_id=f"2501.{i:05d}"):
+                    call_openai()
+                    attempts.clear()
+
+
+def test_iter_records():
+    log = io.StringIO(
+        "Some CI output\n"
+        + json.dumps({"msg": "pretty", "context": {"a": {"b": 1}}}, indent=2)
+        + "\n"
+        + json.dumps({"msg": "compact"})
+        + "\n"
+        + "{\n"
+        + '  "msg": "truncated",\n'
+    )
+
+    records = list(iter_records(log))
+
+    assert records[0]["context"]["a"] == {"b": 1}
+    assert records[1]["msg"] == "compact"
+    # Truncated records are reported as None
+    assert records[2] is None
+
+
+# A run as logged before the spans (by the formatter of the time, which had no
+# trace ids), with the seconds since 12:00:00 at which each message is logged
+LEGACY_RUN = (
+    (0, "Bot starting"),
+    (0, "Considering time interval 2025-01-01 to 2025-01-02 UTC"),
+    (30, "Found 2 abstracts in the time window above score 0"),
+    (31, "Checking if paper 2501.00001 has been posted before"),
+    (32, "Checking if paper 2501.00002 has been posted before"),
+    (33, "Selected 2 papers to summarize"),
+    (33, "Paper 1: 2501.00001"),
+    (34, "Paper 2: 2501.00002"),
+    (40, "Processed abstract for https://arxiv.org/abs/2501.00001"),
+    (41, "Downloading paper 2501.00001"),
+    (50, "Bitmap image saved in 2501.00001_first_image.jpg"),
+    (54, "Processed abstract for https://arxiv.org/abs/2501.00002"),
+    (55, "Downloading paper 2501.00002"),
+    (70, "NO IMAGE NOR GRAPH FOUND"),
+    (70, "Sending summary tweet"),
+    (90, "Waiting for 20 seconds before sending next tweet"),
+    (100, "Bot finishing"),
+)
+
+
+def _legacy_log(day="2025-01-01", ci=False):
+    lines = []
+    for seconds, msg in LEGACY_RUN:
+        record = {
+            "timestamp": f"{day} 12:{seconds // 60:02d}:{seconds % 60:02d},000",
+            "level": "INFO",
+            "module": "arxiv_sanity_bot",
+            "function": "bot",
+            "line": 1,
+            "file": "arxiv_sanity_bot.py",
+            "msg": msg,
+        }
+        for line in json.dumps(record, indent=2).splitlines():
+            # GitHub Actions puts a timestamp in front of every line
+            prefix = f"{day}T12:00:{seconds % 60:02d}.1234567Z " if ci else ""
+            lines.append(prefix + line + "\n")
+
+    return "".join(lines)
+
+
+def test_iter_records_of_ci_logs():
+    log = io.StringIO(
+        "2025-01-01T12:00:00.0000000Z ##[group]Run arxiv-sanity-bot bot\n"
+        + _legacy_log(ci=True)
+    )
+
+    records = list(iter_records(log))
+
+    assert len(records) == len(LEGACY_RUN)
+    assert records[0]["msg"] == "Bot starting"
+
+
+@pytest.mark.parametrize("ci", [False, True])
+def test_analyze_logs_without_spans(tmp_path, ci):
+    path = tmp_path / "arxiv-sanity-bot.log"
+    # A second run, which stopped early (no "Bot finishing")
+    path.write_text(
+        _legacy_log(ci=ci)
+        + "\n".join(_legacy_log(day="2025-01-02", ci=ci).splitlines()[:27])
+        + "\n"
+    )
+
+    report = analyze([str(path)])
+
+    assert report.n_invalid == 0
+    assert report.n_runs == 2
+    assert report.stages["run"].max == 100
+    assert report.stages["fetch"].count == 2
+    assert report.stages["fetch"].max == 31
+    assert report.stages["summarize"].max == 37
+    assert report.stages["publish"].max == 30
+
+    # Each paper from the record before "Processed abstract for" (its
+    # summary) to the one before the next paper (its image extraction)
+    assert report.papers.count == 2
+    assert report.slowest_papers == [
+        {
+            "arxiv_id": "2501.00002",
+            "seconds": 20.0,
+            "timestamp": "2025-01-01 12:00:50,000",
+        },
+        {
+            "arxiv_id": "2501.00001",
+            "seconds": 16.0,
+            "timestamp": "2025-01-01 12:00:34,000",
+        },
+    ]
+
+    assert set(report.daily) == {"2025-01-01", "2025-01-02"}
+
+
+def test_analyze(log_file, tmp_path):
+    _run(3)
+    _run(2)
+
+    # Logs can be gzipped
+    gzipped = tmp_path / "old.log.gz"
+    with gzip.open(gzipped, "wt") as f:
+        f.write(log_file.read_text())
+
+    report = analyze([str(log_file), str(gzipped)], n_slowest=2)
+
+    assert report.n_invalid == 0
+    assert report.n_runs == 2
+    assert set(report.stages) == {"run", "fetch", "summarize"}
+    assert report.stages["run"].count == 4
+
+    # Every attempt of the calls, failed or not
+    assert report.hosts["api.openai.com"].count == 2 * (3 + 2) * 2
+    assert report.host_calls == {"api.openai.com": {"openai": 20}}
+    assert report.retries == {"openai": 10}
+    assert report.errors == {"openai": 10}
+
+    assert report.papers.count == 10
+    assert len(report.slowest_papers) == 2
+    assert report.slowest_papers[0]["seconds"] == report.papers.max
+
+    assert list(report.daily.values())[0].keys() == report.stages.keys()
+
+    text = format_report(report)
+    assert "api.openai.com" in text
+    assert "openai: 10 / 10" in text
@@ -0,0 +1,33 @@
+import pytest
+
+from arxiv_sanity_bot.lru import LRUCache
+
+
+def test_least_recently_used_entries_are_evicted():
+    evicted = []
+    cache = LRUCache(2, on_evict=lambda key, value: evicted.append((key, value)))
+
+    cache["a"] = 1
+    cache["b"] = 2
+    # "a" becomes the most recently used
+    assert cache["a"] == 1
+    cache["c"] = 3
+
+    assert evicted == [("b", 2)]
+    assert "b" not in cache
+    assert cache.get("b") is None
+    assert len(cache) == 2
+
+    cache["a"] = 4
+    cache["d"] = 5
+
+    assert evicted == [("b", 2), ("c", 3)]
+    assert cache.get("a") == 4
+
+
+def test_missing_keys():
+    cache: LRUCache[str, int] = LRUCache(1)
+
+    with pytest.raises(KeyError):
+        cache["missing"]
+    assert cache.get("missing", 0) == 0
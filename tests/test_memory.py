@@ -0,0 +1,55 @@
+from unittest import mock
+
+import pytest
+
+from arxiv_sanity_bot.telemetry import memory
+from arxiv_sanity_bot.telemetry.memory import track_memory
+
+
+@pytest.fixture
+def logger(monkeypatch):
+    logger = mock.Mock()
+    monkeypatch.setattr(memory, "logger", logger)
+    yield logger
+    memory.disable()
+
+
+def test_disabled_by_default(logger):
+    with track_memory("fetch"):
+        pass
+
+    logger.info.assert_not_called()
+
+
+def test_nested_scopes(logger):
+    memory.enable(budget_mb=100_000)
+
+    with track_memory("summarize"):
+        with track_memory("paper", arxiv_id="2501.00001"):
+            data = bytearray(20 * 1024 * 1024)
+            # Still allocated when the scope ends
+            data[-1] = 1
+
+    (paper_call, stage_call) = logger.info.call_args_list
+    paper = paper_call.kwargs["extra"]
+    stage = stage_call.kwargs["extra"]
+
+    assert paper["stage"] == "paper"
+    assert paper["arxiv_id"] == "2501.00001"
+    assert paper["peak_traced_mb"] >= 20
+    assert "test_memory.py" in paper["top_allocations"][0]
+
+    # The peak of the stage includes the peak of the paper
+    assert stage["stage"] == "summarize"
+    assert stage["peak_traced_mb"] >= paper["peak_traced_mb"]
+    assert stage["peak_rss_mb"] >= paper["peak_rss_mb"]
+
+
+def test_budget_exceeded(logger):
+    memory.enable(budget_mb=1)
+
+    with track_memory("extract_image", arxiv_id="2501.00001"):
+        pass
+
+    logger.warning.assert_called_once()
+    assert logger.warning.call_args.kwargs["extra"]["budget_mb"] == 1
@@ -0,0 +1,80 @@
+import pytest
+from tenacity import retry, stop_after_attempt, wait_none
+
+from arxiv_sanity_bot.telemetry.metrics import (
+    Counter,
+    Histogram,
+    Registry,
+    count_retries,
+    timed,
+    EXTERNAL_CALL_ERRORS,
+    EXTERNAL_CALL_SECONDS,
+    RETRIES,
+)
+
+
+def test_render():
+    registry = Registry()
+    counter = registry.register(Counter("papers", "Papers fetched", ("source",)))
+    histogram = registry.register(
+        Histogram("latency_seconds", "Latency", ("call",), buckets=(0.1, 1))
+    )
+
+    counter.inc(3, source="hf")
+    counter.inc(source="hf")
+    histogram.observe(0.1, call="openai")
+    histogram.observe(0.5, call="openai")
+    histogram.observe(5, call="openai")
+
+    assert registry.render().splitlines() == [
+        "# HELP papers Papers fetched",
+        "# TYPE papers counter",
+        'papers_total{source="hf"} 4',
+        "# HELP latency_seconds Latency",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{call="openai",le="0.1"} 1',
+        'latency_seconds_bucket{call="openai",le="1"} 2',
+        'latency_seconds_bucket{call="openai",le="+Inf"} 3',
+        'latency_seconds_count{call="openai"} 3',
+        'latency_seconds_sum{call="openai"} 5.6',
+        "# EOF",
+    ]
+
+
+def test_labels_are_checked():
+    counter = Counter("papers", "Papers fetched", ("source",))
+
+    with pytest.raises(ValueError):
+        counter.inc(other="x")
+
+
+def test_write(tmp_path):
+    registry = Registry()
+    registry.register(Counter("tweets", "Tweets")).inc()
+
+    path = tmp_path / "metrics.prom"
+    registry.write(str(path))
+
+    assert "tweets_total 1" in path.read_text()
+
+
+def test_timed_and_count_retries():
+    attempts = []
+
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_none(),
+        before_sleep=count_retries("test_call"),
+        reraise=True,
+    )
+    @timed("test_call")
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise RuntimeError("boom")
+        return "ok"
+
+    assert flaky() == "ok"
+    assert RETRIES.value(call="test_call") == 2
+    assert EXTERNAL_CALL_ERRORS.value(call="test_call") == 2
+    assert EXTERNAL_CALL_SECONDS.count(call="test_call") == 3
@@ -4,6 +4,7 @@ import pytest
 
 from arxiv_sanity_bot.models.openai import OpenAI
 from arxiv_sanity_bot.logger import FatalError
+from arxiv_sanity_bot.telemetry.metrics import RETRIES
 
 
 def test_summarize_abstract():
@@ -37,3 +38,46 @@ def test_summarize_abstract():
         openai_model = OpenAI()
         with pytest.raises(FatalError):
             openai_model.summarize_abstract(abstract)
+
+
+def test_summarize_abstract_is_cached():
+    mock_completion = Mock()
+    mock_completion.choices = [Mock()]
+    mock_completion.choices[0].message.content = "A summary."
+
+    with patch("openai.OpenAI") as mock_openai:
+        mock_client = Mock()
+        mock_client.chat.completions.create.return_value = mock_completion
+        mock_openai.return_value = mock_client
+
+        openai_model = OpenAI()
+        assert openai_model.summarize_abstract("An abstract.") == "A summary."
+        assert openai_model.summarize_abstract("An abstract.") == "A summary."
+
+        assert mock_client.chat.completions.create.call_count == 1
+
+
+def test_retries_are_counted_and_logged():
+    mock_completion = Mock()
+    mock_completion.choices = [Mock()]
+    mock_completion.choices[0].message.content = "A summary."
+
+    with (
+        patch("openai.OpenAI") as mock_openai,
+        patch("arxiv_sanity_bot.models.openai.time.sleep"),
+        patch("arxiv_sanity_bot.telemetry.metrics.logger") as logger,
+    ):
+        mock_client = Mock()
+        mock_client.chat.completions.create.side_effect = [
+            RuntimeError("boom"),
+            mock_completion,
+        ]
+        mock_openai.return_value = mock_client
+        retries = RETRIES.value(call="openai")
+
+        assert OpenAI().summarize_abstract("An abstract.") == "A summary."
+
+    assert RETRIES.value(call="openai") == retries + 1
+    logger.info.assert_called_once_with(
+        "Retrying openai", extra={"call": "openai", "attempt": 1}
+    )
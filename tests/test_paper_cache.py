@@ -0,0 +1,132 @@
+import os
+import shutil
+import time
+from pathlib import Path
+
+import pytest
+
+from arxiv_sanity_bot.arxiv import extract_image
+from arxiv_sanity_bot.arxiv.paper_cache import PaperCache
+
+
+RESOURCES = Path(__file__).parent / "resources"
+
+
+def _copy(resource, tmp_path):
+    path = tmp_path / resource
+    shutil.copyfile(RESOURCES / resource, path)
+    return str(path)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = PaperCache(str(tmp_path / "cache"), max_bytes=10_000_000, max_age=3600)
+    yield cache
+    cache.close()
+
+
+def test_pdfs_are_cached_by_id_and_version(cache, tmp_path):
+    pdf = _copy("compressed-2101.00027v1.pdf", tmp_path)
+
+    cached = cache.put_pdf("2101.00027v1", pdf)
+
+    assert not os.path.exists(pdf)
+    assert (
+        Path(cached).read_bytes()
+        == (RESOURCES / "compressed-2101.00027v1.pdf").read_bytes()
+    )
+    assert cache.get_pdf("2101.00027v1") == cached
+    assert cache.get_pdf("2101.00027v2") is None
+    assert cache.get_pdf("2101.00027") is None
+
+
+def test_unversioned_pdfs_expire(tmp_path):
+    cache = PaperCache(str(tmp_path / "cache"), max_bytes=10_000_000, max_age=0.1)
+    pdf = _copy("compressed-2101.00027v1.pdf", tmp_path)
+
+    cached = cache.put_pdf("2101.00027", pdf)
+    assert cache.get_pdf("2101.00027") == cached
+
+    time.sleep(0.2)
+    assert cache.get_pdf("2101.00027") is None
+
+
+def test_same_content_is_stored_once(cache, tmp_path):
+    first = cache.put_pdf("2101.00027", _copy("compressed-2101.00027v1.pdf", tmp_path))
+    second = cache.put_pdf(
+        "2101.00027v1", _copy("compressed-2101.00027v1.pdf", tmp_path)
+    )
+
+    assert first == second
+
+
+def test_extractions_are_cached_by_pdf_content(cache, tmp_path):
+    with_image = cache.put_pdf("1", _copy("compressed-2101.00027v1.pdf", tmp_path))
+    without_image = _copy("compressed-2304.09167v1.pdf", tmp_path)
+
+    assert cache.get_image(with_image, "pymupdf") == (False, None)
+
+    cache.put_image(with_image, "pymupdf", str(RESOURCES / "three_image1.jpg"))
+    cache.put_image(without_image, "pymupdf", None)
+
+    cached, image = cache.get_image(with_image, "pymupdf")
+    assert cached
+    assert Path(image).read_bytes() == (RESOURCES / "three_image1.jpg").read_bytes()
+    assert cache.get_image(without_image, "pymupdf") == (True, None)
+    assert cache.get_image(with_image, "pypdf") == (False, None)
+
+
+def test_least_recently_used_files_are_evicted(tmp_path):
+    size = os.path.getsize(RESOURCES / "compressed-2101.00027v1.pdf")
+    cache = PaperCache(str(tmp_path / "cache"), max_bytes=2 * size, max_age=3600)
+
+    first = cache.put_pdf("1", _copy("compressed-2101.00027v1.pdf", tmp_path))
+    cache.put_image(first, "pymupdf", str(RESOURCES / "three_image1.jpg"))
+    second = cache.put_pdf("2", _copy("compressed-2304.09116v1.pdf", tmp_path))
+    # The first PDF becomes the most recently used
+    time.sleep(0.01)
+    assert cache.get_pdf("1") == first
+
+    cache.put_pdf("3", _copy("compressed-2304.09167v1.pdf", tmp_path))
+
+    assert cache.get_pdf("1") == first
+    assert cache.get_pdf("2") is None
+    assert not os.path.exists(second)
+    # Evicted as well, being older than the second PDF
+    assert cache.get_image(first, "pymupdf") == (False, None)
+
+
+def test_extract_first_image_uses_the_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(extract_image, "PAPER_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(extract_image, "_IMAGE_CACHE", {})
+    monkeypatch.setattr(extract_image, "_PDF_CACHE", {})
+    downloads = []
+    extractions = []
+
+    def _download_pdf(url, path):
+        downloads.append(url)
+        shutil.copyfile(RESOURCES / "compressed-2101.00027v1.pdf", path)
+        return path
+
+    def _extract(arxiv_id, pdf_path, workspace):
+        extractions.append(arxiv_id)
+        return extract_first_image_from_pdf(arxiv_id, pdf_path, workspace)
+
+    extract_first_image_from_pdf = extract_image._extract_first_image_from_pdf
+    monkeypatch.setattr(extract_image, "download_pdf", _download_pdf)
+    monkeypatch.setattr(extract_image, "_extract_first_image_from_pdf", _extract)
+
+    first = extract_image.extract_first_image("2101.00027", workspace=str(tmp_path))
+    os.remove(first)
+
+    # A new run
+    extract_image._PAPER_CACHE.close()
+    monkeypatch.setattr(extract_image, "_PAPER_CACHE", None)
+    monkeypatch.setattr(extract_image, "_IMAGE_CACHE", {})
+    monkeypatch.setattr(extract_image, "_PDF_CACHE", {})
+    second = extract_image.extract_first_image("2101.00027", workspace=str(tmp_path))
+
+    assert len(downloads) == 1
+    assert extractions == ["2101.00027"]
+    assert second == first
+    assert Path(second).read_bytes() == (RESOURCES / "three_image1.jpg").read_bytes()
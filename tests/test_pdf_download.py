@@ -0,0 +1,167 @@
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+import requests
+
+from arxiv_sanity_bot.arxiv import extract_image
+from arxiv_sanity_bot.arxiv.pdf_download import DownloadError, download_pdf
+from arxiv_sanity_bot.lru import LRUCache
+
+
+RESOURCES = Path(__file__).parent / "resources"
+PDF = (RESOURCES / "compressed-2101.00027v1.pdf").read_bytes()
+
+
+class _Server:
+    """A PDF server that can cut transfers short and ignore ranges."""
+
+    def __init__(self):
+        self.body = PDF
+        self.truncate_at = None
+        self.honor_ranges = True
+        self.requests = []
+
+        server = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests.append((self.path, self.headers.get("Range")))
+                if not self.path.startswith("/pdf/2101.00027"):
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+                start = 0
+                range_header = self.headers.get("Range")
+                if range_header and server.honor_ranges:
+                    start = int(range_header.split("=")[1].rstrip("-"))
+                    self.send_response(206)
+                    self.send_header(
+                        "Content-Range",
+                        f"bytes {start}-{len(server.body) - 1}/{len(server.body)}",
+                    )
+                else:
+                    self.send_response(200)
+
+                body = server.body[start:]
+                self.send_header("Content-Type", "application/pdf")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+
+                if server.truncate_at is not None:
+                    body = body[: server.truncate_at]
+                    server.truncate_at = None
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.url = f"http://127.0.0.1:{self._httpd.server_port}/pdf"
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+@pytest.fixture
+def server():
+    server = _Server()
+    yield server
+    server.stop()
+
+
+def test_download(server, tmp_path):
+    path = download_pdf(f"{server.url}/2101.00027", str(tmp_path / "paper.pdf"))
+
+    assert Path(path).read_bytes() == PDF
+    assert not os.path.exists(path + ".part")
+
+
+def test_interrupted_download_is_resumed(server, tmp_path):
+    path = str(tmp_path / "paper.pdf")
+    server.truncate_at = len(PDF) // 2
+
+    with pytest.raises((DownloadError, requests.RequestException)):
+        download_pdf(f"{server.url}/2101.00027", path)
+    received = os.path.getsize(path + ".part")
+    assert 0 < received < len(PDF)
+    assert not os.path.exists(path)
+
+    download_pdf(f"{server.url}/2101.00027", path)
+
+    assert Path(path).read_bytes() == PDF
+    assert server.requests[-1][1] == f"bytes={received}-"
+
+
+def test_download_restarts_if_ranges_are_ignored(server, tmp_path):
+    path = str(tmp_path / "paper.pdf")
+    Path(path + ".part").write_bytes(b"garbage")
+    server.honor_ranges = False
+
+    download_pdf(f"{server.url}/2101.00027", path)
+
+    assert Path(path).read_bytes() == PDF
+
+
+def test_not_a_pdf_is_rejected(server, tmp_path):
+    path = str(tmp_path / "paper.pdf")
+    server.body = b"<html>Rate limited</html>"
+
+    with pytest.raises(DownloadError):
+        download_pdf(f"{server.url}/2101.00027", path)
+
+    assert not os.path.exists(path)
+    assert not os.path.exists(path + ".part")
+
+
+def test_download_paper_resolves_the_version_only_if_needed(
+    server, tmp_path, monkeypatch
+):
+    monkeypatch.setattr(extract_image, "ARXIV_PDF_URL", server.url)
+    monkeypatch.setattr(extract_image, "IMAGE_WORKSPACE_DIR", str(tmp_path))
+    monkeypatch.setattr(extract_image, "_DOWNLOADS", None)
+    resolved = []
+
+    def _resolve_version(arxiv_id):
+        resolved.append(arxiv_id)
+        return "2101.00027v1"
+
+    monkeypatch.setattr(extract_image, "_resolve_version", _resolve_version)
+
+    assert Path(extract_image.download_paper("2101.00027")).read_bytes() == PDF
+    assert resolved == []
+
+    assert Path(extract_image.download_paper("2101.99999")).read_bytes() == PDF
+    assert resolved == ["2101.99999"]
+
+
+def test_evicted_downloads_are_removed(server, tmp_path, monkeypatch):
+    monkeypatch.setattr(extract_image, "ARXIV_PDF_URL", server.url)
+    monkeypatch.setattr(extract_image, "IMAGE_WORKSPACE_DIR", str(tmp_path))
+    monkeypatch.setattr(extract_image, "_DOWNLOADS", None)
+    monkeypatch.setattr(
+        extract_image,
+        "_PDF_CACHE",
+        LRUCache(1, on_evict=lambda arxiv_id, path: extract_image._evict_pdf(path)),
+    )
+
+    first = extract_image._get_pdf("2101.00027")
+    assert extract_image._get_pdf("2101.00027") == first
+
+    second = extract_image._get_pdf("2101.00027v1")
+
+    assert not os.path.exists(first)
+    assert os.path.exists(second)
+
+    # PDFs elsewhere (the paper cache) are left to their owner
+    elsewhere = tmp_path / "paper.pdf"
+    elsewhere.write_bytes(PDF)
+    extract_image._evict_pdf(str(elsewhere))
+    assert elsewhere.exists()
@@ -0,0 +1,158 @@
+import json
+import types
+from datetime import datetime, timezone
+from unittest import mock
+
+import pandas as pd
+import pytest
+
+from arxiv_sanity_bot.arxiv import extract_image
+from arxiv_sanity_bot.cli import arxiv_sanity_bot as cli
+from arxiv_sanity_bot.lru import LRUCache
+from arxiv_sanity_bot.profiles import Profile, load_profiles
+
+
+@pytest.fixture
+def abstracts():
+    return pd.DataFrame(
+        [
+            {"arxiv": "1", "title": "Diffusion models", "abstract": "A", "score": 2},
+            {"arxiv": "2", "title": "Robots", "abstract": "Diffusion", "score": 1},
+            {"arxiv": "3", "title": "Transformers", "abstract": "B", "score": 2},
+        ]
+    )
+
+
+def test_select_applies_threshold(abstracts):
+    selected = Profile(name="strict", score_threshold=2).select(abstracts)
+
+    assert selected["arxiv"].tolist() == ["1", "3"]
+
+
+def test_select_applies_keywords(abstracts):
+    selected = Profile(name="diffusion", keywords=["DIFFUSION"]).select(abstracts)
+
+    assert selected["arxiv"].tolist() == ["1", "2"]
+
+
+def test_select_empty_dataframe():
+    assert Profile(name="any").select(pd.DataFrame()).shape[0] == 0
+
+
+def test_load_profiles(tmp_path):
+    path = tmp_path / "profiles.json"
+    path.write_text(
+        json.dumps(
+            [
+                {"name": "main"},
+                {
+                    "name": "robotics",
+                    "keywords": ["robot"],
+                    "firebase_collection": "robotics-papers",
+                    "twitter_env_prefix": "ROBOTICS_TWITTER",
+                },
+            ]
+        )
+    )
+
+    profiles = load_profiles(str(path))
+
+    assert [p.name for p in profiles] == ["main", "robotics"]
+    assert profiles[1].firebase_collection == "robotics-papers"
+
+
+def test_load_profiles_rejects_duplicated_names(tmp_path):
+    path = tmp_path / "profiles.json"
+    path.write_text(json.dumps([{"name": "main"}, {"name": "main"}]))
+
+    with pytest.raises(ValueError, match="Duplicated profile names"):
+        load_profiles(str(path))
+
+
+def test_run_bot_with_several_profiles(abstracts, monkeypatch, tmp_path):
+    abstracts["published_on"] = datetime(2025, 1, 31, tzinfo=timezone.utc)
+    get_all_abstracts = mock.Mock(return_value=(abstracts, 3))
+    source = types.SimpleNamespace(
+        get_all_abstracts=get_all_abstracts,
+        get_url=lambda arxiv_id: f"https://arxiv.org/abs/{arxiv_id}",
+    )
+    monkeypatch.setattr(cli, "_SOURCES", {cli.SOURCE: source})
+    gather_abstracts = mock.Mock(wraps=cli._gather_abstracts)
+    monkeypatch.setattr(cli, "_gather_abstracts", gather_abstracts)
+
+    stores = {}
+    monkeypatch.setattr(
+        cli, "_document_store", lambda collection: stores.setdefault(collection, {})
+    )
+
+    monkeypatch.setattr(extract_image, "_IMAGE_CACHE", LRUCache(10))
+    monkeypatch.setattr(extract_image, "_get_pdf", lambda arxiv_id: arxiv_id)
+    extracted = []
+
+    def extract(arxiv_id, pdf_path, workspace):
+        extracted.append(arxiv_id)
+        img_path = tmp_path / f"{arxiv_id}.jpg"
+        img_path.write_bytes(b"image")
+        return str(img_path)
+
+    monkeypatch.setattr(extract_image, "_extract_first_image_from_pdf", extract)
+
+    llm = mock.Mock()
+    llm.generate_bot_summary.return_value = "Summary tweet"
+    llm.summarize_abstract.side_effect = lambda abstract, instructions: (
+        f"{instructions} {abstract}"
+    )
+
+    posted = []
+
+    def sender(tweet, auth, img_path=None, in_reply_to_tweet_id=None):
+        posted.append((auth.consumer_key, tweet, img_path))
+        return f"https://x.com/{len(posted)}", len(posted)
+
+    monkeypatch.setattr(cli, "_tweet_sender", lambda dry: sender)
+    monkeypatch.setattr(cli, "PACING_SCALE", 0)
+    monkeypatch.setenv("STRICT_CONSUMER_KEY", "strict-key")
+    monkeypatch.setenv("DIFFUSION_CONSUMER_KEY", "diffusion-key")
+
+    profiles = [
+        Profile(
+            name="strict",
+            score_threshold=2,
+            summary_instructions="Strict:",
+            firebase_collection="strict-papers",
+            twitter_env_prefix="STRICT",
+        ),
+        Profile(
+            name="diffusion",
+            score_threshold=1,
+            keywords=["diffusion"],
+            summary_instructions="Diffusion:",
+            firebase_collection="diffusion-papers",
+            twitter_env_prefix="DIFFUSION",
+        ),
+    ]
+
+    cli.run_bot(48, 0, dry=True, profiles=profiles, llm=llm)
+
+    # Fetched once, with the loosest threshold
+    get_all_abstracts.assert_called_once()
+    gather_abstracts.assert_called_once_with(48, 0, score_threshold=1)
+
+    # Each profile posts its own selection, with its summary instructions,
+    # collection and credentials
+    assert set(stores["strict-papers"]) == {"1", "3"}
+    assert set(stores["diffusion-papers"]) == {"1", "2"}
+    # (without the summary tweets and the replies with the URLs)
+    papers = [(key, tweet) for key, tweet, img in posted if ": " in tweet]
+    assert papers == [
+        ("strict-key", "Strict: B"),
+        ("strict-key", "Strict: A"),
+        ("diffusion-key", "Diffusion: Diffusion"),
+        ("diffusion-key", "Diffusion: A"),
+    ]
+
+    # The image of the paper selected by both profiles is extracted once
+    assert sorted(extracted) == ["1", "2", "3"]
+    assert [img for key, tweet, img in posted if tweet.endswith(": A")] == [
+        str(tmp_path / "1.jpg")
+    ] * 2
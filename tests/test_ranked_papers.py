@@ -1,10 +1,11 @@
 import pytest
 from unittest.mock import patch
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 
 from arxiv_sanity_bot.schemas import RawPaper, RankedPaper, PaperSource
 from arxiv_sanity_bot.logger import FatalError
 from arxiv_sanity_bot.ranking.ranked_papers import (
+    RangeAbstracts,
     _extract_field,
     _sanitize_arxiv_id,
     _from_alphaxiv,
@@ -260,6 +261,35 @@ def test_get_all_abstracts_sorting(
     assert count == 3
 
 
+@patch("arxiv_sanity_bot.ranking.ranked_papers._fetch_alphaxiv_feed")
+@patch("arxiv_sanity_bot.ranking.ranked_papers._fetch_hf_papers_for_date")
+@patch("arxiv_sanity_bot.ranking.ranked_papers.time.sleep")
+def test_range_abstracts_fetches_each_source_once(
+    mock_sleep, mock_fetch_hf, mock_fetch_alphaxiv, raw_paper
+):
+    now = datetime.now(timezone.utc)
+    mock_fetch_hf.side_effect = lambda date: [
+        raw_paper(arxiv_id="2411.11111", published_on=now.isoformat())
+    ]
+    mock_fetch_alphaxiv.return_value = [
+        raw_paper(arxiv_id="2411.11111", published_on=now.isoformat(), votes=10)
+    ]
+    get_abstracts = RangeAbstracts()
+
+    # Older than the alphaXiv feed
+    for day in (30, 29, 28):
+        get_abstracts(now - timedelta(days=day + 1), now - timedelta(days=day))
+    assert mock_fetch_alphaxiv.call_count == 0
+    # 7 days for the first window, then one more for each
+    assert mock_fetch_hf.call_count == 9
+
+    df, _ = get_abstracts(now - timedelta(days=1), now)
+    df, _ = get_abstracts(now - timedelta(hours=12), now)
+
+    assert mock_fetch_alphaxiv.call_count == 1
+    assert df.iloc[0]["score"] == 2
+
+
 def test_get_url():
     assert get_url("2411.12345") == "https://arxiv.org/abs/2411.12345"
 
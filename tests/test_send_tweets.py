@@ -0,0 +1,133 @@
+import time
+from datetime import datetime, timezone
+from unittest import mock
+
+import pandas as pd
+import pytest
+
+from arxiv_sanity_bot.cli import arxiv_sanity_bot as cli
+from arxiv_sanity_bot.logger import FatalError
+
+
+# Seconds of processing per paper, and of pacing between posts
+PROCESSING = 0.2
+PACING = 0.2
+
+
+@pytest.fixture
+def posted(monkeypatch):
+    posted = []
+
+    def sender(tweet, auth, img_path=None, in_reply_to_tweet_id=None):
+        posted.append(tweet)
+        return f"https://x.com/{len(posted)}", len(posted)
+
+    monkeypatch.setattr(cli, "_tweet_sender", lambda dry: sender)
+    monkeypatch.setattr(cli, "PACING_SCALE", PACING / 10)
+    monkeypatch.setattr(cli.random, "randint", lambda a, b: 10)
+    yield posted
+
+
+@pytest.fixture
+def llm():
+    llm = mock.Mock()
+    llm.generate_bot_summary.return_value = "Summary tweet"
+    return llm
+
+
+def _papers(n):
+    return pd.DataFrame(
+        {
+            "arxiv": [f"2501.{i:05d}" for i in range(n)],
+            "title": [f"Paper {i}" for i in range(n)],
+            "score": [100 - i for i in range(n)],
+            "published_on": [datetime(2025, 1, 31, tzinfo=timezone.utc)] * n,
+        }
+    )
+
+
+def _summarize(row):
+    time.sleep(PROCESSING)
+    if row["arxiv"] == "2501.00001":
+        return None
+    return {
+        "arxiv": row["arxiv"],
+        "title": row["title"],
+        "published_on": row["published_on"],
+        "image": None,
+        "tweet": f"Tweet {row['arxiv']}",
+        "url": None,
+    }
+
+
+def test_send_tweets_in_reverse_order(posted, llm):
+    summaries = [_summarize(row) for _, row in _papers(3).iterrows()]
+    summaries = [s for s in summaries if s is not None]
+    doc_store = {}
+
+    tweet_urls = cli.send_tweets(100, summaries, doc_store, dry=True, llm=llm)
+
+    assert posted == ["Summary tweet", "Tweet 2501.00002", "Tweet 2501.00000"]
+    assert set(tweet_urls) == set(doc_store) == {"2501.00000", "2501.00002"}
+
+
+def test_stream_tweets_keeps_the_order_and_overlaps(posted, llm):
+    papers = _papers(4)
+    doc_store = {}
+
+    start = time.monotonic()
+    summaries, tweet_urls = cli.stream_tweets(
+        100, papers, _summarize, doc_store, dry=True, llm=llm
+    )
+    elapsed = time.monotonic() - start
+
+    # Same thread as send_tweets would produce
+    assert posted == [
+        "Summary tweet",
+        "Tweet 2501.00003",
+        "Tweet 2501.00002",
+        "Tweet 2501.00000",
+    ]
+    # Announces the papers it is about to process
+    llm.generate_bot_summary.assert_called_once_with(100, 4)
+    assert [s["arxiv"] for s in summaries] == [
+        "2501.00000",
+        "2501.00002",
+        "2501.00003",
+    ]
+    assert tweet_urls["2501.00000"] == "https://x.com/4"
+    assert set(doc_store) == set(tweet_urls)
+
+    # Summarizing and pacing overlap: sequentially this would take
+    # 4 * PROCESSING + 3 * PACING
+    assert elapsed < 4 * PROCESSING + 2 * PACING
+
+
+def test_stream_tweets_stops_on_error(posted, llm):
+    processed = []
+
+    def summarize(row):
+        processed.append(row["arxiv"])
+        time.sleep(PROCESSING)
+        raise FatalError("OpenAI is down")
+
+    with pytest.raises(FatalError):
+        cli.stream_tweets(100, _papers(3), summarize, {}, dry=True, llm=llm)
+
+    # At most the paper in progress is processed after the failure
+    assert processed[0] == "2501.00002"
+    assert len(processed) <= 2
+    assert posted == ["Summary tweet"]
+
+
+def test_papers_posted_since_selection_are_skipped(posted, llm):
+    summaries = [_summarize(row) for _, row in _papers(3).iterrows()]
+    summaries = [s for s in summaries if s is not None]
+    # Posted by another run after this one selected the papers
+    doc_store = {"2501.00002": {"tweet_id": 1}}
+
+    tweet_urls = cli.send_tweets(100, summaries, doc_store, dry=True, llm=llm)
+
+    assert posted == ["Summary tweet", "Tweet 2501.00000"]
+    assert set(tweet_urls) == {"2501.00000"}
+    assert doc_store["2501.00002"] == {"tweet_id": 1}
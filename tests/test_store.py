@@ -65,3 +65,11 @@ def test_membership(store):
     assert "one" in store
     assert "two" in store
     assert "three" not in store
+
+
+def test_membership_is_cached(store):
+    store["cached"] = {"one": "two"}
+
+    with patch.object(store, "_client") as mock_client:
+        assert "cached" in store
+        mock_client.collection.assert_not_called()
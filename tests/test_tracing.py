@@ -0,0 +1,78 @@
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from arxiv_sanity_bot.logger import JSONFormatter
+from arxiv_sanity_bot.telemetry import tracing
+from arxiv_sanity_bot.telemetry.tracing import propagate, span
+
+
+@pytest.fixture
+def recording():
+    tracing.start_recording()
+    yield
+    tracing.stop_recording()
+
+
+def test_nested_spans(recording):
+    with span("run") as run:
+        with span("paper", arxiv_id="2501.00001") as paper:
+            with span("openai") as call:
+                pass
+
+    assert paper.parent_id == run.span_id
+    assert call.parent_id == paper.span_id
+    assert run.parent_id is None
+    assert {run.trace_id, paper.trace_id, call.trace_id} == {run.trace_id}
+
+    # Children finish first
+    assert [s.name for s in tracing.finished_spans()] == ["openai", "paper", "run"]
+
+
+def test_failed_span_is_marked(recording):
+    with pytest.raises(RuntimeError):
+        with span("openai"):
+            raise RuntimeError("boom")
+
+    assert tracing.finished_spans()[0].attributes["error"] == "RuntimeError"
+
+
+def test_ids_in_log_records():
+    record = logging.LogRecord("test", logging.INFO, __file__, 1, "hello", None, None)
+
+    assert "trace_id" not in json.loads(JSONFormatter().format(record))
+
+    with span("run") as run:
+        formatted = json.loads(JSONFormatter().format(record))
+
+    assert formatted["trace_id"] == run.trace_id
+    assert formatted["span_id"] == run.span_id
+
+
+def test_propagate_to_threads(recording):
+    with span("window") as window:
+        with ThreadPoolExecutor(2) as pool:
+            children = list(pool.map(lambda f: f(), [propagate(lambda: _child())] * 2))
+
+    assert all(c.parent_id == window.span_id for c in children)
+
+
+def _child():
+    with span("download") as s:
+        return s
+
+
+def test_chrome_trace(recording, tmp_path):
+    with span("run"):
+        with span("paper", arxiv_id="2501.00001"):
+            pass
+
+    path = tmp_path / "trace.json"
+    tracing.export_chrome_trace(str(path))
+
+    events = json.loads(path.read_text())["traceEvents"]
+    assert [e["name"] for e in events] == ["run", "paper"]
+    assert all(e["ph"] == "X" and e["dur"] >= 0 for e in events)
+    assert events[1]["args"]["arxiv_id"] == "2501.00001"
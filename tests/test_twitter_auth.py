@@ -27,3 +27,13 @@ def test_twitter_oauth1_environment_variables(monkeypatch):
     assert oauth1.consumer_secret == "test_consumer_secret"
     assert oauth1.access_token == "test_access_token"
     assert oauth1.access_token_secret == "test_access_token_secret"
+
+
+def test_twitter_oauth1_environment_prefix(monkeypatch):
+    monkeypatch.setenv("OTHER_CONSUMER_KEY", "other_consumer_key")
+    monkeypatch.setenv("OTHER_ACCESS_TOKEN_SECRET", "other_access_token_secret")
+
+    oauth1 = TwitterOAuth1(env_prefix="OTHER")
+
+    assert oauth1.consumer_key == "other_consumer_key"
+    assert oauth1.access_token_secret == "other_access_token_secret"